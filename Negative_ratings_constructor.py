@@ -1,84 +1,202 @@
 import csv
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime
 
-def filter_csv_by_rating(input_filepath, output_filepath, target_rating=1):
+WRITE_BUFFER_SIZE = 1 << 20  # Bytes buffered per output file before hitting the disk
+
+
+# --- Row predicates ---
+# Each factory returns a function (row, columns) -> bool, where columns maps header names to
+# indexes, and lists the header names it reads in its 'columns' attribute; partition_csv
+# checks those against the header before writing anything. A predicate raises ValueError
+# with a short, value-free reason for a malformed row; those rows are skipped for that
+# output and counted in the summary.
+
+def _reads(*names):
+    def decorate(predicate):
+        predicate.columns = names
+        return predicate
+    return decorate
+
+
+def rating_in(*ratings):
+    """Matches rows whose 'Rating' is one of ratings."""
+    targets = set(ratings)
+    @_reads('Rating')
+    def predicate(row, columns):
+        try:
+            return int(row[columns['Rating']].strip()) in targets
+        except ValueError:
+            raise ValueError("non-numeric Rating")
+    return predicate
+
+
+def _parse_date(value):
+    value = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        # The export's dates carry no time zone, so an aware bound has nothing to compare against.
+        raise ValueError(f"date_between bounds must not have a time zone (got {value.isoformat()}); "
+                         "pass them in the export's local time, like its Review_Date values.")
+    return value
+
+
+def date_between(start=None, end=None):
     """
-    Reads a CSV file, filters rows where 'Rating' equals target_rating,
-    and writes these rows to a new CSV file.
+    Matches rows whose 'Review_Date' is at or after start and before end (either may be None).
+
+    Raises:
+        ValueError: If a bound has a time zone; Review_Date values are naive.
+    """
+    start = _parse_date(start) if start is not None else None
+    end = _parse_date(end) if end is not None else None
+    @_reads('Review_Date')
+    def predicate(row, columns):
+        try:
+            review_date = datetime.fromisoformat(row[columns['Review_Date']].strip())
+        except ValueError:
+            raise ValueError("unparseable Review_Date")
+        try:
+            return (start is None or review_date >= start) and (end is None or review_date < end)
+        except TypeError:
+            raise ValueError("Review_Date with a time zone")
+    return predicate
+
+
+def has_developer_reply(expected=True):
+    """Matches rows whose 'Has_Developer_Reply' flag equals expected."""
+    @_reads('Has_Developer_Reply')
+    def predicate(row, columns):
+        value = row[columns['Has_Developer_Reply']].strip().lower()
+        if value not in ('true', 'false', 'yes', 'no'):
+            raise ValueError("unrecognized Has_Developer_Reply")
+        return (value in ('true', 'yes')) == expected
+    return predicate
+
+
+def all_of(*predicates):
+    """Matches rows accepted by every one of predicates."""
+    @_reads(*dict.fromkeys(name for p in predicates for name in getattr(p, 'columns', ())))
+    def predicate(row, columns):
+        return all(p(row, columns) for p in predicates)
+    return predicate
+
+
+def partition_csv(input_filepath, outputs):
+    """
+    Streams a CSV file once and writes each row to every output whose predicate accepts it.
+
+    Rows are written as they are read through buffered writers, so memory use does not
+    depend on the file size. Every output gets the input header, even if no row matches.
+    Malformed rows are not reported one by one; their counts per reason are returned and
+    printed once at the end. A row is only checked for the columns an output's predicate
+    reads, so short rows still reach the outputs whose columns they have.
 
     Args:
         input_filepath (str): Path to the input CSV file.
-        output_filepath (str): Path where the filtered CSV file will be saved.
-        target_rating (int): The rating value to filter by.
+        outputs (dict): Output file path -> predicate (see rating_in, date_between,
+            has_developer_reply, all_of).
+
+    Returns:
+        dict: Summary with 'rows_processed', 'matched' (output path -> row count) and
+        'malformed' (reason -> row count), or None if the input could not be read or lacks a
+        column a predicate reads (in which case no output is written).
     """
-    filtered_rows = []
-    header = []
-    rating_column_index = -1
+    rows_processed = 0
+    matched = Counter({output_filepath: 0 for output_filepath in outputs})
+    malformed = Counter()
 
     try:
-        with open(input_filepath, mode='r', newline='', encoding='utf-8') as infile:
+        with open(input_filepath, mode='r', newline='', encoding='utf-8') as infile, ExitStack() as stack:
             reader = csv.reader(infile)
 
             # Read the header
             header = next(reader, None)
             if not header:
                 print("Error: Input CSV file is empty or has no header.")
-                return
-
-            filtered_rows.append(header) # Add header to our output list
+                return None
+            columns = {name: index for index, name in enumerate(header)}
+            missing = sorted({name for predicate in outputs.values() for name in getattr(predicate, 'columns', ())} - set(columns))
+            if missing:
+                print(f"Error: Column(s) {', '.join(repr(name) for name in missing)} not found in the header: {header}")
+                return None
+            # A row needs at least this many fields for each output's predicate.
+            required_lengths = {output_filepath: max((columns[name] + 1 for name in getattr(predicate, 'columns', ())), default=0)
+                                for output_filepath, predicate in outputs.items()}
 
-            # Try to find the 'Rating' column index
-            try:
-                rating_column_index = header.index('Rating')
-            except ValueError:
-                print(f"Error: 'Rating' column not found in the header: {header}")
-                print("Please ensure your CSV has a 'Rating' column.")
-                return
+            writers = {}
+            for output_filepath in outputs:
+                outfile = stack.enter_context(open(output_filepath, mode='w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE))
+                writers[output_filepath] = csv.writer(outfile)
+                writers[output_filepath].writerow(header)
 
             # Process data rows
-            rows_processed = 0
-            rows_matched = 0
             for row in reader:
                 rows_processed += 1
-                if len(row) > rating_column_index: # Check if row has enough columns
+                row_reasons = set()
+                for output_filepath, predicate in outputs.items():
+                    if len(row) < required_lengths[output_filepath]:
+                        row_reasons.add("insufficient columns")
+                        continue
                     try:
-                        # Get rating, strip whitespace, convert to int
-                        rating_value = int(row[rating_column_index].strip())
-                        if rating_value == target_rating:
-                            filtered_rows.append(row)
-                            rows_matched += 1
-                    except ValueError:
-                        # Handle cases where rating is not a valid integer
-                        print(f"Warning: Non-numeric rating found in row: {row}. Skipping.")
-                    except IndexError:
-                        # This case should be caught by len(row) > rating_column_index, but as a safeguard
-                        print(f"Warning: Row with insufficient columns: {row}. Skipping.")
-                else:
-                    print(f"Warning: Row with insufficient columns (expected at least {rating_column_index + 1}): {row}. Skipping.")
-
-        # Write the filtered rows to the output file
-        if len(filtered_rows) > 1: # More than just the header
-            with open(output_filepath, mode='w', newline='', encoding='utf-8') as outfile:
-                writer = csv.writer(outfile)
-                writer.writerows(filtered_rows)
-            print(f"Successfully processed {rows_processed} data rows.")
-            print(f"Found {rows_matched} reviews with rating {target_rating}.")
-            print(f"Filtered data saved to '{output_filepath}'")
-        elif not header: # This case is handled above, but as a double check
-            pass # Error already printed
-        else:
-            print(f"Successfully processed {rows_processed} data rows.")
-            print(f"No reviews found with rating {target_rating} in '{input_filepath}'.")
-            print(f"Output file '{output_filepath}' created with header only (or not created if header was missing).")
-            # Optionally, create an empty file with header
-            with open(output_filepath, mode='w', newline='', encoding='utf-8') as outfile:
-                writer = csv.writer(outfile)
-                writer.writerow(header)
-
+                        if predicate(row, columns):
+                            writers[output_filepath].writerow(row)
+                            matched[output_filepath] += 1
+                    except (ValueError, KeyError) as e:
+                        # KeyError only comes from predicates that do not declare their columns.
+                        row_reasons.add(f"missing column {e}" if isinstance(e, KeyError) else str(e))
+                # A row is counted once per reason even if several outputs rejected it.
+                malformed.update(row_reasons)
 
     except FileNotFoundError:
         print(f"Error: Input file '{input_filepath}' not found.")
+        return None
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+        return None
+
+    print(f"Successfully processed {rows_processed} data rows.")
+    for output_filepath, count in matched.items():
+        print(f"  {count} rows written to '{output_filepath}'")
+    if malformed:
+        print("Skipped malformed rows: " + ", ".join(f"{reason}: {count}" for reason, count in malformed.most_common()))
+    return {'rows_processed': rows_processed, 'matched': dict(matched), 'malformed': dict(malformed)}
+
+
+def filter_csv_by_rating(input_filepath, output_filepath, target_rating=1):
+    """
+    Reads a CSV file, filters rows where 'Rating' equals target_rating,
+    and writes these rows to a new CSV file.
+
+    Args:
+        input_filepath (str): Path to the input CSV file.
+        output_filepath (str): Path where the filtered CSV file will be saved.
+        target_rating (int): The rating value to filter by.
+
+    Returns:
+        dict: The partition_csv summary, or None if the input could not be read.
+    """
+    summary = partition_csv(input_filepath, {output_filepath: rating_in(target_rating)})
+    if summary is not None and summary['matched'][output_filepath] == 0:
+        print(f"No reviews found with rating {target_rating} in '{input_filepath}'.")
+        print(f"Output file '{output_filepath}' created with header only.")
+    return summary
+
+
+def split_csv_by_rating(input_filepath, output_pattern='filtered_reviews_rating_{rating}.csv', ratings=(1, 2, 3, 4, 5)):
+    """
+    Splits a CSV file into one file per rating in a single pass.
+
+    Args:
+        input_filepath (str): Path to the input CSV file.
+        output_pattern (str): Output path with a '{rating}' placeholder.
+        ratings (tuple): The rating values to write files for.
+
+    Returns:
+        dict: The partition_csv summary, or None if the input could not be read.
+    """
+    outputs = {output_pattern.format(rating=rating): rating_in(rating) for rating in ratings}
+    return partition_csv(input_filepath, outputs)
 
 # --- How to use the function ---
 
@@ -90,9 +208,13 @@ if __name__ == "__main__":
 
     # Create a dummy input CSV file for testing
     # In a real scenario, you would already have this file.
-   
+
     # Call the function
     filter_csv_by_rating(input_csv_file, output_csv_file, rating_to_filter)
 
     # You can also test with a different rating:
-    # filter_csv_by_rating(input_csv_file, 'filtered_reviews_rating_5.csv', 5)
\ No newline at end of file
+    # filter_csv_by_rating(input_csv_file, 'filtered_reviews_rating_5.csv', 5)
+
+    # Or split by every rating (and any other predicate) in one pass:
+    # split_csv_by_rating(input_csv_file, 'filtered_reviews_rating_{rating}.csv')
+    # partition_csv(input_csv_file, {'replied_2024.csv': all_of(has_developer_reply(True), date_between('2024-01-01', '2025-01-01'))})
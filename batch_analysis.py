@@ -0,0 +1,169 @@
+import argparse
+import contextlib
+import glob
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# --- Configuration ---
+BATCH_OUTPUT_DIR = 'batch_output'
+BATCH_WORKERS = None  # None runs min(datasets, CPU cores) analyses at once
+
+
+def expand_inputs(patterns):
+    """
+    Review CSVs named by patterns (paths or glob patterns), as absolute paths in order of first
+    appearance without duplicates. A pattern matching nothing is reported and skipped.
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"Warning: No review files match '{pattern}'.")
+        for path in matches:
+            path = os.path.abspath(path)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def dataset_names(csv_paths):
+    """
+    Output directory name of every CSV: its file name without extension, prefixed with as many
+    parent directories as it takes to tell it apart from the other CSVs (e.g. 'in_reviews' and
+    'br_reviews' for two regional exports named reviews.csv).
+    """
+    parts = [os.path.splitext(path)[0].split(os.sep) for path in csv_paths]
+    depths = [1] * len(parts)
+    while True:
+        names = ['_'.join(p[-depth:]) for p, depth in zip(parts, depths)]
+        clashing = [i for i, name in enumerate(names) if names.count(name) > 1 and depths[i] < len(parts[i])]
+        if not clashing:
+            return names
+        for i in clashing:
+            depths[i] += 1
+
+
+def analyze_dataset(csv_path, output_dir, shared_cache_dir, stages=None, inner_workers=None):
+    """
+    Runs data_analysis on one CSV inside output_dir; meant to run in a worker process.
+
+    As in benchmark.py, the worker changes into output_dir, so plots, reports and the
+    per-dataset state (review cache, incremental state, topic model, spike detector, plot
+    manifest) land there and never clobber another dataset's. The processed message and
+    sentiment caches are keyed by text alone and point to shared_cache_dir instead, so a
+    text that occurs in several datasets is processed and scored once. The analysis log
+    goes to analysis.log in output_dir.
+
+    Args:
+        csv_path (str): Absolute path of the review CSV.
+        output_dir (str): Absolute directory for this dataset's outputs.
+        shared_cache_dir (str): Absolute directory of the caches shared by all datasets.
+        stages (list): Stages to run (default: all).
+        inner_workers (int): Process pool size of the preprocessing, sentiment and plot
+            stages, so concurrent datasets do not oversubscribe the CPU.
+
+    Returns:
+        dict: 'csv_path', 'output_dir', 'status' ('ok' or 'failed'), 'seconds', 'rows' and,
+        for a failed run, 'error'.
+    """
+    import data_analysis
+
+    data_analysis.PREPROCESS_CACHE_PATH = os.path.join(shared_cache_dir, 'processed_messages.sqlite')
+    data_analysis.SENTIMENT_CACHE_PATH = os.path.join(shared_cache_dir, 'vader_scores.sqlite')
+    if inner_workers:
+        data_analysis.PREPROCESS_WORKERS = data_analysis.SENTIMENT_WORKERS = data_analysis.PLOT_WORKERS = inner_workers
+
+    os.makedirs(output_dir, exist_ok=True)
+    original_dir = os.getcwd()
+    result = {'csv_path': csv_path, 'output_dir': output_dir, 'status': 'ok', 'rows': None}
+    start = time.perf_counter()
+    os.chdir(output_dir)
+    try:
+        with open('analysis.log', mode='w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+            try:
+                profiler = data_analysis.main(csv_path=csv_path, stages=stages)
+            except Exception as e:
+                traceback.print_exc(file=log)
+                result.update(status='failed', error=f"{type(e).__name__}: {e}")
+            else:
+                stage_names = {record['stage'] for record in profiler.records}
+                if 'render' not in stage_names:
+                    result.update(status='failed', error="a stage failed; see analysis.log")
+                load = next((record for record in profiler.records if record['stage'] == 'load'), None)
+                result['rows'] = load['rows_out'] if load else None
+    finally:
+        os.chdir(original_dir)
+    result['seconds'] = round(time.perf_counter() - start, 1)
+    return result
+
+
+def run_batch(csv_paths, output_dir=BATCH_OUTPUT_DIR, workers=BATCH_WORKERS, stages=None, shared_cache_dir=None):
+    """
+    Analyzes several review CSVs in a process pool, each into its own subdirectory of output_dir.
+
+    Args:
+        csv_paths (list): Review CSVs (see expand_inputs).
+        output_dir (str): Parent directory of the per-dataset output directories.
+        workers (int): Datasets analyzed at once; defaults to min(len(csv_paths), CPU cores).
+            The CPU cores are split between them for each run's own process pools.
+        stages (list): Stages to run for every dataset (default: all).
+        shared_cache_dir (str): Directory of the caches shared by all datasets; defaults to
+            '.review_cache' in output_dir.
+
+    Returns:
+        list: One result dict per CSV (see analyze_dataset), in the order of csv_paths.
+    """
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(workers or cpu_count, len(csv_paths)))
+    inner_workers = max(1, cpu_count // workers)
+    output_dir = os.path.abspath(output_dir)
+    shared_cache_dir = os.path.abspath(shared_cache_dir or os.path.join(output_dir, '.review_cache'))
+    output_dirs = [os.path.join(output_dir, name) for name in dataset_names(csv_paths)]
+
+    print(f"Analyzing {len(csv_paths)} datasets, {workers} at a time, into '{output_dir}'...")
+    results = {}
+    # A pool is used even with one worker, so the per-dataset chdir and settings never touch this process.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(analyze_dataset, csv_path, dataset_dir, shared_cache_dir, stages, inner_workers): csv_path
+                   for csv_path, dataset_dir in zip(csv_paths, output_dirs)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            print(f"  {result['status']:<7}{result['seconds']:>8.1f}s  {result['csv_path']}" + (f"  ({result['error']})" if 'error' in result else ""))
+    return [results[csv_path] for csv_path in csv_paths]
+
+
+def print_summary(results):
+    print("\n--- Batch Summary ---")
+    print(f"{'Dataset':<40}{'Status':<8}{'Rows':>10}{'Seconds':>10}")
+    for result in results:
+        rows = '' if result['rows'] is None else result['rows']
+        print(f"{os.path.basename(result['output_dir']):<40}{result['status']:<8}{rows:>10}{result['seconds']:>10.1f}")
+
+
+def main(argv=None):
+    from data_analysis import SELECTABLE_STAGES
+
+    parser = argparse.ArgumentParser(description="Analyze several review exports (apps, regions) in parallel, each into its own output directory.")
+    parser.add_argument('inputs', nargs='+', metavar='CSV', help="Review CSVs or glob patterns (quote them, e.g. 'exports/*.csv').")
+    parser.add_argument('--output-dir', default=BATCH_OUTPUT_DIR, help=f"Parent of the per-dataset output directories (default: {BATCH_OUTPUT_DIR}).")
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help="Datasets to analyze at once (default: one per CPU core, at most one per dataset).")
+    parser.add_argument('--stages', nargs='+', choices=SELECTABLE_STAGES, metavar='STAGE',
+                        help=f"Stages to run for every dataset (default: all). Choices: {', '.join(SELECTABLE_STAGES)}.")
+    parser.add_argument('--shared-cache-dir', default=None,
+                        help="Directory of the processed message and sentiment caches shared by all datasets (default: OUTPUT_DIR/.review_cache).")
+    args = parser.parse_args(argv)
+
+    csv_paths = expand_inputs(args.inputs)
+    if not csv_paths:
+        print("Error: No review files to analyze.")
+        return []
+    results = run_batch(csv_paths, output_dir=args.output_dir, workers=args.workers, stages=args.stages, shared_cache_dir=args.shared_cache_dir)
+    print_summary(results)
+    return results
+
+
+if __name__ == '__main__':
+    main()
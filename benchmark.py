@@ -0,0 +1,386 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+BENCHMARK_DIR = os.path.join('.review_cache', 'benchmark')
+BENCHMARK_RESULTS_PATH = 'benchmark_results.jsonl'
+SCALES = (10_000, 100_000, 1_000_000, 10_000_000)
+DEFAULT_SCALES = (10_000, 100_000)
+GENERATOR_CHUNK_SIZE = 200_000
+DEFAULT_DUPLICATE_RATE = 0.08  # Share of reviews that are stock one-liners ("worst app", "good"), as in the scraped data
+DEFAULT_SEED = 7
+
+# Rating mix of the scraped Play Store reviews (1 to 5 stars).
+RATING_PROBABILITIES = np.array([0.55, 0.08, 0.07, 0.08, 0.22])
+REVIEW_DATE_RANGE = ('2019-08-01', '2025-05-16')
+
+# --- Synthetic Text ---
+# Fragments in the register of the real reviews: English, Hinglish and a few emoji, with the
+# misspellings users actually write. Complaint fragments cover every pain point category.
+COMPLAINT_FRAGMENTS = [
+    "payout nahi aaya", "not received my payout", "payment nhi mila abhi tak", "commission pending since 2 months",
+    "they don't pay for that sale", "paisa nahi dete hai", "reward not credited", "bonus nahi mila",
+    "lead rejected after successful sale", "leads show pending", "tracking nahi hua", "lead status not updated",
+    "customer ka account open hua par track nhi hua", "kyc pending hai", "account verification failed",
+    "login nahi ho raha", "otp not coming", "app bahut slow hai", "app crash ho jata hai", "server error every time",
+    "customer service is very worst", "no one for help", "support team does not reply", "call nahi uthate",
+    "no proper training", "product information is not clear", "hidden conditions", "fraud company hai",
+    "cheating app", "time waste application", "bekar service", "bohot ghatiya app", "fake app hai",
+    "data collect theif app", "i refer many of my friend", "6 sale kiya sirf ek ka paisa diya",
+]
+PRAISE_FRAGMENTS = [
+    "good app for earning", "best app", "payout on time", "easy to use", "bahut accha app hai",
+    "support team helped me", "nice platform for financial products", "earning ho rahi hai", "very helpful",
+    "good training videos", "thank you gromo", "lead tracking is fast",
+]
+NEUTRAL_FRAGMENTS = [
+    "ok ok app", "average experience", "improve the app", "kuch products ka payout late aata hai",
+    "need more products", "sometimes slow", "customer care should be better",
+]
+FILLER_FRAGMENTS = ["please", "sir", "ye", "and", "but", "...", "😔", "👎", "👍", "🙏", "very very", "pls avoid this app"]
+DETAIL_TEMPLATES = ["since {} days", "{} sale kiya", "for {} leads", "rs {} pending", "{} din se", "after {} calls"]
+STOCK_REVIEWS = [
+    "worst app", "Worst app", "good", "Good", "nice", "Nice app", "bad", "very bad", "fraud app",
+    "Fake app", "best", "Bakwas app", "👎", "Not good", "useless app",
+]
+USER_NAMES = ["Rahul Kumar", "Priya Sharma", "Amit Singh", "Sunita Devi", "Vikas Yadav", "Pooja Verma", "Rohit Gupta"]
+DEVELOPER_REPLIES = [
+    "We wanted to reach out & extend our apologies for the inconvenience. However, it is difficult for us to identify "
+    "your account from the review. We request you to share your contact info with us at support@gromo.in. Thank you.",
+    "Hi, we are sorry to hear about your experience. Please share your registered mobile number with us at "
+    "support@gromo.in so we can look into this.",
+    "Thank you for your valuable feedback! We are glad you are enjoying GroMo.",
+]
+
+
+def _messages(rng, ratings, duplicate_rate):
+    stock = rng.random(len(ratings)) < duplicate_rate
+    fragment_counts = rng.integers(2, 6, size=len(ratings))
+    pools = {1: COMPLAINT_FRAGMENTS, 2: COMPLAINT_FRAGMENTS, 3: NEUTRAL_FRAGMENTS, 4: PRAISE_FRAGMENTS, 5: PRAISE_FRAGMENTS}
+    messages = []
+    for rating, count, is_stock in zip(ratings, fragment_counts, stock):
+        if is_stock:
+            messages.append(STOCK_REVIEWS[rng.integers(len(STOCK_REVIEWS))])
+            continue
+        pool = pools[rating]
+        parts = [pool[i] for i in rng.integers(len(pool), size=count)]
+        if rng.random() < 0.6:
+            parts.append(DETAIL_TEMPLATES[rng.integers(len(DETAIL_TEMPLATES))].format(rng.integers(1, 500)))
+        if rng.random() < 0.3:
+            parts.insert(int(rng.integers(len(parts) + 1)), FILLER_FRAGMENTS[rng.integers(len(FILLER_FRAGMENTS))])
+        message = " ".join(parts)
+        messages.append(message.capitalize() if rng.random() < 0.6 else message)
+    return messages
+
+
+def _review_chunk(rng, size, duplicate_rate, start, span_seconds):
+    ratings = rng.choice(np.arange(1, 6), size=size, p=RATING_PROBABILITIES)
+    review_dates = start + pd.to_timedelta(np.sort(rng.integers(0, span_seconds, size=size))[::-1], unit='s')
+    has_reply = rng.random(size) < np.where(ratings <= 3, 0.95, 0.5)
+    reply_delay = pd.to_timedelta(rng.exponential(36 * 3600, size=size).astype('int64'), unit='s')
+    reply_messages = np.array(DEVELOPER_REPLIES, dtype=object)[np.where(ratings <= 3, rng.integers(0, 2, size=size), 2)]
+    names = np.where(rng.random(size) < 0.85, "A Google user", np.array(USER_NAMES, dtype=object)[rng.integers(len(USER_NAMES), size=size)])
+    return pd.DataFrame({
+        'User_Name': names,
+        'Review_Date': review_dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'Rating': ratings,
+        'Review_Message': _messages(rng, ratings, duplicate_rate),
+        'Helpful_Count': rng.poisson(rng.exponential(3.0, size=size)),
+        'Has_Developer_Reply': has_reply,
+        'Developer_Reply_Message': np.where(has_reply, reply_messages, None),
+        'Developer_Reply_Date': np.where(has_reply, (review_dates + reply_delay).strftime('%Y-%m-%d %H:%M:%S'), None),
+    })
+
+
+def generate_reviews(output_path, rows, duplicate_rate=DEFAULT_DUPLICATE_RATE, seed=DEFAULT_SEED, chunk_size=GENERATOR_CHUNK_SIZE):
+    """
+    Writes a synthetic review CSV with the scraped schema.
+
+    Rows are generated and appended chunk by chunk, so any size fits in memory. Each chunk
+    covers a consecutive, newest-first slice of the date range, like the scraper output.
+
+    Args:
+        output_path (str): Path of the CSV file to write.
+        rows (int): Number of reviews to generate.
+        duplicate_rate (float): Share of reviews that are short stock texts repeated verbatim.
+        seed (int): Random seed; the same seed and rows always produce the same file.
+        chunk_size (int): Rows generated and written per chunk.
+
+    Returns:
+        str: output_path.
+    """
+    rng = np.random.default_rng(seed)
+    start, end = (pd.Timestamp(value) for value in REVIEW_DATE_RANGE)
+    chunk_count = max(1, -(-rows // chunk_size))
+    chunk_span = int((end - start).total_seconds()) // chunk_count
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    tmp_path = output_path + '.tmp'
+    for chunk_index in range(chunk_count):
+        size = min(chunk_size, rows - chunk_index * chunk_size)
+        chunk_start = end - pd.Timedelta(seconds=chunk_span * (chunk_index + 1))
+        chunk = _review_chunk(rng, size, duplicate_rate, chunk_start, chunk_span)
+        chunk.to_csv(tmp_path, mode='w' if chunk_index == 0 else 'a', header=chunk_index == 0, index=False)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def dataset_path(rows, duplicate_rate=DEFAULT_DUPLICATE_RATE, seed=DEFAULT_SEED, benchmark_dir=BENCHMARK_DIR):
+    return os.path.join(benchmark_dir, f"reviews_{rows}_{duplicate_rate:g}_{seed}.csv")
+
+
+# --- Benchmark Runs ---
+
+def _git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('-dirty' if dirty else '')
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    # ru_maxrss is in KiB on Linux; worker pools are covered by RUSAGE_CHILDREN.
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(usage / 1024, 1)
+
+
+def ensure_dataset(rows, duplicate_rate=DEFAULT_DUPLICATE_RATE, seed=DEFAULT_SEED, benchmark_dir=BENCHMARK_DIR):
+    """Absolute path of the synthetic dataset of rows reviews, generated on first use."""
+    csv_path = os.path.abspath(dataset_path(rows, duplicate_rate, seed, benchmark_dir))
+    if not os.path.exists(csv_path):
+        print(f"Generating {rows} synthetic reviews into '{csv_path}'...")
+        generation_start = time.perf_counter()
+        generate_reviews(csv_path, rows, duplicate_rate=duplicate_rate, seed=seed)
+        print(f"  done in {time.perf_counter() - generation_start:.1f}s")
+    return csv_path
+
+
+def run_benchmark(rows, duplicate_rate=DEFAULT_DUPLICATE_RATE, seed=DEFAULT_SEED, warm=False, benchmark_dir=BENCHMARK_DIR):
+    """
+    Times every data_analysis stage and filter_csv_by_rating on a synthetic dataset of rows reviews.
+
+    The dataset is generated once and reused. Each run works in its own scratch directory
+    (plots, caches, filtered CSV), which is emptied first so the first run is cold; with
+    warm=True the analysis is repeated to measure the cached path too. The analysis log goes
+    to analysis.log in the scratch directory.
+
+    Returns:
+        dict: Result record with one entry per stage (wall and CPU seconds, rows/s, peak MB).
+    """
+    import data_analysis
+    from Negative_ratings_constructor import filter_csv_by_rating
+    from profiling import StageProfiler
+
+    csv_path = ensure_dataset(rows, duplicate_rate, seed, benchmark_dir)
+    work_dir = os.path.abspath(os.path.join(benchmark_dir, f"run_{rows}"))
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    original_dir = os.getcwd()
+    stages = []
+    os.chdir(work_dir)
+    try:
+        with open('analysis.log', mode='w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+            for run_label in ('cold', 'warm') if warm else ('cold',):
+                profiler = data_analysis.main(csv_path=csv_path)
+                stages.extend(dict(record, run=run_label) for record in profiler.records)
+
+            filter_profiler = StageProfiler(trace_memory=data_analysis.PROFILE_MEMORY)
+            with filter_profiler.stage('filter_csv_by_rating', rows_in=rows) as record:
+                summary = filter_csv_by_rating(csv_path, 'filtered_reviews_rating_1.csv', 1)
+                record['rows_out'] = summary['matched']['filtered_reviews_rating_1.csv'] if summary else None
+            stages.extend(dict(record, run='cold') for record in filter_profiler.records)
+    finally:
+        os.chdir(original_dir)
+
+    for record in stages:
+        rows_handled = record['rows_in'] or record['rows_out']  # The load stage starts from nothing
+        record['rows_per_second'] = round(rows_handled / record['wall_seconds']) if rows_handled and record['wall_seconds'] else None
+    return {
+        'revision': _git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'rows': rows,
+        'duplicate_rate': duplicate_rate,
+        'seed': seed,
+        'cpu_count': os.cpu_count(),
+        'max_rss_mb': _max_rss_mb(),
+        'stages': stages,
+    }
+
+
+# --- Preprocessing Comparison ---
+
+def _token_overlap(candidate, reference):
+    # Micro-averaged precision and recall of the candidate token multisets against the reference.
+    matched = candidate_total = reference_total = 0
+    for candidate_text, reference_text in zip(candidate, reference):
+        candidate_tokens, reference_tokens = Counter(candidate_text.split()), Counter(reference_text.split())
+        matched += sum((candidate_tokens & reference_tokens).values())
+        candidate_total += sum(candidate_tokens.values())
+        reference_total += sum(reference_tokens.values())
+    return (matched / candidate_total if candidate_total else 1.0), (matched / reference_total if reference_total else 1.0)
+
+
+def benchmark_preprocessing(csv_path):
+    """
+    Compares the fast tokenizer (fast_preprocess_series) with the NLTK one (preprocess_series)
+    on the review messages of csv_path.
+
+    Every variant starts with an empty lemma cache. Throughput is reviews per second. Match
+    quality compares each variant with the NLTK output per review: the share of reviews with
+    identical output, and token precision and recall. The variant without the Hinglish lexicon
+    isolates the tokenizer itself; the one with it shows how much spelling normalization and
+    the Hinglish stopwords change the output.
+
+    Returns:
+        dict: Result record with one entry per variant.
+    """
+    from text_preprocessing import fast_preprocess_series, lemmatize, load_lexicon, preprocess_series
+
+    texts = pd.read_csv(csv_path, usecols=['Review_Message'])['Review_Message']
+    empty_lexicon = {'stopwords': set(), 'spellings': {}, 'keep': set()}
+    variants = [
+        ('nltk', lambda: preprocess_series(texts, workers=1)),
+        ('nltk_pool', lambda: preprocess_series(texts)),
+        ('fast_no_lexicon', lambda: fast_preprocess_series(texts, lexicon=empty_lexicon)),
+        ('fast', lambda: fast_preprocess_series(texts, lexicon=load_lexicon())),
+    ]
+    outputs, records = {}, []
+    for name, preprocess in variants:
+        lemmatize.cache_clear()
+        start = time.perf_counter()
+        outputs[name] = preprocess()
+        wall_seconds = time.perf_counter() - start
+        precision, recall = _token_overlap(outputs[name], outputs['nltk'])
+        records.append({
+            'variant': name,
+            'wall_seconds': round(wall_seconds, 3),
+            'rows_per_second': round(len(texts) / wall_seconds) if wall_seconds else None,
+            'identical_share': round(float((outputs[name] == outputs['nltk']).mean()), 4),
+            'token_precision': round(precision, 4),
+            'token_recall': round(recall, 4),
+        })
+    return {
+        'revision': _git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'csv_path': csv_path,
+        'rows': len(texts),
+        'distinct_texts': int(texts.nunique()),
+        'cpu_count': os.cpu_count(),
+        'preprocessing': records,
+    }
+
+
+def print_preprocessing_result(result):
+    """Prints the variants of one benchmark_preprocessing record as a table."""
+    print(f"\n--- Preprocessing: {result['rows']} reviews ({result['distinct_texts']} distinct) from '{result['csv_path']}' ---")
+    print(f"{'Variant':<18}{'Wall (s)':>10}{'Rows/s':>12}{'Identical':>11}{'Precision':>11}{'Recall':>9}")
+    for record in result['preprocessing']:
+        print(f"{record['variant']:<18}{record['wall_seconds']:>10.3f}{record['rows_per_second'] or '-':>12}"
+              f"{record['identical_share']:>11.2%}{record['token_precision']:>11.2%}{record['token_recall']:>9.2%}")
+
+
+def print_result(result):
+    """Prints the stages of one result record as a table."""
+    print(f"\n--- {result['rows']} rows @ {result['revision']} (max RSS {result['max_rss_mb']} MB) ---")
+    print(f"{'Stage':<22}{'Run':<6}{'Wall (s)':>10}{'Rows/s':>12}{'Peak MB':>10}")
+    for record in result['stages']:
+        rate = record.get('rows_per_second')
+        peak = record.get('peak_memory_mb')
+        print(f"{record['stage']:<22}{record['run']:<6}{record['wall_seconds']:>10.3f}"
+              f"{rate if rate is not None else '-':>12}{peak if peak is not None else '-':>10}")
+
+
+def append_result(result, results_path=BENCHMARK_RESULTS_PATH):
+    with open(results_path, mode='a', encoding='utf-8') as outfile:
+        outfile.write(json.dumps(result) + '\n')
+
+
+def load_results(results_path=BENCHMARK_RESULTS_PATH):
+    try:
+        with open(results_path, mode='r', encoding='utf-8') as infile:
+            return [json.loads(line) for line in infile if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def compare_results(results_path=BENCHMARK_RESULTS_PATH):
+    """
+    For every dataset size, compares the latest result with the latest one from a different
+    revision, printing the wall-time ratio per stage (below 1.0 means faster now).
+    """
+    results = [result for result in load_results(results_path) if 'stages' in result]  # Not the preprocessing comparisons
+    for rows in sorted({result['rows'] for result in results}):
+        history = [result for result in results if result['rows'] == rows]
+        current = history[-1]
+        baseline = next((result for result in reversed(history) if result['revision'] != current['revision']), None)
+        if baseline is None:
+            print(f"\n{rows} rows: only results for {current['revision']}, nothing to compare.")
+            continue
+        print(f"\n--- {rows} rows: {baseline['revision']} -> {current['revision']} ---")
+        print(f"{'Stage':<22}{'Run':<6}{'Before (s)':>12}{'After (s)':>12}{'Ratio':>8}")
+        before = {(record['stage'], record['run']): record for record in baseline['stages']}
+        for record in current['stages']:
+            previous = before.get((record['stage'], record['run']))
+            if previous is None:
+                continue
+            ratio = record['wall_seconds'] / previous['wall_seconds'] if previous['wall_seconds'] else float('nan')
+            print(f"{record['stage']:<22}{record['run']:<6}{previous['wall_seconds']:>12.3f}{record['wall_seconds']:>12.3f}{ratio:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the review analysis pipeline on synthetic datasets.")
+    parser.add_argument('--rows', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help=f"Dataset sizes to benchmark (default: {' '.join(map(str, DEFAULT_SCALES))}; full scale: {' '.join(map(str, SCALES))}).")
+    parser.add_argument('--duplicate-rate', type=float, default=DEFAULT_DUPLICATE_RATE)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--warm', action='store_true', help="Also time a second, cache-warm analysis run.")
+    parser.add_argument('--results', default=BENCHMARK_RESULTS_PATH, help="JSON lines file the results are appended to.")
+    parser.add_argument('--generate-only', action='store_true', help="Only write the synthetic datasets.")
+    parser.add_argument('--compare', action='store_true', help="Compare the stored results of the last two revisions and exit.")
+    parser.add_argument('--preprocessing', nargs='*', metavar='CSV',
+                        help="Compare the fast and NLTK tokenizers on the given review CSVs (default: the synthetic datasets of --rows) and exit.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare_results(args.results)
+        return
+    if args.preprocessing is not None:
+        csv_paths = args.preprocessing or [ensure_dataset(rows, args.duplicate_rate, args.seed) for rows in args.rows]
+        for csv_path in csv_paths:
+            result = benchmark_preprocessing(csv_path)
+            print_preprocessing_result(result)
+            append_result(result, args.results)
+        print(f"\nResults appended to '{args.results}'")
+        return
+    for rows in args.rows:
+        if args.generate_only:
+            path = dataset_path(rows, args.duplicate_rate, args.seed)
+            generate_reviews(path, rows, duplicate_rate=args.duplicate_rate, seed=args.seed)
+            print(f"Wrote {rows} synthetic reviews to '{path}'")
+            continue
+        result = run_benchmark(rows, duplicate_rate=args.duplicate_rate, seed=args.seed, warm=args.warm)
+        print_result(result)
+        append_result(result, args.results)
+    if not args.generate_only:
+        print(f"\nResults appended to '{args.results}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,381 +1,849 @@
-import nltk
-# Ensure NLTK resources are available (run once)
-try:
-    nltk.data.find('tokenizers/punkt')
-    print("NLTK 'punkt' resource found.")
-except LookupError:
-    print("NLTK 'punkt' resource not found. Downloading...")
-    nltk.download('punkt')
-try:
-    nltk.data.find('corpora/stopwords')
-    print("NLTK 'stopwords' resource found.")
-except LookupError:
-    print("NLTK 'stopwords' resource not found. Downloading...")
-    nltk.download('stopwords')
-try:
-    nltk.data.find('corpora/wordnet')
-    print("NLTK 'wordnet' resource found.")
-except LookupError:
-    print("NLTK 'wordnet' resource not found. Downloading...")
-    nltk.download('wordnet')
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-    print("NLTK 'averaged_perceptron_tagger' resource found.")
-except LookupError:
-    print("NLTK 'averaged_perceptron_tagger' resource not found. Downloading...")
-    nltk.download('averaged_perceptron_tagger')
-try:
-    nltk.data.find('sentiment/vader_lexicon.zip')
-    print("NLTK 'vader_lexicon' resource found.")
-except LookupError:
-    try:
-        nltk.data.find('sentiment/vader_lexicon')
-        print("NLTK 'vader_lexicon' resource found.")
-    except LookupError:
-        print("NLTK 'vader_lexicon' resource not found. Downloading...")
-        nltk.download('vader_lexicon')
-
+import argparse
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import Counter
-import re
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-from wordcloud import WordCloud
-from sklearn.feature_extraction.text import CountVectorizer
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import os # Import os earlier
+from review_store import iter_reviews, load_reviews
+from dedup import cluster_reviews, cluster_summary
+from incremental import IncrementalState, config_fingerprint
+from monthly_aggregation import (RATING_VALUES, monthly_aggregates, monthly_table, percent_column, rating_count_column,
+                                 rating_reply_count_column)
+from nltk_resources import PREPROCESSING_RESOURCES, SENTIMENT_RESOURCES, ensure_nltk_resources, nltk_data_fingerprint
+from ngrams import count_ngrams, top_ngrams
+from out_of_core import ChunkTotals
+from pain_points import PAIN_POINT_KEYWORDS, TAXONOMY, category_label, first_mention_dates, mention_column, tag_pain_points, taxonomy_keywords
+from profiling import StageProfiler
+from reply_latency import (category_latency_percentiles, latency_percentiles, monthly_reply_table,
+                           reply_latency_hours, template_replies)
+from plot_rendering import (PlotJob, render_bars, render_boxplot, render_count_bars, render_monthly_line,
+                            render_plots, render_reply_rate, render_top_ngrams, render_wordcloud)
+from sentiment import label_sentiment, score_sentiment, sentiment_histogram, vader_fingerprint
+from text_preprocessing import cached_preprocess, fast_preprocess_keyword, fast_preprocess_series, get_stop_words, load_lexicon, normalize_series, preprocess_series
+from token_corpus import TokenCorpus
+from spike_detection import NEGATIVE_SERIES, SpikeDetector, append_alerts, daily_counts
+from topics import (TOPIC_COUNT, TOPIC_FEATURES, TOPIC_NGRAM_ORDERS, TopicModel, monthly_topic_volume, topic_modeling_available,
+                    topic_summary)
 
 # --- Configuration ---
 CSV_FILE_PATH = '/Users/akshaypulla/Desktop/GroMo/gromo_play_store_reviews_detailed.csv'
+REVIEW_CACHE_DIR = '.review_cache'
+PREPROCESS_WORKERS = None # None uses every CPU core; 1 runs preprocessing in-process
+FAST_TOKENIZER = False # Whitespace tokenizer with the Hinglish lexicon instead of NLTK word_tokenize (see benchmark.py --preprocessing)
+PREPROCESS_CACHE_PATH = os.path.join(REVIEW_CACHE_DIR, 'processed_messages.sqlite') # None processes every distinct message on every run
+NGRAM_ORDERS = (1, 2, 3)
+NGRAM_TOP_N = 20
+WORDCLOUD_MAX_WORDS = 200
+SENTIMENT_CACHE_PATH = os.path.join(REVIEW_CACHE_DIR, 'vader_scores.sqlite')
+SENTIMENT_WORKERS = None # None uses every CPU core; 1 scores in-process
+NGRAM_HASHED_MODE = False # True counts n-grams into fixed-size hashed tables on very large corpora (counts become approximate)
+INCREMENTAL_MODE = False # True processes only reviews newer than the last run and reuses the persisted state
+INCREMENTAL_STATE_DIR = os.path.join(REVIEW_CACHE_DIR, 'incremental')
+CHUNKED_MODE = False # True streams the CSV in CHUNK_ROWS-row chunks and keeps only mergeable totals (exports larger than RAM; overrides INCREMENTAL_MODE)
+CHUNK_ROWS = 200_000
+PLOT_WORKERS = None # None uses every CPU core; 1 renders in-process
+PLOT_MANIFEST_PATH = os.path.join(REVIEW_CACHE_DIR, 'plot_hashes.json')
+MONTHLY_REPORT_PATH = None # e.g. 'monthly_summary.csv' to save the monthly table behind the trend plots
+PROFILE_MEMORY = True # Track per-stage peak memory with tracemalloc (slows allocation-heavy stages)
+PROFILE_REPORT_PATH = None # e.g. 'stage_profile.json' to dump per-stage timings
+PROFILE_STATS_DIR = None # e.g. 'stage_profiles' to write a cProfile .pstats file per stage
+REPLY_LATENCY_REPORT_PATH = None # e.g. 'reply_latency.csv' to save the reply latency percentiles
+DEDUP_SIMILARITY_THRESHOLD = 0.8 # Near-identical reviews are reported as one cluster; None clusters exact duplicates only
+DUPLICATE_CLUSTER_MIN_SIZE = 3 # Clusters of at least this many reviews are reported as possible spam/brigading
+DUPLICATE_REPORT_PATH = None # e.g. 'duplicate_clusters.csv' to save those clusters
+TOPIC_STATE_PATH = os.path.join(REVIEW_CACHE_DIR, 'topics', 'model.pkl') # Online topic model, updated with the reviews of each new run
+TOPIC_REPORT_PATH = None # e.g. 'complaint_topics.csv' to save the topic summary
+SPIKE_STATE_PATH = os.path.join(REVIEW_CACHE_DIR, 'spikes', 'state.pkl') # Running daily statistics of the spike detector
+ALERT_LOG_PATH = None # e.g. 'pain_point_alerts.jsonl' to append every final spike alert (complete days only) as a JSON line
+ALERT_PRINT_DAYS = 7 # Alerts of the last this many days are printed (older ones from the first run are only counted)
+TOPIC_PLOT_COUNT = 6 # Topics drawn in the monthly volume plot: uncovered and fastest growing first
+NLTK_MANIFEST_PATH = os.path.join(REVIEW_CACHE_DIR, 'nltk_resources.json')
+NLTK_ALLOW_DOWNLOAD = False # False fails fast when NLTK data is missing instead of downloading it
 FILTER_FUTURE_DATES = True
 FUTURE_DATE_THRESHOLD = pd.Timestamp.now() + pd.Timedelta(days=1)
 
+
+def future_dated_start(review_dates):
+    """
+    Position of the first review dated after FUTURE_DATE_THRESHOLD in date-sorted review_dates.
+
+    The threshold is converted to the column's unit first: an empty or unparseable column
+    comes back as datetime64[s], which searchsorted will not compare against a ns Timestamp.
+    """
+    threshold = FUTURE_DATE_THRESHOLD.as_unit(review_dates.dt.unit)
+    return int(review_dates.searchsorted(threshold, side='right'))
+
+
+def preprocess_uncached(texts):
+    if FAST_TOKENIZER:
+        return fast_preprocess_series(texts)
+    return preprocess_series(texts, workers=PREPROCESS_WORKERS)
+
+
+def preprocess_messages(texts):
+    """
+    Processed messages of texts, from the fast Hinglish-aware tokenizer when FAST_TOKENIZER is
+    set, served from PREPROCESS_CACHE_PATH for messages processed before with the same settings,
+    NLTK version and tokenizer, stopword and WordNet data.
+
+    Both tokenizers start by lowercasing and stripping punctuation and digits, so texts are
+    normalized first and messages differing only in those are processed once.
+    """
+    texts = normalize_series(texts)
+    if not PREPROCESS_CACHE_PATH:
+        return preprocess_uncached(texts)
+    variant = config_fingerprint(fast_tokenizer=FAST_TOKENIZER, stop_words=get_stop_words(), lexicon=load_lexicon() if FAST_TOKENIZER else None,
+                                 nltk_data=nltk_data_fingerprint(PREPROCESSING_RESOURCES, manifest_path=NLTK_MANIFEST_PATH))
+    return cached_preprocess(texts, preprocess_uncached, variant=variant, cache_path=PREPROCESS_CACHE_PATH)
+
+
+def keyword_map(group):
+    """
+    Category -> keywords of a taxonomy group, put through the fast tokenizer's spellings and
+    lemmatization when FAST_TOKENIZER is set so they match the tokens it produces.
+    """
+    keywords = taxonomy_keywords(TAXONOMY, group)
+    if not FAST_TOKENIZER:
+        return keywords
+    lexicon = load_lexicon()
+    return {category: [fast_preprocess_keyword(keyword, lexicon) for keyword in category_keywords] for category, category_keywords in keywords.items()}
+
+
+def score_messages(texts):
+    """VADER compound scores of texts, served from SENTIMENT_CACHE_PATH for texts scored before by the same VADER."""
+    return score_sentiment(texts, cache_path=SENTIMENT_CACHE_PATH, workers=SENTIMENT_WORKERS,
+                           scorer=vader_fingerprint(manifest_path=NLTK_MANIFEST_PATH))
+
+
+def add_derived_columns(df):
+    """
+    Adds the text-derived columns (processed message, VADER sentiment, pain point flags) to df
+    in place and returns the TokenCorpus of the processed messages, for the n-gram counts.
+    """
+    df['Processed_Message'] = preprocess_messages(df['Review_Message'])
+    df['VADER_Sentiment_Compound'] = score_messages(df['Review_Message'])
+    df['VADER_Sentiment_Label'] = label_sentiment(df['VADER_Sentiment_Compound'])
+    token_corpus = TokenCorpus.from_texts(df['Processed_Message'])
+    mention_flags = tag_pain_points(token_corpus, keyword_map('pain_points'))
+    for column in mention_flags.columns:
+        df[column] = mention_flags[column]
+    return token_corpus
+
+
+def nltk_ready(resources):
+    """Checks the NLTK data a stage needs; prints what is missing and returns False if any is."""
+    try:
+        ensure_nltk_resources(resources, manifest_path=NLTK_MANIFEST_PATH, allow_download=NLTK_ALLOW_DOWNLOAD)
+    except LookupError as e:
+        print(f"Error: {e}")
+        return False
+    return True
+
+
+class AnalysisRun:
+    """
+    Data shared between the stages of one analysis run.
+
+    Stages may run concurrently, so they never modify df; each publishes what it derives
+    (processed messages, sentiment scores, ...) as an attribute of its own.
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.df = None
+        self.incremental_state = None
+        self.chunk_totals = None
+        self.stop_words_set = None
+        self.clusters = None
+        self.processed_messages = None
+        self.token_corpus = None
+        self.negative_top_ngrams = None
+        self.compound_scores = None
+        self.mention_flags = None
+        self.first_mentions = None
+        self.monthly = None
+        # Plots are collected as jobs and rendered together (in parallel, skipping unchanged ones) at the end.
+        self.plot_jobs = []
+
+    def row_count(self):
+        if self.df is not None:
+            return len(self.df)
+        return 0 if self.chunk_totals is None else self.chunk_totals.row_count
+
+    def negative_review_text(self):
+        """Processed messages of the 1-2 star reviews."""
+        return self.processed_messages[self.df['Rating'] <= 2].dropna()
+
+    def negative_corpus(self):
+        """The token corpus restricted to the 1-2 star reviews."""
+        return self.token_corpus.select(np.flatnonzero(self.df['Rating'].to_numpy() <= 2))
+
+
 # --- Load and Basic Preprocessing ---
-print(f"Loading data from {CSV_FILE_PATH}...")
-try:
-    df = pd.read_csv(CSV_FILE_PATH)
-except FileNotFoundError:
-    print(f"Error: File not found at {CSV_FILE_PATH}. Please check the path.")
-    exit()
-
-print("Initial DataFrame Info:")
-df.info()
-print("\nFirst 5 rows:")
-print(df.head())
-
-df['Review_Date'] = pd.to_datetime(df['Review_Date'], errors='coerce')
-
-original_row_count = len(df)
-if FILTER_FUTURE_DATES:
-    future_dates_mask = df['Review_Date'] > FUTURE_DATE_THRESHOLD
-    num_future_dates = future_dates_mask.sum()
-    if num_future_dates > 0:
-        print(f"\nWarning: Found {num_future_dates} reviews with dates beyond {FUTURE_DATE_THRESHOLD}.")
-        df = df[~future_dates_mask].copy()
-        print(f"Filtered out {num_future_dates} rows with future dates. New row count: {len(df)}")
+def load_stage(run):
+    print(f"Loading data from {run.csv_path}...")
+    if CHUNKED_MODE:
+        return load_chunks(run)
+    try:
+        # Typed load (datetime dates, int8 ratings, bool replies), served from the columnar cache on warm runs.
+        df = load_reviews(run.csv_path, cache_dir=REVIEW_CACHE_DIR)
+    except FileNotFoundError:
+        print(f"Error: File not found at {run.csv_path}. Please check the path.")
+        return False
+
+    print("Initial DataFrame Info:")
+    df.info()
+    print("\nFirst 5 rows:")
+    print(df.head())
+
+    if FILTER_FUTURE_DATES:
+        # The reviews are sorted by date, so the future-dated ones are a tail slice.
+        keep_count = future_dated_start(df['Review_Date'])
+        num_future_dates = len(df) - keep_count
+        if num_future_dates > 0:
+            print(f"\nWarning: Found {num_future_dates} reviews with dates beyond {FUTURE_DATE_THRESHOLD}.")
+            df = df.iloc[:keep_count]
+            print(f"Filtered out {num_future_dates} rows with future dates. New row count: {len(df)}")
+
+    print(f"Rows after handling date issues: {len(df)}")
+    if len(df) == 0:
+        print("Error: No reviews with a valid date to analyze.")
+        return False
+
+    # --- Incremental Mode ---
+    # Only reviews newer than the persisted watermark are preprocessed, scored and tagged; the
+    # stages below then read the full enriched history and aggregates from the state.
+    if INCREMENTAL_MODE:
+        if not nltk_ready(PREPROCESSING_RESOURCES + SENTIMENT_RESOURCES):
+            return False
+        stop_words_set = get_stop_words()
+        fingerprint = config_fingerprint(source=os.path.abspath(run.csv_path), keywords=keyword_map('pain_points'), stop_words=stop_words_set, ngram_orders=NGRAM_ORDERS,
+                                         lexicon=load_lexicon() if FAST_TOKENIZER else None)
+        incremental_state = IncrementalState.load(INCREMENTAL_STATE_DIR, fingerprint=fingerprint)
+        new_rows = incremental_state.select_new(df)
+        print(f"\nIncremental mode: {len(new_rows)} reviews newer than watermark {incremental_state.watermark}.")
+        if not new_rows.empty:
+            new_negative_corpus = add_derived_columns(new_rows).select(np.flatnonzero(new_rows['Rating'].to_numpy() <= 2))
+            incremental_state.fold_in(new_rows, [mention_column(category) for category in PAIN_POINT_KEYWORDS], count_ngrams(new_negative_corpus, orders=NGRAM_ORDERS, stop_words=stop_words_set))
+            incremental_state.save()
+        if incremental_state.rows is not None:
+            df = incremental_state.rows
+        print(f"Analyzing {len(df)} reviews up to {incremental_state.watermark}.")
+        run.incremental_state = incremental_state
+
+    run.df = df
+
+
+# --- Chunked (Out-of-Core) Mode ---
+# The export is streamed CHUNK_ROWS rows at a time: every chunk is cleaned, preprocessed,
+# scored and tagged, folded into ChunkTotals and dropped, so no stage ever sees run.df. The
+# stages below read the merged totals; those that need every review at once are skipped.
+def load_chunks(run):
+    if not nltk_ready(PREPROCESSING_RESOURCES + SENTIMENT_RESOURCES):
+        return False
+    mention_columns = [mention_column(category) for category in PAIN_POINT_KEYWORDS]
+    totals = ChunkTotals(ngram_orders=NGRAM_ORDERS, stop_words=get_stop_words(), spill_dir=REVIEW_CACHE_DIR)
+    num_future_dates = 0
+    try:
+        for chunk in iter_reviews(run.csv_path, chunk_rows=CHUNK_ROWS):
+            if totals.chunk_count == 0:
+                print("\nFirst 5 rows of the first chunk:")
+                print(chunk.head())
+            if FILTER_FUTURE_DATES:
+                # Every chunk is sorted by date, so its future-dated reviews are a tail slice.
+                keep_count = future_dated_start(chunk['Review_Date'])
+                num_future_dates += len(chunk) - keep_count
+                chunk = chunk.iloc[:keep_count].copy()
+            if chunk.empty:
+                # A chunk whose dates all failed to parse (or are all in the future) adds nothing.
+                continue
+            totals.fold_in(chunk, mention_columns, add_derived_columns(chunk))
+            print(f"Chunk {totals.chunk_count}: {totals.row_count} reviews folded in.")
+    except FileNotFoundError:
+        print(f"Error: File not found at {run.csv_path}. Please check the path.")
+        return False
 
-df.dropna(subset=['Review_Date'], inplace=True)
-print(f"Rows after handling date issues: {len(df)}")
+    if num_future_dates > 0:
+        print(f"\nWarning: Filtered out {num_future_dates} reviews with dates beyond {FUTURE_DATE_THRESHOLD}.")
+    print(f"Rows after handling date issues: {totals.row_count}")
+    if totals.row_count == 0:
+        print("Error: No reviews with a valid date to analyze.")
+        return False
+    run.chunk_totals = totals
+
+
+# --- Duplicate Clustering ---
+def dedup_stage(run):
+    df = run.df
+    print("\n--- Duplicate Review Clustering ---")
+    if df is None:
+        print("Skipping duplicate clustering in chunked mode (it needs every review in memory).")
+        return
+    if 'Review_Message' not in df.columns:
+        print("Skipping duplicate clustering as 'Review_Message' is not available.")
+        return
+    # Exact duplicates after normalization, plus MinHash/LSH near duplicates. The clusters only
+    # feed the duplicate report; text results are never copied between different texts.
+    run.clusters = cluster_reviews(df['Review_Message'], threshold=DEDUP_SIMILARITY_THRESHOLD)
+    cluster_count = run.clusters['Cluster_Id'].nunique()
+    print(f"{len(df)} reviews form {cluster_count} clusters of identical or near-identical text.")
+
+
+# --- Monthly Aggregation ---
+def monthly_stage(run):
+    # One grouped pass over the review months feeds every monthly plot. Sentiment and
+    # pain point counts are included when those stages are part of the run.
+    if run.incremental_state is not None:
+        run.monthly = monthly_table(run.incremental_state.monthly)
+    elif run.chunk_totals is not None:
+        run.monthly = monthly_table(run.chunk_totals.monthly)
+    else:
+        columns = [run.df[['Review_Date', 'Rating', 'Has_Developer_Reply']]]
+        if run.compound_scores is not None:
+            columns.append(run.compound_scores)
+        if run.mention_flags is not None:
+            columns.append(run.mention_flags)
+        if run.clusters is not None:
+            # A review repeating an earlier one of its cluster.
+            columns.append((run.clusters['Cluster_Id'] != np.arange(len(run.df))).rename('Is_Duplicate'))
+        rows = pd.concat(columns, axis=1)
+        run.monthly = monthly_table(monthly_aggregates(rows, mention_columns=[] if run.mention_flags is None else run.mention_flags.columns))
+    if MONTHLY_REPORT_PATH:
+        run.monthly.to_csv(MONTHLY_REPORT_PATH, index_label='Month')
+        print(f"Monthly table saved to '{MONTHLY_REPORT_PATH}'")
 
-df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
-df.dropna(subset=['Rating'], inplace=True)
-df['Rating'] = df['Rating'].astype(int)
 
 # --- 1. Rating Distribution ---
-print("\n--- 1. Rating Distribution ---")
-plt.figure(figsize=(8, 6))
-# For Seaborn v0.14.0+ warnings:
-# sns.countplot(x='Rating', data=df, hue='Rating', palette='viridis', order=sorted(df['Rating'].unique()), legend=False)
-sns.countplot(x='Rating', data=df, palette='viridis', order=sorted(df['Rating'].unique()))
-plt.title('Distribution of GroMo Partner Ratings')
-plt.xlabel('Rating (Stars)')
-plt.ylabel('Number of Reviews')
-plt.grid(axis='y', linestyle='--')
-plt.savefig('rating_distribution.png')
-
-average_rating = df['Rating'].mean()
-print(f"Average Rating: {average_rating:.2f} stars")
+def rating_distribution_stage(run):
+    monthly = run.monthly
+    print("\n--- 1. Rating Distribution ---")
+    # Counts and mean are read from the monthly table, which every mode (in-memory,
+    # incremental, chunked) builds, instead of scanning the reviews again.
+    rating_counts = pd.Series([monthly[rating_count_column(rating)].sum() for rating in RATING_VALUES], index=pd.Index(RATING_VALUES, name='Rating'), name='count')
+    rating_counts = rating_counts[rating_counts > 0]
+    run.plot_jobs.append(PlotJob('rating_distribution.png', render_count_bars, rating_counts, title='Distribution of GroMo Partner Ratings',
+                                 xlabel='Rating (Stars)', ylabel='Number of Reviews', palette='viridis', grid_axis='y'))
+
+    average_rating = monthly['rating_sum'].sum() / monthly['review_count'].sum()
+    print(f"Average Rating: {average_rating:.2f} stars")
+
+    # --- 3. Average Rating Over Time ---
+    print("\n--- 3. Average Rating Over Time ---")
+    average_rating_per_month = monthly['average_rating']
+
+    if not average_rating_per_month.empty and len(average_rating_per_month) > 1:
+        run.plot_jobs.append(PlotJob('average_rating_over_time.png', render_monthly_line, average_rating_per_month,
+                                     title='Average GroMo Partner Rating Over Time (Monthly)', ylabel='Average Rating', color='green',
+                                     ylim=(1, 5), reference_line=(average_rating, f'Overall Avg ({average_rating:.2f})')))
+    else:
+        print("Not enough data points or time range for monthly average rating plot after date filtering.")
+
 
 # --- 2. Review Volume Over Time ---
-print("\n--- 2. Review Volume Over Time ---")
-df_time = df.set_index('Review_Date').copy()
-# reviews_per_month = df_time['Rating'].resample('M').count() # Old
-reviews_per_month = df_time['Rating'].resample('ME').count() # New: 'ME' for Month End
-
-if not reviews_per_month.empty and len(reviews_per_month) > 1:
-    plt.figure(figsize=(12, 6))
-    reviews_per_month.plot(kind='line', marker='o')
-    plt.title('Number of GroMo Partner Reviews Over Time (Monthly)')
-    plt.xlabel('Month')
-    plt.ylabel('Number of Reviews')
-    plt.grid(True)
-    plt.savefig('reviews_over_time.png')
-else:
-    print("Not enough data points or time range for monthly review volume plot after date filtering.")
-
-# --- 3. Average Rating Over Time ---
-print("\n--- 3. Average Rating Over Time ---")
-# average_rating_per_month = df_time['Rating'].resample('M').mean() # Old
-average_rating_per_month = df_time['Rating'].resample('ME').mean() # New: 'ME' for Month End
-
-if not average_rating_per_month.empty and len(average_rating_per_month) > 1:
-    plt.figure(figsize=(12, 6))
-    average_rating_per_month.plot(kind='line', marker='o', color='green')
-    plt.title('Average GroMo Partner Rating Over Time (Monthly)')
-    plt.xlabel('Month')
-    plt.ylabel('Average Rating')
-    plt.ylim(1, 5)
-    plt.grid(True)
-    plt.axhline(average_rating, color='red', linestyle='--', label=f'Overall Avg ({average_rating:.2f})')
-    plt.legend()
-    plt.savefig('average_rating_over_time.png')
-else:
-    print("Not enough data points or time range for monthly average rating plot after date filtering.")
+def review_volume_stage(run):
+    print("\n--- 2. Review Volume Over Time ---")
+    reviews_per_month = run.monthly['review_count']
+
+    if not reviews_per_month.empty and len(reviews_per_month) > 1:
+        run.plot_jobs.append(PlotJob('reviews_over_time.png', render_monthly_line, reviews_per_month,
+                                     title='Number of GroMo Partner Reviews Over Time (Monthly)', ylabel='Number of Reviews'))
+    else:
+        print("Not enough data points or time range for monthly review volume plot after date filtering.")
+
 
 # --- 4. Text Preprocessing ---
-print("\n--- 4. Text Preprocessing ---")
-stop_words_list = stopwords.words('english')
-custom_stopwords_list = ['gromo', 'app', 'application', 'please', 'also', 'get', 'even', 'would', 'could', 'make']
-stop_words_set = set(stop_words_list + custom_stopwords_list)
-
-lemmatizer = WordNetLemmatizer()
-
-def preprocess_text(text):
-    if pd.isna(text): return ""
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\d+', '', text)
-    tokens = word_tokenize(text)
-    tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words_set and len(word) > 2]
-    return " ".join(tokens)
-
-if 'Review_Message' in df.columns:
-    print("Preprocessing review messages...")
-    df['Processed_Message'] = df['Review_Message'].apply(preprocess_text)
-    print("Text preprocessing complete.")
-    print(df[['Review_Message', 'Processed_Message']].head())
-    if isinstance(df_time.index, pd.DatetimeIndex) and not df_time.empty:
-        # df_time is already indexed by 'Review_Date'. We need to ensure 'Processed_Message' from 'df' (with its original index)
-        # is correctly aligned to 'df_time'.
-        # We can do this by setting 'Review_Date' as index on 'df' temporarily for this assignment.
-        temp_df_for_merge = df.set_index('Review_Date')
-        df_time['Processed_Message'] = temp_df_for_merge['Processed_Message']
-        # Verify alignment (optional, for debugging)
-        # print("df_time head after adding Processed_Message:")
-        # print(df_time.head())
+def preprocessing_stage(run):
+    df = run.df
+    print("\n--- 4. Text Preprocessing ---")
+    if run.chunk_totals is not None:
+        print("Review messages were preprocessed chunk by chunk while loading.")
+        return
+    if not nltk_ready(PREPROCESSING_RESOURCES):
+        return False
+    run.stop_words_set = get_stop_words()
+
+    if 'Processed_Message' in df.columns:
+        print("Using processed messages from the incremental state.")
+        run.processed_messages = df['Processed_Message']
+    elif 'Review_Message' in df.columns:
+        print("Preprocessing review messages...")
+        run.processed_messages = preprocess_messages(df['Review_Message']).rename('Processed_Message')
+        print("Text preprocessing complete.")
     else:
-        print("Warning: df_time is not properly set up with DatetimeIndex. Cannot assign 'Processed_Message'.")
-else:
-    print("Error: 'Review_Message' column not found. Cannot perform text analysis.")
-    df['Processed_Message'] = ""
-    if 'Processed_Message' not in df_time.columns: # ensure df_time gets an empty column too if base df does
-        df_time['Processed_Message'] = ""
+        print("Error: 'Review_Message' column not found. Cannot perform text analysis.")
+        run.processed_messages = pd.Series("", index=df.index, name='Processed_Message')
+        return
+    # Tokenized once here; n-gram counting and pain point tagging read the token ids.
+    run.token_corpus = TokenCorpus.from_texts(run.processed_messages)
+    print(pd.concat([df['Review_Message'].head(), run.processed_messages.head()], axis=1))
 
 
 # --- 5. Most Common Words/Phrases (N-grams) ---
-def plot_top_ngrams(corpus, title, ngram_range=(1,1), top_n=20, filename='top_ngrams.png'):
-    if not corpus.empty and corpus.str.strip().any():
-        try:
-            vec = CountVectorizer(ngram_range=ngram_range, stop_words=list(stop_words_set)).fit(corpus)
-            bag_of_words = vec.transform(corpus)
-            sum_words = bag_of_words.sum(axis=0)
-            words_freq = [(word, sum_words[0, idx]) for word, idx in vec.vocabulary_.items()]
-            words_freq = sorted(words_freq, key = lambda x: x[1], reverse=True)
-
-            if not words_freq:
-                print(f"No n-grams found for '{title}' after vectorization.")
-                return
-
-            top_df = pd.DataFrame(words_freq[:top_n], columns=['Ngram', 'Frequency'])
-            plt.figure(figsize=(12, 8))
-            # For Seaborn v0.14.0+ warnings:
-            # sns.barplot(x='Frequency', y='Ngram', data=top_df, hue='Ngram', palette='mako', legend=False)
-            sns.barplot(x='Frequency', y='Ngram', data=top_df, palette='mako')
-            plt.title(title)
-            plt.tight_layout()
-            plt.savefig(filename)
-        except ValueError as e:
-            print(f"Could not generate n-grams for '{title}': {e}.")
+def negative_ngram_count_stage(run):
+    # One counting pass over the negative reviews serves both the n-gram plots and the word
+    # cloud, so only the top NGRAM_TOP_N / WORDCLOUD_MAX_WORDS n-grams per order are kept.
+    top_n = max(NGRAM_TOP_N, WORDCLOUD_MAX_WORDS)
+    if run.incremental_state is not None:
+        # Exact counts accumulated run over run (NGRAM_HASHED_MODE does not apply here).
+        run.negative_top_ngrams = {n: run.incremental_state.ngram_counts.get(n, Counter()).most_common(top_n) for n in NGRAM_ORDERS}
+        return
+    if run.chunk_totals is not None:
+        # Exact counts merged chunk by chunk on disk (NGRAM_HASHED_MODE does not apply here either).
+        top = {n: run.chunk_totals.top_ngrams(n, top_n) for n in NGRAM_ORDERS}
+        run.chunk_totals.close()
+        if any(top.values()):
+            run.negative_top_ngrams = top
+        return
+    negative_reviews_text = run.negative_review_text()
+    if not negative_reviews_text.empty and negative_reviews_text.str.strip().any():
+        # All three orders come from the token ids of the negative reviews; nothing is re-tokenized.
+        run.negative_top_ngrams = top_ngrams(run.negative_corpus(), orders=NGRAM_ORDERS, top_n=top_n, stop_words=run.stop_words_set, hashed=NGRAM_HASHED_MODE)
+
+
+def ngram_stage(run):
+    print("\n--- 5. Most Common Words/Phrases (N-grams) ---")
+    negative_top_ngrams = run.negative_top_ngrams
+    if negative_top_ngrams is not None:
+        ngram_plots = [(1, 'Top Unigrams in Negative Reviews (1-2 Stars)', 'top_unigrams_negative.png'),
+                       (2, 'Top Bigrams in Negative Reviews (1-2 Stars)', 'top_bigrams_negative.png'),
+                       (3, 'Top Trigrams in Negative Reviews (1-2 Stars)', 'top_trigrams_negative.png')]
+        for n, title, filename in ngram_plots:
+            if negative_top_ngrams[n]:
+                run.plot_jobs.append(PlotJob(filename, render_top_ngrams, negative_top_ngrams[n][:NGRAM_TOP_N], title=title))
+            else:
+                print(f"No n-grams found for '{title}'.")
     else:
-        print(f"Corpus for '{title}' is empty or contains only whitespace. Skipping n-gram plot.")
+        print("Corpus of negative reviews is empty or contains only whitespace. Skipping n-gram plots.")
 
-if 'Processed_Message' in df.columns:
-    print("\n--- 5. Most Common Words/Phrases (N-grams) ---")
-    negative_reviews_text = df[df['Rating'] <= 2]['Processed_Message'].dropna()
-    plot_top_ngrams(negative_reviews_text, 'Top Unigrams in Negative Reviews (1-2 Stars)', ngram_range=(1,1), filename='top_unigrams_negative.png')
-    plot_top_ngrams(negative_reviews_text, 'Top Bigrams in Negative Reviews (1-2 Stars)', ngram_range=(2,2), filename='top_bigrams_negative.png')
-    plot_top_ngrams(negative_reviews_text, 'Top Trigrams in Negative Reviews (1-2 Stars)', ngram_range=(3,3), filename='top_trigrams_negative.png')
-
-    if not negative_reviews_text.empty:
-        all_negative_text = " ".join(review for review in negative_reviews_text if review.strip())
-        if all_negative_text.strip():
-            wordcloud = WordCloud(stopwords=stop_words_set, background_color="white", width=800, height=400, collocations=False).generate(all_negative_text)
-            plt.figure(figsize=(10, 5))
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis("off")
-            plt.title('Word Cloud for Negative Reviews (1-2 Stars)')
-            plt.savefig('wordcloud_negative_reviews.png')
-        else:
-            print("No text available for negative review word cloud after processing.")
+
+def wordcloud_stage(run):
+    # Drawn from the unigram counts of the n-gram pass instead of re-tokenizing one string
+    # joined from every negative review.
+    if run.negative_top_ngrams is not None and run.negative_top_ngrams.get(1):
+        word_frequencies = dict(run.negative_top_ngrams[1][:WORDCLOUD_MAX_WORDS])
+        run.plot_jobs.append(PlotJob('wordcloud_negative_reviews.png', render_wordcloud, word_frequencies,
+                                     title='Word Cloud for Negative Reviews (1-2 Stars)', max_words=WORDCLOUD_MAX_WORDS))
     else:
-        print("No negative reviews found for word cloud.")
-else:
-    print("Skipping N-gram analysis as 'Processed_Message' is not available.")
+        print("No text available for negative review word cloud after processing.")
+
 
 # --- 6. Sentiment Analysis (VADER) ---
-print("\n--- 6. Sentiment Analysis (VADER) ---")
-if 'Review_Message' in df.columns:
-    analyzer = SentimentIntensityAnalyzer()
-    df['VADER_Sentiment_Compound'] = df['Review_Message'].astype(str).apply(lambda x: analyzer.polarity_scores(x)['compound'])
-    def categorize_sentiment(compound_score):
-        if compound_score >= 0.05: return 'Positive'
-        elif compound_score <= -0.05: return 'Negative'
-        else: return 'Neutral'
-    df['VADER_Sentiment_Label'] = df['VADER_Sentiment_Compound'].apply(categorize_sentiment)
-    print(df[['Rating', 'Review_Message', 'VADER_Sentiment_Compound', 'VADER_Sentiment_Label']].head())
-
-    plt.figure(figsize=(8, 6))
-    # For Seaborn v0.14.0+ warnings:
-    # sns.countplot(x='VADER_Sentiment_Label', data=df, hue='VADER_Sentiment_Label', palette='coolwarm', order=['Positive', 'Neutral', 'Negative'], legend=False)
-    sns.countplot(x='VADER_Sentiment_Label', data=df, palette='coolwarm', order=['Positive', 'Neutral', 'Negative'])
-    plt.title('Sentiment Distribution of Reviews (VADER)')
-    plt.savefig('vader_sentiment_distribution.png')
-
-    plt.figure(figsize=(10, 7))
-    # For Seaborn v0.14.0+ warnings:
-    # sns.boxplot(x='Rating', y='VADER_Sentiment_Compound', data=df, hue='Rating', palette='viridis', legend=False)
-    sns.boxplot(x='Rating', y='VADER_Sentiment_Compound', data=df, palette='viridis')
-    plt.title('VADER Sentiment Compound Score vs. Star Rating')
-    plt.savefig('vader_vs_star_rating.png')
-else:
-    print("Skipping VADER sentiment analysis as 'Review_Message' is not available.")
+def sentiment_stage(run):
+    df = run.df
+    print("\n--- 6. Sentiment Analysis (VADER) ---")
+    if run.chunk_totals is not None:
+        histogram = run.chunk_totals.sentiment_histogram
+    elif 'Review_Message' not in df.columns:
+        print("Skipping VADER sentiment analysis as 'Review_Message' is not available.")
+        return
+    else:
+        if 'VADER_Sentiment_Compound' in df.columns:
+            compound_scores, sentiment_labels = df['VADER_Sentiment_Compound'], df['VADER_Sentiment_Label']
+        else:
+            if not nltk_ready(SENTIMENT_RESOURCES):
+                return False
+            # Distinct texts only, with scores persisted across runs in the sentiment cache.
+            compound_scores = score_messages(df['Review_Message']).rename('VADER_Sentiment_Compound')
+            sentiment_labels = label_sentiment(compound_scores).rename('VADER_Sentiment_Label')
+        run.compound_scores = compound_scores
+        print(pd.concat([df[['Rating', 'Review_Message']].head(), compound_scores.head(), sentiment_labels.head()], axis=1))
+        histogram = sentiment_histogram(df['Rating'], compound_scores)
+    if histogram is None:
+        print("No sentiment scores to plot.")
+        return
+
+    # Both plots are drawn from the exact (rating, score) histogram rather than one value per review.
+    histogram_labels = label_sentiment(pd.Series(histogram.index.get_level_values('VADER_Sentiment_Compound'), index=histogram.index))
+    sentiment_counts = histogram.groupby(histogram_labels).sum().reindex(['Positive', 'Neutral', 'Negative'], fill_value=0).rename_axis('VADER_Sentiment_Label')
+    run.plot_jobs.append(PlotJob('vader_sentiment_distribution.png', render_count_bars, sentiment_counts,
+                                 title='Sentiment Distribution of Reviews (VADER)', xlabel='VADER_Sentiment_Label', ylabel='count', palette='coolwarm'))
+    run.plot_jobs.append(PlotJob('vader_vs_star_rating.png', render_boxplot, histogram.reset_index(), x='Rating', y='VADER_Sentiment_Compound',
+                                 weight='count', title='VADER Sentiment Compound Score vs. Star Rating', palette='viridis'))
+
 
 # --- 7. Developer Engagement Analysis ---
-print("\n--- 7. Developer Engagement Analysis ---")
-if 'Has_Developer_Reply' in df.columns:
-    if df['Has_Developer_Reply'].dtype == 'object':
-        df['Has_Developer_Reply'] = df['Has_Developer_Reply'].map({'Yes': True, 'No': False, True: True, False: False}).fillna(False)
-    reply_counts = df['Has_Developer_Reply'].value_counts(normalize=True) * 100
+def developer_engagement_stage(run):
+    monthly = run.monthly
+    print("\n--- 7. Developer Engagement Analysis ---")
+    if 'reply_count' not in monthly.columns:
+        print("Skipping Developer Engagement analysis as 'Has_Developer_Reply' is not available.")
+        return
+
+    # Reply shares come from the monthly reply counts, as the rating distribution does.
+    review_count, reply_count = monthly['review_count'].sum(), monthly['reply_count'].sum()
+    reply_counts = pd.Series({False: review_count - reply_count, True: reply_count}, name='proportion').rename_axis('Has_Developer_Reply')
+    reply_counts = reply_counts[reply_counts > 0].sort_values(ascending=False, kind='stable') / review_count * 100
     print("Percentage of Reviews with Developer Reply:")
     print(reply_counts)
     if not reply_counts.empty:
-        plt.figure(figsize=(7, 5))
-        # For Seaborn v0.14.0+ warnings:
-        # sns.barplot(x=reply_counts.index.astype(str), y=reply_counts.values, hue=reply_counts.index.astype(str), palette=['lightcoral', 'lightgreen'], legend=False)
-        sns.barplot(x=reply_counts.index, y=reply_counts.values, palette=['lightcoral', 'lightgreen'])
-        plt.title('Developer Reply Rate')
-        plt.xlabel('Has Developer Reply?')
-        plt.ylabel('Percentage of Reviews')
-        reply_index_labels = ['No Reply' if idx == False else 'Has Reply' for idx in reply_counts.index]
-        plt.xticks(ticks=range(len(reply_counts.index)), labels=reply_index_labels)
-        plt.savefig('developer_reply_rate.png')
-
-    reply_rate_by_rating = df.groupby('Rating')['Has_Developer_Reply'].mean() * 100
+        run.plot_jobs.append(PlotJob('developer_reply_rate.png', render_reply_rate, reply_counts))
+
+    rated = [rating for rating in RATING_VALUES if monthly[rating_count_column(rating)].sum() > 0]
+    reply_rate_by_rating = pd.Series([monthly[rating_reply_count_column(rating)].sum() / monthly[rating_count_column(rating)].sum() * 100 for rating in rated],
+                                     index=pd.Index(rated, name='Rating'), name='Has_Developer_Reply')
     if not reply_rate_by_rating.empty:
-        plt.figure(figsize=(10, 6))
-        reply_rate_by_rating.plot(kind='bar', color='skyblue')
-        plt.title('Developer Reply Rate by Star Rating')
-        plt.xlabel('Star Rating')
-        plt.ylabel('Percentage of Reviews with Reply (%)')
-        plt.xticks(rotation=0)
-        plt.grid(axis='y', linestyle='--')
-        plt.savefig('developer_reply_rate_by_rating.png')
-else:
-    print("Skipping Developer Engagement analysis as 'Has_Developer_Reply' is not available.")
+        run.plot_jobs.append(PlotJob('developer_reply_rate_by_rating.png', render_bars, reply_rate_by_rating,
+                                     title='Developer Reply Rate by Star Rating', xlabel='Star Rating', ylabel='Percentage of Reviews with Reply (%)'))
+
+
+def reply_latency_stage(run):
+    df = run.df
+    print("\n--- 7b. Developer Reply Latency and Templates ---")
+    if df is None:
+        print("Skipping reply latency analysis in chunked mode (percentiles need every review in memory).")
+        return
+    if 'Developer_Reply_Date' not in df.columns:
+        print("Skipping reply latency analysis as 'Developer_Reply_Date' is not available.")
+        return
+
+    # One vectorized subtraction gives every latency; the percentile tables are grouped views of it.
+    latency = reply_latency_hours(df)
+    reordered = df['Developer_Reply_Date'].notna().sum() - latency.notna().sum()
+    print(f"Reply latency in hours of {latency.notna().sum()} replies ({reordered} replies dated before their review were left out):")
+    tables = {'rating': latency_percentiles(latency, df['Rating'])}
+    print(tables['rating'].round(1).to_string())
+    if run.mention_flags is not None:
+        category_flags = run.mention_flags.rename(columns={mention_column(category): category_label(TAXONOMY, 'pain_points', category) for category in PAIN_POINT_KEYWORDS})
+        tables['category'] = category_latency_percentiles(latency, category_flags)
+        print(tables['category'].round(1).to_string())
+
+    is_template = None
+    if 'Developer_Reply_Message' in df.columns:
+        is_template, templates = template_replies(df['Developer_Reply_Message'])
+        replied = df['Developer_Reply_Message'].notna()
+        print(f"\n{len(templates)} reply templates cover {is_template.sum()} of {replied.sum()} replies ({is_template[replied].mean() * 100:.1f}%). Most used:")
+        for _, template in templates.head(3).iterrows():
+            print(f"- {template['Uses']}x: {template['Template_Text'][:100]!r}")
+    tables['month'] = monthly_reply_table(df, latency, is_template)
+
+    if REPLY_LATENCY_REPORT_PATH:
+        pd.concat(tables, names=['dimension', 'group']).to_csv(REPLY_LATENCY_REPORT_PATH)
+        print(f"Reply latency percentiles saved to '{REPLY_LATENCY_REPORT_PATH}'")
+
+    if not tables['rating'].empty:
+        run.plot_jobs.append(PlotJob('reply_latency_by_rating.png', render_bars, tables['rating'][['p50', 'p90']],
+                                     title='Developer Reply Time by Star Rating', xlabel='Star Rating', ylabel='Hours to Reply',
+                                     color=['skyblue', 'steelblue']))
+    monthly_replies = tables['month']
+    if len(monthly_replies) > 1:
+        run.plot_jobs.append(PlotJob('reply_latency_over_time.png', render_monthly_line, monthly_replies[['p50', 'p90']],
+                                     title='Developer Reply Time Over Time (Monthly)', ylabel='Hours to Reply', ylim_bottom=0))
+        if 'template_rate' in monthly_replies.columns:
+            run.plot_jobs.append(PlotJob('template_reply_rate.png', render_monthly_line, monthly_replies['template_rate'],
+                                         title='Share of Templated Developer Replies (Monthly)', ylabel='% of Replies', ylim=(0, 100)))
+    else:
+        print("Not enough data points or time range for monthly reply latency plots after date filtering.")
+
 
 # --- 8. PAIN POINT ANALYSIS OVER TIME ---
-print("\n--- 8. Pain Point Analysis Over Time ---")
-
-# Corrected condition for starting pain point analysis
-# df_time must exist, be indexed by Datetime, and have 'Processed_Message'
-if ('df_time' in locals() and isinstance(df_time.index, pd.DatetimeIndex) and
-    'Processed_Message' in df_time.columns and 'Processed_Message' in df.columns):
-
-    pain_point_keywords = {
-        'payment_issues': ['payment', 'payout', 'withdrawal', 'withdraw', 'money', 'amount', 'transaction', 'upi', 'bank', 'credit', 'stuck', 'pending', 'failed', 'delay'],
-        'customer_support': ['support', 'customer', 'care', 'service', 'helpline', 'help', 'response', 'reply', 'contact', 'call', 'resolve', 'query', 'agent', 'representative', 'team', 'executive'],
-        'app_performance': ['slow', 'lag', 'crash', 'bug', 'hang', 'error', 'freeze', 'stuck', 'loading', 'performance', 'issue', 'problem', 'working', 'opening', 'interface', 'ui', 'ux', 'navigation', 'update'],
-        'commission_earnings': ['commission', 'earning', 'income', 'incentive', 'rate', 'percentage', 'profit', 'benefit', 'referral', 'amount', 'low', 'less'],
-        'account_kyc': ['kyc', 'account', 'verification', 'document', 'profile', 'activation', 'login', 'register', 'block', 'suspend', 'otp', 'number', 'issue'],
-        'product_info_training': ['product', 'training', 'information', 'detail', 'knowledge', 'misleading', 'understand', 'learn', 'guidance', 'policy', 'explain', 'video', 'material'],
-        'lead_issues': ['lead', 'client', 'customer', 'conversion', 'fake', 'genuine', 'interest', 'quality', 'generate', 'provide']
-    }
-
-    pain_point_plot_dir = "pain_point_plots"
-    if not os.path.exists(pain_point_plot_dir):
-        os.makedirs(pain_point_plot_dir)
-
-    for category, keywords in pain_point_keywords.items():
-        print(f"\nAnalyzing pain point: {category.replace('_', ' ').title()}...")
-        pattern = r'\b(' + '|'.join(keywords) + r')\b'
-
-        # Ensure 'Processed_Message' is not all NaN or empty strings in df_time, which can happen if it wasn't populated correctly
-        if df_time['Processed_Message'].isna().all() or not df_time['Processed_Message'].str.strip().any():
-            print(f"  Warning: 'Processed_Message' in df_time is empty or all NaN for {category}. Skipping trend.")
-            df[f'mentions_{category}'] = False # Still create the column in df for consistency, but all False
-            if f'mentions_{category}' not in df_time.columns:
-                df_time[f'mentions_{category}'] = False
-            continue
+def pain_point_tagging_stage(run):
+    if run.chunk_totals is not None:
+        run.first_mentions = run.chunk_totals.first_mentions
+        return
+    df, processed_messages = run.df, run.processed_messages
+    # Resolve every category against the shared token ids instead of one regex scan per category.
+    if processed_messages.isna().all() or not processed_messages.str.strip().any():
+        print("  Warning: 'Processed_Message' is empty or all NaN. Skipping pain point trends.")
+    elif all(mention_column(category) in df.columns for category in PAIN_POINT_KEYWORDS):
+        run.mention_flags = df[[mention_column(category) for category in PAIN_POINT_KEYWORDS]]
+    else:
+        run.mention_flags = tag_pain_points(run.token_corpus, keyword_map('pain_points'))
+    if run.mention_flags is not None:
+        run.first_mentions = first_mention_dates(df['Review_Date'], run.mention_flags)
+
 
-        # Apply pattern to df for initial identification and counts (on original df)
-        df[f'mentions_{category}'] = df['Processed_Message'].str.contains(pattern, case=False, na=False)
-        # Apply pattern to df_time for time-series analysis
-        df_time[f'mentions_{category}'] = df_time['Processed_Message'].str.contains(pattern, case=False, na=False)
+def pain_point_stage(run):
+    first_mentions, monthly = run.first_mentions, run.monthly
+    print("\n--- 8. Pain Point Analysis Over Time ---")
 
+    pain_point_plot_dir = TAXONOMY['pain_points']['output_dir']
+    if not os.path.exists(pain_point_plot_dir):
+        os.makedirs(pain_point_plot_dir, exist_ok=True)
+
+    for category in PAIN_POINT_KEYWORDS:
+        print(f"\nAnalyzing pain point: {category_label(TAXONOMY, 'pain_points', category)}...")
+        if first_mentions is None:
+            continue
 
-        pain_point_reviews_df = df[df[f'mentions_{category}']]
-        total_mentions = pain_point_reviews_df.shape[0]
+        column = mention_column(category)
+        total_mentions = int(monthly[column].sum())
 
         if total_mentions > 0:
-            first_occurrence_date = pain_point_reviews_df['Review_Date'].min()
+            first_occurrence_date = first_mentions[column]
             print(f"  First noted: {first_occurrence_date.strftime('%Y-%m-%d') if pd.notnull(first_occurrence_date) else 'N/A'}")
             print(f"  Total mentions: {total_mentions}")
 
-            # monthly_total_reviews = df_time['Rating'].resample('M').count() # Old
-            # monthly_pain_point_mentions = df_time[df_time[f'mentions_{category}'] == True][f'mentions_{category}'].resample('M').count() # Old
-
-            monthly_total_reviews = df_time['Rating'].resample('ME').count() # New
-            monthly_pain_point_mentions = df_time[df_time[f'mentions_{category}'] == True][f'mentions_{category}'].resample('ME').count() # New
-
-
-            monthly_pain_point_mentions = monthly_pain_point_mentions.reindex(monthly_total_reviews.index, fill_value=0)
-            monthly_frequency_percent = (monthly_pain_point_mentions / monthly_total_reviews * 100).fillna(0)
+            # Share of each month's reviews, read from the monthly table instead of resampling per category.
+            monthly_frequency_percent = monthly[percent_column(column)]
 
             if not monthly_frequency_percent.empty and len(monthly_frequency_percent) > 1:
-                plt.figure(figsize=(12, 6))
-                monthly_frequency_percent.plot(kind='line', marker='o')
-                plt.title(f"Monthly Frequency of '{category.replace('_', ' ').title()}' Mentions")
-                plt.xlabel('Month')
-                plt.ylabel('% of Reviews Mentioning Pain Point')
-                plt.grid(True)
-                plt.ylim(bottom=0)
                 plot_filename = os.path.join(pain_point_plot_dir, f'trend_{category}.png')
-                plt.savefig(plot_filename)
-                print(f"  Trend plot saved to {plot_filename}")
+                run.plot_jobs.append(PlotJob(plot_filename, render_monthly_line, monthly_frequency_percent,
+                                             title=f"Monthly Frequency of '{category_label(TAXONOMY, 'pain_points', category)}' Mentions",
+                                             ylabel='% of Reviews Mentioning Pain Point', ylim_bottom=0))
+                print(f"  Trend plot queued: {plot_filename}")
             else:
                 print(f"  Not enough data points or time range to plot monthly trend for '{category}'.")
         else:
             print(f"  No reviews found mentioning keywords for '{category}'.")
-else:
-    print("Skipping Pain Point Analysis due to missing data or incorrect setup:")
-    if 'df_time' not in locals():
-        print("  - 'df_time' DataFrame not defined.")
-    elif not isinstance(df_time.index, pd.DatetimeIndex):
-        print("  - 'df_time' is not indexed by Datetime.")
-    if 'Processed_Message' not in df.columns:
-        print("  - 'Processed_Message' column missing in main DataFrame 'df'.")
-    if 'df_time' in locals() and 'Processed_Message' not in df_time.columns:
-        print("  - 'Processed_Message' column missing in 'df_time' DataFrame.")
-
-
-if any(plt.get_fignums()):
-    print("\nDisplaying generated plots...")
-    plt.show()
-else:
-    print("\nNo plots were generated to display.")
-
-print("\n--- Analysis Complete ---")
-print("Generated plots have been saved as PNG files in the script's directory and 'pain_point_plots' subdirectory.")
\ No newline at end of file
+
+
+# --- 8b. Daily Spike Alerts ---
+# Daily mention shares are streamed through a persisted EWMA/CUSUM detector, so a jump in e.g.
+# payment_issues alerts the day after it starts instead of showing up in a monthly plot.
+def spike_alert_stage(run):
+    print("\n--- 8b. Daily Pain Point Spike Alerts ---")
+    if run.chunk_totals is not None:
+        counts = run.chunk_totals.daily
+    elif run.mention_flags is not None:
+        counts = daily_counts(run.df['Review_Date'], run.df['Rating'], run.mention_flags)
+    else:
+        print("Skipping spike alerts as no pain point mentions are available.")
+        return
+    if counts is None or counts.empty:
+        print("No reviews to monitor.")
+        return
+
+    fingerprint = config_fingerprint(source=os.path.abspath(run.csv_path), keywords=keyword_map('pain_points'), fast_tokenizer=FAST_TOKENIZER)
+    detector = SpikeDetector.load(SPIKE_STATE_PATH, fingerprint=fingerprint)
+    alerts = detector.process(counts)
+    detector.save(SPIKE_STATE_PATH)
+    if ALERT_LOG_PATH:
+        append_alerts(alerts, ALERT_LOG_PATH)
+
+    print_from = (counts.index.max() - pd.Timedelta(days=ALERT_PRINT_DAYS - 1)).strftime('%Y-%m-%d')
+    recent = [alert for alert in alerts if alert['day'] >= print_from]
+    print(f"Monitored through {counts.index.max():%Y-%m-%d}: {len(alerts)} alerts, {len(recent)} in the last {ALERT_PRINT_DAYS} days.")
+    labels = {mention_column(category): category_label(TAXONOMY, 'pain_points', category) for category in PAIN_POINT_KEYWORDS}
+    labels[NEGATIVE_SERIES] = '1-2 star reviews'
+    for alert in recent:
+        print(f"  ALERT {alert['day']}{' (day in progress)' if alert['provisional'] else ''} {labels.get(alert['series'], alert['series'])}: "
+              f"{alert['count']} of {alert['reviews']} reviews ({alert['share']:.1f}%, usually {alert['baseline_share']:.1f}%), "
+              f"{alert['kind']} z={alert['z']:.1f} cusum={alert['cusum']:.1f}")
+
+
+# --- 9. Duplicate and Spam Reviews ---
+def duplicate_review_stage(run):
+    print("\n--- 9. Duplicate and Spam Reviews ---")
+    if run.clusters is None:
+        print("Skipping duplicate review analysis in chunked mode (clustering needs every review in memory).")
+        return
+    summary = cluster_summary(run.df, run.clusters, min_size=DUPLICATE_CLUSTER_MIN_SIZE)
+    print(f"{len(summary)} clusters of {DUPLICATE_CLUSTER_MIN_SIZE}+ identical or near-identical reviews cover {summary['Cluster_Size'].sum()} reviews.")
+    if not summary.empty:
+        print(summary.head(10)[['Cluster_Size', 'Distinct_Texts', 'First_Seen', 'Last_Seen', 'Representative_Message']].to_string())
+    if DUPLICATE_REPORT_PATH:
+        summary.to_csv(DUPLICATE_REPORT_PATH)
+        print(f"Duplicate clusters saved to '{DUPLICATE_REPORT_PATH}'")
+
+    if 'duplicate_rate' not in run.monthly.columns:
+        print("Monthly duplicate shares are not available (incremental mode). Skipping duplicate trend plot.")
+    elif len(run.monthly) > 1:
+        run.plot_jobs.append(PlotJob('duplicate_reviews_over_time.png', render_monthly_line, run.monthly['duplicate_rate'],
+                                     title='Share of Reviews Repeating an Earlier Review (Monthly)',
+                                     ylabel='% of Reviews', color='red', ylim_bottom=0))
+    else:
+        print("Not enough data points or time range for monthly duplicate plot after date filtering.")
+
+
+# --- 10. Emerging Complaint Topics ---
+# Topics are learned from the negative reviews without any keyword list, so complaints the
+# taxonomy does not know about yet show up as topics without a known category.
+def topic_stage(run):
+    df = run.df
+    print("\n--- 10. Emerging Complaint Topics ---")
+    if df is None:
+        print("Skipping topic discovery in chunked mode (topics are assigned over every negative review in memory).")
+        return
+    if run.token_corpus is None:
+        print("Skipping topic discovery as no processed messages are available.")
+        return
+    if not topic_modeling_available():
+        print("scikit-learn not installed; skipping topic discovery.")
+        return
+
+    fingerprint = config_fingerprint(source=os.path.abspath(run.csv_path), topics=TOPIC_COUNT, features=TOPIC_FEATURES,
+                                     ngram_orders=TOPIC_NGRAM_ORDERS, fast_tokenizer=FAST_TOKENIZER)
+    model = TopicModel.load(TOPIC_STATE_PATH, fingerprint=fingerprint)
+    negative = np.flatnonzero(df['Rating'].to_numpy() <= 2)
+    negative_dates = df['Review_Date'].iloc[negative]
+    # Reviews are sorted by date, so the ones the model has not seen yet are a tail slice.
+    new = negative if model.watermark is None else negative[negative_dates.searchsorted(model.watermark, side='right'):]
+    if len(new):
+        fitted = model.partial_fit(run.token_corpus.select(new), df['Review_Date'].iloc[new[-1]])
+        print(f"Topic model updated with {fitted} distinct negative reviews (now fitted up to {model.watermark})." if fitted else "Too few new negative reviews to start the topic model.")
+        model.save(TOPIC_STATE_PATH)
+    if not model.fitted:
+        print(f"Not enough distinct negative reviews to learn {TOPIC_COUNT} topics yet.")
+        return
+
+    topics = model.dominant_topics(run.token_corpus.select(negative))
+    volume = monthly_topic_volume(negative_dates, topics, model.n_topics)
+    # Keyed 'group.category' like monthly_category_counts: both groups have e.g. an app_performance category.
+    known_categories = {f'{group}.{category}': keywords for group in ('pain_points', 'review_problems')
+                        for category, keywords in keyword_map(group).items()}
+    summary = topic_summary(model.top_terms(), volume, known_categories)
+    print(summary[['Top_Terms', 'Reviews', 'Known_Category', 'Recent_Share', 'Growth']].to_string(float_format='{:.1f}'.format))
+    if TOPIC_REPORT_PATH:
+        summary.to_csv(TOPIC_REPORT_PATH)
+        print(f"Topic summary saved to '{TOPIC_REPORT_PATH}'")
+
+    if len(volume) > 1:
+        shown = summary.index[:TOPIC_PLOT_COUNT]
+        labels = {topic: f"{topic}: {', '.join(summary.at[topic, 'Top_Terms'].split(', ')[:3])}" for topic in shown}
+        run.plot_jobs.append(PlotJob('complaint_topics_over_time.png', render_monthly_line, volume[shown].rename(columns=labels),
+                                     title='Monthly Negative Reviews per Complaint Topic', ylabel='Number of Reviews', ylim_bottom=0))
+    else:
+        print("Not enough data points or time range for the monthly topic plot.")
+
+
+# --- Render Plots ---
+def render_stage(run):
+    print("\n--- Rendering Plots ---")
+    if run.plot_jobs:
+        # Concurrent stages queue their plots in completion order; render in a stable order.
+        render_plots(sorted(run.plot_jobs, key=lambda job: job.filename), workers=PLOT_WORKERS, manifest_path=PLOT_MANIFEST_PATH)
+    else:
+        print("No plots were generated.")
+
+
+# --- Stage Graph ---
+# Stage name -> (function, stages it needs). A stage returning False stops the run.
+STAGE_GRAPH = {
+    'load': (load_stage, ()),
+    'dedup': (dedup_stage, ('load',)),
+    'monthly': (monthly_stage, ('load',)),
+    'ratings': (rating_distribution_stage, ('monthly',)),
+    'volume': (review_volume_stage, ('monthly',)),
+    'preprocess': (preprocessing_stage, ('load',)),
+    'negative_ngrams': (negative_ngram_count_stage, ('preprocess',)),
+    'ngrams': (ngram_stage, ('negative_ngrams',)),
+    'wordcloud': (wordcloud_stage, ('negative_ngrams',)),
+    'sentiment': (sentiment_stage, ('load',)),
+    'engagement': (developer_engagement_stage, ('monthly',)),
+    'replies': (reply_latency_stage, ('load',)),
+    'tagging': (pain_point_tagging_stage, ('preprocess',)),
+    'painpoints': (pain_point_stage, ('tagging', 'monthly')),
+    'duplicates': (duplicate_review_stage, ('dedup', 'monthly')),
+    'spikes': (spike_alert_stage, ('tagging',)),
+    'topics': (topic_stage, ('preprocess',)),
+}
+# Stage name -> stages it reads from if they are part of the run, without pulling them in.
+OPTIONAL_INPUTS = {
+    'monthly': ('sentiment', 'tagging', 'dedup'),
+    'replies': ('tagging',),
+}
+# Stages that can be requested on the command line; the others only run as dependencies.
+SELECTABLE_STAGES = ['ratings', 'volume', 'preprocess', 'ngrams', 'wordcloud', 'sentiment', 'engagement', 'replies', 'painpoints', 'spikes', 'duplicates', 'topics']
+STAGE_WORKERS = 4 # Independent stages run concurrently in this many threads; 1 runs them in order
+
+
+def stage_inputs(name, names):
+    """The stages among names that stage name has to wait for."""
+    return set(STAGE_GRAPH[name][1] + OPTIONAL_INPUTS.get(name, ())) & set(names)
+
+
+def resolve_stages(selected):
+    """The selected stages plus everything they depend on, in a valid execution order."""
+    required = set()
+    def require(name):
+        if name not in required:
+            required.add(name)
+            for dependency in STAGE_GRAPH[name][1]:
+                require(dependency)
+    for name in selected:
+        require(name)
+
+    ordered = []
+    def visit(name):
+        if name in ordered:
+            return
+        for dependency in sorted(stage_inputs(name, required), key=list(STAGE_GRAPH).index):
+            visit(dependency)
+        ordered.append(name)
+    for name in STAGE_GRAPH:
+        if name in required:
+            visit(name)
+    return ordered
+
+
+def run_stages(run, names, profiler, workers=STAGE_WORKERS):
+    """
+    Runs the named stages, each as soon as its dependencies have finished.
+
+    Stages run in a thread pool: the heavy ones already fan their work out to process pools,
+    so threads are enough to overlap them (e.g. preprocessing with sentiment scoring).
+    After a stage fails, no further stages are started.
+
+    Returns:
+        bool: False if a stage failed.
+    """
+    def run_one(name):
+        with profiler.stage(name, rows_in=run.row_count()) as record:
+            completed = STAGE_GRAPH[name][0](run)
+            record['rows_out'] = run.row_count()
+        return completed is not False
+
+    if workers <= 1:
+        return all(run_one(name) for name in names)
+
+    pending = {name: stage_inputs(name, names) for name in names}
+    done, running, succeeded = set(), {}, True
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while running or (pending and succeeded):
+            if succeeded:
+                for name in [name for name, dependencies in pending.items() if dependencies <= done]:
+                    del pending[name]
+                    running[executor.submit(run_one, name)] = name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done.add(running.pop(future))
+                succeeded = future.result() and succeeded
+    return succeeded
+
+
+def main(csv_path=None, stages=None, stage_workers=None, profile_report_path=None, profile_stats_dir=None):
+    """
+    Runs the selected stages (default: all) on csv_path, renders their plots and returns the
+    StageProfiler holding the stage timings.
+
+    Arguments left as None fall back to CSV_FILE_PATH, SELECTABLE_STAGES, STAGE_WORKERS,
+    PROFILE_REPORT_PATH and PROFILE_STATS_DIR.
+    """
+    profile_report_path = profile_report_path or PROFILE_REPORT_PATH
+    profile_stats_dir = profile_stats_dir or PROFILE_STATS_DIR
+    stage_workers = stage_workers or STAGE_WORKERS
+    if profile_stats_dir:
+        stage_workers = 1 # cProfile can only follow one stage at a time
+    run = AnalysisRun(csv_path or CSV_FILE_PATH)
+    profiler = StageProfiler(trace_memory=PROFILE_MEMORY, profile_dir=profile_stats_dir)
+
+    if run_stages(run, resolve_stages(stages or SELECTABLE_STAGES), profiler, workers=stage_workers):
+        with profiler.stage('render', rows_in=run.row_count()) as record:
+            render_stage(run)
+            record['rows_out'] = run.row_count()
+
+    profiler.print_summary()
+    if profile_report_path:
+        profiler.dump_json(profile_report_path)
+
+    print("\n--- Analysis Complete ---")
+    print("Generated plots have been saved as PNG files in the script's directory and 'pain_point_plots' subdirectory.")
+    return profiler
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze GroMo Play Store reviews and plot the findings.")
+    parser.add_argument('csv_path', nargs='?', default=None, help=f"Review CSV to analyze (default: CSV_FILE_PATH, {CSV_FILE_PATH}).")
+    parser.add_argument('--stages', nargs='+', choices=SELECTABLE_STAGES, metavar='STAGE',
+                        help=f"Stages to run, with their dependencies (default: all). Choices: {', '.join(SELECTABLE_STAGES)}.")
+    parser.add_argument('--workers', type=int, default=None, help=f"Stages to run concurrently (default: {STAGE_WORKERS}).")
+    parser.add_argument('--profile-report', default=None, help="Write the per-stage timings to this JSON file.")
+    parser.add_argument('--profile-stats-dir', default=None, help="Write a cProfile .pstats file per stage to this directory (runs stages one at a time).")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(csv_path=args.csv_path, stages=args.stages, stage_workers=args.workers,
+         profile_report_path=args.profile_report, profile_stats_dir=args.profile_stats_dir)
@@ -0,0 +1,192 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+SHINGLE_SIZE = 4  # Characters per shingle of the normalized text
+NUM_PERMUTATIONS = 64  # MinHash signature length
+LSH_BANDS = 16  # Signature bands; two texts become candidates when any band matches exactly
+SIMILARITY_THRESHOLD = 0.8  # Estimated Jaccard similarity from which two texts are near duplicates
+MINHASH_SEED = 17
+
+NON_WORD_PATTERN = re.compile(r'[\W_]+')
+
+
+def normalize_text(text):
+    """Lowercases text and collapses every run of punctuation and whitespace to a single space."""
+    if pd.isna(text): return ""
+    return NON_WORD_PATTERN.sub(' ', str(text).lower()).strip()
+
+
+def _shingle_hashes(texts, size, rng):
+    # All texts are joined into one array of code points, each followed by size - 1 zeros so
+    # that no shingle spans two texts (and a text shorter than size is one padded shingle).
+    # A shingle hashes to a random linear combination of its code points, mixed to 64 bits.
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    padding = '\0' * (size - 1)
+    code_points = np.frombuffer((padding.join(texts) + padding).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+    shingle_counts = np.maximum(lengths - size + 1, 1)
+    text_offsets = np.concatenate(([0], np.cumsum(lengths + size - 1)[:-1]))
+    shingle_starts = np.concatenate(([0], np.cumsum(shingle_counts)[:-1]))
+    positions = np.arange(shingle_counts.sum()) + np.repeat(text_offsets - shingle_starts, shingle_counts)
+
+    weights = rng.integers(0, np.iinfo(np.uint64).max, size=size, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    for k in range(size):
+        hashes += code_points[positions + k] * weights[k]
+    hashes ^= hashes >> np.uint64(31)
+    return hashes, shingle_starts
+
+
+def minhash_signatures(texts, num_permutations=NUM_PERMUTATIONS, shingle_size=SHINGLE_SIZE, seed=MINHASH_SEED):
+    """
+    MinHash signatures of the character shingle sets of texts.
+
+    Shingles are hashed for all texts at once, each permutation is a multiply-shift hash of
+    the shingle hashes, and the minimum per text is taken with np.minimum.reduceat, so the
+    cost is one vectorized pass over all shingles per permutation. A shingle occurring twice
+    in a text cannot change its minimum, so no per-text shingle sets are built.
+
+    Args:
+        texts (list): Non-empty normalized texts.
+        num_permutations (int): Signature length.
+        shingle_size (int): Characters per shingle (shorter texts are one shingle).
+        seed (int): Seed of the hash functions; signatures are only comparable with the same seed.
+
+    Returns:
+        np.ndarray: uint32 array of shape (len(texts), num_permutations).
+    """
+    rng = np.random.default_rng(seed)
+    hashes, starts = _shingle_hashes(texts, shingle_size, rng)
+    multipliers = rng.integers(0, np.iinfo(np.uint64).max, size=num_permutations, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    offsets = rng.integers(0, np.iinfo(np.uint64).max, size=num_permutations, dtype=np.uint64, endpoint=True)
+    signatures = np.empty((len(texts), num_permutations), dtype=np.uint32)
+    permuted = np.empty_like(hashes)
+    for i in range(num_permutations):
+        # uint64 arithmetic wraps, which is exactly the mod 2**64 of multiply-shift hashing.
+        np.multiply(hashes, multipliers[i], out=permuted)
+        permuted += offsets[i]
+        permuted >>= np.uint64(32)
+        signatures[:, i] = np.minimum.reduceat(permuted, starts)
+    return signatures
+
+
+def near_duplicate_pairs(signatures, bands=LSH_BANDS, threshold=SIMILARITY_THRESHOLD):
+    """
+    Pairs of signatures whose estimated Jaccard similarity is at least threshold.
+
+    Locality-sensitive hashing: the signature is cut into bands, texts agreeing on a whole
+    band are candidates, and every candidate is checked against the first text of its
+    bucket by the fraction of agreeing signature positions.
+
+    Returns:
+        tuple: (left, right) int arrays of row numbers in signatures.
+    """
+    rows_per_band = signatures.shape[1] // bands
+    row_numbers = np.arange(len(signatures))
+    # Each band is folded into one uint64 bucket key; a rare key collision only adds a
+    # candidate, which the similarity check below rejects.
+    key_weights = np.random.default_rng(MINHASH_SEED).integers(0, np.iinfo(np.uint64).max, size=rows_per_band, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    left, right = [], []
+    for band in range(bands):
+        keys = signatures[:, band * rows_per_band:(band + 1) * rows_per_band].astype(np.uint64) @ key_weights
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        anchors = first[inverse]
+        candidates = anchors != row_numbers
+        left.append(anchors[candidates])
+        right.append(row_numbers[candidates])
+    pair_keys = np.unique(np.concatenate(left) * len(signatures) + np.concatenate(right))
+    left, right = pair_keys // len(signatures), pair_keys % len(signatures)
+    similarity = (signatures[left] == signatures[right]).mean(axis=1)
+    keep = similarity >= threshold
+    return left[keep], right[keep]
+
+
+def _component_labels(count, left, right):
+    # Every node ends up labelled with the smallest node of its connected component:
+    # pairs pull both ends down to the smaller label, pointer jumping shortens the chains.
+    labels = np.arange(count)
+    while True:
+        previous = labels.copy()
+        smaller = np.minimum(labels[left], labels[right])
+        np.minimum.at(labels, left, smaller)
+        np.minimum.at(labels, right, smaller)
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def cluster_reviews(texts, threshold=SIMILARITY_THRESHOLD, num_permutations=NUM_PERMUTATIONS, bands=LSH_BANDS):
+    """
+    Groups identical and near-identical review texts into clusters.
+
+    Texts are normalized (case, punctuation and spacing ignored) and collapsed exactly; the
+    distinct normalized texts are then linked by MinHash/LSH when their estimated Jaccard
+    similarity over character shingles reaches threshold, and clusters are the connected
+    groups of linked texts. Missing and empty texts stay singletons.
+
+    Args:
+        texts (pd.Series): Review messages, in row order (oldest first for loaded reviews).
+        threshold (float): Near-duplicate similarity; None or 1 clusters exact duplicates only.
+        num_permutations (int): MinHash signature length.
+        bands (int): LSH bands (must divide num_permutations).
+
+    Returns:
+        pd.DataFrame: Aligned with texts: 'Cluster_Id', the row position of the cluster's first
+        review (its representative), and 'Cluster_Size', the number of reviews in the cluster.
+    """
+    codes, uniques = pd.factorize(texts)
+    normalized_codes, normalized_uniques = pd.factorize(pd.Series([normalize_text(text) for text in uniques], dtype=object))
+    # Row -> distinct normalized text, or -1 for missing texts.
+    row_codes = np.where(codes >= 0, normalized_codes[codes] if len(uniques) else codes, -1)
+
+    labels = np.arange(len(normalized_uniques))
+    if threshold is not None and threshold < 1:
+        nonempty = np.flatnonzero(normalized_uniques.str.len().to_numpy() > 0)
+        if len(nonempty) > 1:
+            signatures = minhash_signatures([normalized_uniques[i] for i in nonempty], num_permutations=num_permutations)
+            left, right = near_duplicate_pairs(signatures, bands=bands, threshold=threshold)
+            labels[nonempty] = nonempty[_component_labels(len(nonempty), left, right)]
+
+    group_keys = np.where(row_codes >= 0, labels[row_codes], -1)
+    empty_codes = np.flatnonzero(normalized_uniques.str.len().to_numpy() == 0)
+    singletons = (row_codes < 0) | np.isin(row_codes, empty_codes)
+    group_keys[singletons] = len(normalized_uniques) + np.flatnonzero(singletons)
+
+    _, first, inverse = np.unique(group_keys, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    return pd.DataFrame({'Cluster_Id': first[inverse], 'Cluster_Size': np.bincount(inverse)[inverse]}, index=texts.index)
+
+
+def cluster_summary(reviews, clusters, min_size=2):
+    """
+    One row per cluster of at least min_size reviews, largest first: the possible spam or
+    brigading campaigns.
+
+    Args:
+        reviews (pd.DataFrame): Typed reviews, aligned with clusters.
+        clusters (pd.DataFrame): Output of cluster_reviews.
+        min_size (int): Smallest cluster listed.
+
+    Returns:
+        pd.DataFrame: Indexed by 'Cluster_Id', with the cluster size, the representative
+        message, the number of distinct texts, the first and last review date, the average
+        rating and (if reviews has 'User_Name') the number of distinct reviewer names.
+    """
+    members = clusters['Cluster_Size'] >= min_size
+    cluster_ids = clusters.loc[members, 'Cluster_Id']
+    grouped = reviews.loc[members].groupby(cluster_ids, sort=False)
+    summary = pd.DataFrame({
+        'Cluster_Size': grouped.size(),
+        'Distinct_Texts': grouped['Review_Message'].nunique(),
+        'First_Seen': grouped['Review_Date'].min(),
+        'Last_Seen': grouped['Review_Date'].max(),
+        'Average_Rating': grouped['Rating'].mean(),
+    })
+    if 'User_Name' in reviews.columns:
+        summary['Distinct_Users'] = grouped['User_Name'].nunique()
+    summary.insert(1, 'Representative_Message', reviews['Review_Message'].iloc[summary.index].to_numpy())
+    summary.index.name = 'Cluster_Id'
+    return summary.sort_values(['Cluster_Size', 'First_Seen'], ascending=[False, True], kind='stable')
@@ -0,0 +1,134 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+from collections import Counter
+
+import pandas as pd
+
+from monthly_aggregation import add_aggregates, monthly_aggregates
+
+# --- Configuration ---
+STATE_DIR = os.path.join('.review_cache', 'incremental')
+# Bump whenever the layout of the persisted state changes.
+STATE_VERSION = 3
+STATE_FILENAME = 'state.pkl'
+ROWS_PART_PATTERN = 'rows_{:05d}.pkl'
+
+
+def config_fingerprint(**settings):
+    """
+    Short hash of the settings that shape the derived data (keywords, stopwords, ...).
+
+    A state built with different settings is discarded rather than mixed with new rows.
+    """
+    payload = json.dumps(settings, sort_keys=True, default=sorted)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class IncrementalState:
+    """
+    Derived review data persisted between runs so only newly scraped reviews are processed.
+
+    The state keeps the enriched rows folded in so far (processed messages, sentiment
+    scores, mention flags), additive monthly aggregates, n-gram counts for negative
+    reviews and the watermark: the latest 'Review_Date' already folded in. Rows are
+    stored as append-only part files, so folding in a day of reviews never rewrites the
+    history.
+
+    Reviews edited after they were folded in, or backfilled with a date at or before
+    the watermark, are not picked up; delete the state directory to rebuild from scratch.
+    """
+
+    def __init__(self, state_dir=STATE_DIR, fingerprint=None):
+        self.state_dir = state_dir
+        self.fingerprint = fingerprint
+        self.watermark = None
+        self.rows = None
+        self.monthly = None
+        self.ngram_counts = {}
+        self._part_count = 0
+        self._pending_rows = None
+
+    @classmethod
+    def load(cls, state_dir=STATE_DIR, fingerprint=None):
+        """
+        Loads the state in state_dir, or returns an empty state if there is none or it was
+        built with a different fingerprint.
+        """
+        state = cls(state_dir, fingerprint)
+        try:
+            with open(os.path.join(state_dir, STATE_FILENAME), mode='rb') as infile:
+                saved = pickle.load(infile)
+        except FileNotFoundError:
+            return state
+
+        if saved.get('version') != STATE_VERSION or saved.get('fingerprint') != fingerprint:
+            print(f"Incremental state in '{state_dir}' was built with different settings; rebuilding from scratch.")
+            state._clear()
+            return state
+
+        part_paths = [os.path.join(state_dir, ROWS_PART_PATTERN.format(i)) for i in range(saved['part_count'])]
+        state.rows = pd.concat([pd.read_pickle(path) for path in part_paths], ignore_index=True) if part_paths else None
+        state.monthly = saved['monthly']
+        state.ngram_counts = saved['ngram_counts']
+        state.watermark = saved['watermark']
+        state._part_count = saved['part_count']
+        return state
+
+    def _clear(self):
+        for path in glob.glob(os.path.join(self.state_dir, 'rows_*.pkl')) + [os.path.join(self.state_dir, STATE_FILENAME)]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def select_new(self, df):
+        """Rows of df dated after the watermark (all rows if nothing was folded in yet); df is sorted by 'Review_Date'."""
+        if self.watermark is None:
+            return df.copy()
+        return df.iloc[df['Review_Date'].searchsorted(self.watermark, side='right'):].copy()
+
+    def fold_in(self, new_rows, mention_columns, ngram_counts):
+        """
+        Adds already-enriched new_rows and their n-gram counts to the state.
+
+        Args:
+            new_rows (pd.DataFrame): Rows returned by select_new, with derived columns added.
+            mention_columns (list): Boolean mentions_* columns to aggregate monthly.
+            ngram_counts (dict): Order -> Counter for the negative reviews among new_rows.
+        """
+        if new_rows.empty:
+            return
+        new_rows = new_rows.reset_index(drop=True)
+        self.rows = new_rows if self.rows is None else pd.concat([self.rows, new_rows], ignore_index=True)
+
+        self.monthly = add_aggregates(self.monthly, monthly_aggregates(new_rows, mention_columns))
+
+        for n, counts in ngram_counts.items():
+            self.ngram_counts.setdefault(n, Counter()).update(counts)
+
+        self.watermark = new_rows['Review_Date'].max() if self.watermark is None else max(self.watermark, new_rows['Review_Date'].max())
+        self._pending_rows = new_rows if self._pending_rows is None else pd.concat([self._pending_rows, new_rows], ignore_index=True)
+
+    def save(self):
+        """Writes the pending row part (if any), then the aggregates and watermark."""
+        os.makedirs(self.state_dir, exist_ok=True)
+        if self._pending_rows is not None:
+            self._pending_rows.to_pickle(os.path.join(self.state_dir, ROWS_PART_PATTERN.format(self._part_count)))
+            self._part_count += 1
+            self._pending_rows = None
+
+        # state.pkl is replaced atomically and last, so an interrupted save leaves the previous
+        # state readable (an orphaned row part is simply overwritten next time).
+        state_path = os.path.join(self.state_dir, STATE_FILENAME)
+        tmp_path = state_path + '.tmp'
+        with open(tmp_path, mode='wb') as outfile:
+            pickle.dump({
+                'version': STATE_VERSION,
+                'fingerprint': self.fingerprint,
+                'watermark': self.watermark,
+                'part_count': self._part_count,
+                'monthly': self.monthly,
+                'ngram_counts': self.ngram_counts,
+            }, outfile)
+        os.replace(tmp_path, state_path)
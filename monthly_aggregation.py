@@ -0,0 +1,115 @@
+import pandas as pd
+
+# --- Configuration ---
+RATING_VALUES = (1, 2, 3, 4, 5)
+SENTIMENT_COLUMN = 'VADER_Sentiment_Compound'
+FLOAT_SUM_COLUMNS = ('sentiment_sum',)  # Every other aggregate is a count (or the rating sum), kept as int64
+
+
+def rating_count_column(rating):
+    """Name of the monthly column counting reviews with the given star rating."""
+    return f'rating_{rating}_count'
+
+
+def rating_reply_count_column(rating):
+    """Name of the monthly column counting replied-to reviews with the given star rating."""
+    return f'rating_{rating}_reply_count'
+
+
+def percent_column(column):
+    """Name of the monthly column giving column as a percentage of the month's reviews."""
+    return f'{column}_percent'
+
+
+def month_end_index(periods):
+    """Converts monthly periods to the month-end timestamps produced by resample('ME')."""
+    return periods.to_timestamp(how='end').normalize()
+
+
+def monthly_aggregates(rows, mention_columns=()):
+    """
+    Additive per-month aggregates for rows, computed in one grouped pass.
+
+    Every column is a sum, so aggregates of disjoint sets of rows can simply be added
+    (see IncrementalState.fold_in): review count, rating sum, count per star rating,
+    reply count overall and per star rating, sentiment sum and count, duplicate count, and the number of reviews flagged
+    by each of mention_columns. The reply, sentiment and duplicate columns are only produced
+    when rows has 'Has_Developer_Reply', 'VADER_Sentiment_Compound' and 'Is_Duplicate'.
+
+    Args:
+        rows (pd.DataFrame): Reviews with 'Review_Date', 'Rating' and optionally the columns above.
+        mention_columns (iterable): Boolean mentions_* columns of rows to count.
+
+    Returns:
+        pd.DataFrame: One row per calendar month present in rows, indexed by Period.
+    """
+    months = rows['Review_Date'].dt.to_period('M').rename('Month')
+    ratings = rows['Rating']
+    # Flags stay bool and ratings int8, so the table being grouped is a fraction of the size
+    # of an all-int64 one. groupby keeps int8 sums for small inputs, so the sums are widened
+    # afterwards (_as_counts).
+    columns = {
+        'review_count': ratings.notna(),
+        'rating_sum': ratings,
+    }
+    for rating in RATING_VALUES:
+        columns[rating_count_column(rating)] = ratings == rating
+    if 'Has_Developer_Reply' in rows.columns:
+        columns['reply_count'] = rows['Has_Developer_Reply']
+        for rating in RATING_VALUES:
+            columns[rating_reply_count_column(rating)] = rows['Has_Developer_Reply'] & (ratings == rating)
+    if SENTIMENT_COLUMN in rows.columns:
+        columns['sentiment_sum'] = rows[SENTIMENT_COLUMN].fillna(0.0)
+        columns['sentiment_count'] = rows[SENTIMENT_COLUMN].notna()
+    if 'Is_Duplicate' in rows.columns:
+        columns['duplicate_count'] = rows['Is_Duplicate']
+    for column in mention_columns:
+        columns[column] = rows[column]
+    return _as_counts(pd.DataFrame(columns).groupby(months).sum())
+
+
+def _as_counts(aggregates):
+    return aggregates.astype({column: 'int64' for column in aggregates.columns if column not in FLOAT_SUM_COLUMNS})
+
+
+def add_aggregates(aggregates, other):
+    """Sums two monthly_aggregates results, keeping the count columns int64."""
+    if aggregates is None:
+        return other
+    return _as_counts(aggregates.add(other, fill_value=0))
+
+
+def monthly_table(aggregates):
+    """
+    The wide monthly table every monthly plot and report reads from.
+
+    Covers every month from the first to the last in aggregates (months without reviews
+    get zero counts), indexed by month-end timestamps like resample('ME'), with these
+    columns added to the aggregates: 'average_rating', 'reply_rate' (%), 'average_sentiment',
+    'duplicate_rate' (%) and a percent_column() share of reviews for every mention count. Averages of months
+    without reviews are NaN; percentages are 0.
+
+    Args:
+        aggregates (pd.DataFrame): Output of monthly_aggregates (or a sum of several).
+
+    Returns:
+        pd.DataFrame: The monthly table (empty if aggregates is None or empty).
+    """
+    if aggregates is None or aggregates.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], freq='ME'))
+    full_range = pd.period_range(aggregates.index.min(), aggregates.index.max(), freq='M')
+    table = aggregates.reindex(full_range, fill_value=0)
+    table.index = month_end_index(table.index)
+    table.index.freq = 'ME'
+
+    review_count = table['review_count'].where(table['review_count'] > 0)
+    table['average_rating'] = table['rating_sum'] / review_count
+    if 'reply_count' in table.columns:
+        table['reply_rate'] = table['reply_count'] / review_count * 100
+    if 'sentiment_count' in table.columns:
+        table['average_sentiment'] = table['sentiment_sum'] / table['sentiment_count'].where(table['sentiment_count'] > 0)
+    if 'duplicate_count' in table.columns:
+        table['duplicate_rate'] = table['duplicate_count'] / review_count * 100
+    for column in [column for column in aggregates.columns if column.startswith('mentions_')]:
+        table[percent_column(column)] = (table[column] / review_count * 100).fillna(0)
+    return table
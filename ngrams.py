@@ -0,0 +1,118 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from token_corpus import TokenCorpus, tokenize
+
+# --- Configuration ---
+HASHED_N_FEATURES = 2 ** 20
+
+
+def _doc_ngrams(tokens, n):
+    if n == 1:
+        return tokens
+    return [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+
+
+def _weighted_token_lists(corpus, stop_words):
+    # Identical documents are tokenized once and counted with their multiplicity, in order of
+    # first appearance; a TokenCorpus only has its token ids looked up.
+    if isinstance(corpus, TokenCorpus):
+        docs, weights, _ = corpus.weighted_docs()
+        for doc, weight in zip(docs.tolist(), weights.tolist()):
+            tokens = corpus.vocabulary[corpus.token_ids[corpus.offsets[doc]:corpus.offsets[doc + 1]]].tolist()
+            yield [token for token in tokens if token not in stop_words] if stop_words else tokens, weight
+        return
+    codes, uniques = pd.factorize(corpus)
+    weights = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    for doc, weight in zip(uniques, weights.tolist()):
+        yield tokenize(doc, stop_words), weight
+
+
+def count_ngrams(corpus, orders=(1, 2, 3), stop_words=None, first_seen=None):
+    """
+    Counts n-grams of several orders with a single tokenization pass over corpus.
+
+    Args:
+        corpus (pd.Series or TokenCorpus): Documents (e.g. processed review messages), or
+            their already tokenized corpus.
+        orders (tuple): N-gram orders to count.
+        stop_words (set): Tokens removed before n-grams are formed.
+        first_seen (dict): If given, filled with order -> {ngram: position in corpus of the
+            first document containing it}, in the same order as the counters.
+
+    Returns:
+        dict: Order -> Counter of n-gram string -> frequency. Counters keep first-seen
+        order, so most_common() breaks ties exactly like sorting CountVectorizer output.
+    """
+    if not isinstance(corpus, TokenCorpus):
+        corpus = TokenCorpus.from_texts(corpus)
+    return corpus.ngram_counts(orders=orders, stop_words=stop_words, first_seen=first_seen)
+
+
+def _bucket(ngram, n_features):
+    # crc32 is stable across processes, unlike hash() on str.
+    return zlib.crc32(ngram.encode('utf-8')) % n_features
+
+
+def _top_hashed_ngrams(corpus, orders, top_n, stop_words, n_features):
+    bucket_counts = {n: np.zeros(n_features, dtype=np.int64) for n in orders}
+    for tokens, weight in _weighted_token_lists(corpus, stop_words):
+        for n in orders:
+            buckets = [_bucket(ngram, n_features) for ngram in _doc_ngrams(tokens, n)]
+            np.add.at(bucket_counts[n], buckets, weight)
+
+    wanted = {}
+    for n in orders:
+        counts = bucket_counts[n]
+        k = min(top_n, np.count_nonzero(counts))
+        if k == 0:
+            wanted[n] = np.array([], dtype=np.int64)
+            continue
+        top = np.argpartition(counts, -k)[-k:]
+        wanted[n] = top[np.argsort(-counts[top], kind='stable')]
+
+    # Second streaming pass: label each winning bucket with the first n-gram that hashes to it.
+    labels = {n: {} for n in orders}
+    wanted_sets = {n: set(wanted[n].tolist()) for n in orders}
+    for tokens, _ in _weighted_token_lists(corpus, stop_words):
+        if all(len(labels[n]) == len(wanted_sets[n]) for n in orders):
+            break
+        for n in orders:
+            for ngram in _doc_ngrams(tokens, n):
+                bucket = _bucket(ngram, n_features)
+                if bucket in wanted_sets[n] and bucket not in labels[n]:
+                    labels[n][bucket] = ngram
+
+    return {n: [(labels[n][bucket], int(bucket_counts[n][bucket])) for bucket in wanted[n]] for n in orders}
+
+
+def top_ngrams(corpus, orders=(1, 2, 3), top_n=20, stop_words=None, hashed=False, n_features=HASHED_N_FEATURES):
+    """
+    Returns the top_n most frequent n-grams of each order in corpus.
+
+    In the default exact mode every distinct n-gram is counted (see TokenCorpus.ngram_counts)
+    and the top_n are selected with a bounded heap. In hashed mode n-grams are counted into
+    n_features fixed buckets per order, so the count tables stay the same size however many
+    distinct n-grams there are; the winning buckets are labelled in a second pass. Only the
+    count tables are bounded: the input itself (the distinct documents and, for a
+    TokenCorpus, its token vocabulary) is still held in memory. Hash collisions can inflate
+    hashed counts slightly.
+
+    Args:
+        corpus (pd.Series or TokenCorpus): Documents (e.g. processed review messages), or
+            their already tokenized corpus.
+        orders (tuple): N-gram orders to report.
+        top_n (int): Number of n-grams to keep per order.
+        stop_words (set): Tokens removed before n-grams are formed.
+        hashed (bool): Count into fixed-size hashed tables instead of one entry per n-gram.
+        n_features (int): Number of hash buckets per order in hashed mode.
+
+    Returns:
+        dict: Order -> list of (ngram, frequency), most frequent first.
+    """
+    if hashed:
+        return _top_hashed_ngrams(corpus, orders, top_n, stop_words, n_features)
+    counts = count_ngrams(corpus, orders, stop_words)
+    return {n: counts[n].most_common(top_n) for n in orders}
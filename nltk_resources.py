@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+
+# --- Configuration ---
+# NLTK data each stage needs, as download name -> nltk.data.find path.
+# word_tokenize has loaded its models from punkt_tab (not punkt) since NLTK 3.8.2.
+NLTK_RESOURCES = {
+    'punkt_tab': 'tokenizers/punkt_tab/english/',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+}
+PREPROCESSING_RESOURCES = ('punkt_tab', 'stopwords', 'wordnet')
+SENTIMENT_RESOURCES = ('vader_lexicon',)
+NLTK_MANIFEST_PATH = os.path.join('.review_cache', 'nltk_resources.json')
+
+_manifest_lock = threading.Lock()
+
+
+def _load_manifest(manifest_path):
+    try:
+        with open(manifest_path, mode='r', encoding='utf-8') as infile:
+            return json.load(infile)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest_path, manifest):
+    # Written to a temporary file and swapped in, so a concurrent reader never sees a partial manifest.
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+    descriptor, tmp_path = tempfile.mkstemp(prefix=os.path.basename(manifest_path) + '.', suffix='.tmp', dir=manifest_dir or '.')
+    with open(descriptor, mode='w', encoding='utf-8') as outfile:
+        json.dump(manifest, outfile, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _pointer_path(pointer):
+    # nltk.data.find returns a FileSystemPathPointer (.path) or, for zipped data, a ZipFilePathPointer.
+    if hasattr(pointer, 'path'):
+        return pointer.path
+    return pointer.zipfile.filename
+
+
+def _is_resource_path(name, path):
+    # The resource's own file or directory, unpacked ('corpora/wordnet') or as the zip NLTK
+    # reads it from ('corpora/wordnet.zip'). Anything else, such as an nltk_data root recorded
+    # by an older manifest, would make nltk_data_fingerprint hash unrelated files.
+    if not path or not os.path.exists(path):
+        return False
+    parts = NLTK_RESOURCES[name].strip('/').split('/')
+    suffixes = (os.path.join(*parts), os.path.join(*parts[:2]) + '.zip')
+    path = os.path.normpath(path)
+    return any(path.endswith(os.sep + suffix) for suffix in suffixes)
+
+
+def nltk_resource_path(name, manifest_path=NLTK_MANIFEST_PATH):
+    """
+    Where the NLTK data name (a key of NLTK_RESOURCES) is installed: the manifest's entry
+    while it still exists and names that resource, otherwise looked up with NLTK.
+
+    Raises:
+        LookupError: If the resource is not installed.
+    """
+    manifest = _load_manifest(manifest_path)
+    if _is_resource_path(name, manifest.get(name)):
+        return manifest[name]
+    import nltk
+    return _pointer_path(nltk.data.find(NLTK_RESOURCES[name]))
+
+
+def _path_digest(digest, path):
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                _path_digest(digest, os.path.join(root, name))
+        return
+    with open(path, mode='rb') as infile:
+        for block in iter(lambda: infile.read(1 << 20), b''):
+            digest.update(block)
+
+
+@lru_cache(maxsize=None)
+def nltk_data_fingerprint(names, manifest_path=NLTK_MANIFEST_PATH):
+    """
+    Identifies the NLTK code and data behind cached results: the installed NLTK version and
+    the SHA-1 of the files of every resource in names (a tuple of NLTK_RESOURCES keys).
+    Upgrading NLTK or reinstalling the data gives a different fingerprint.
+
+    Raises:
+        LookupError: If a resource is not installed.
+    """
+    try:
+        nltk_version = version('nltk')
+    except PackageNotFoundError:
+        nltk_version = 'unknown'
+    digest = hashlib.sha1()
+    for name in names:
+        _path_digest(digest, nltk_resource_path(name, manifest_path=manifest_path))
+    return f"nltk-{nltk_version}:{digest.hexdigest()[:16]}"
+
+
+def ensure_nltk_resources(names, manifest_path=NLTK_MANIFEST_PATH, allow_download=False):
+    """
+    Makes sure the NLTK data in names is installed, without importing NLTK when possible.
+
+    Where each resource was found is recorded in a small JSON manifest. While every recorded
+    location still exists and is that resource's own file or directory, the check is a few
+    os.path.exists calls; otherwise NLTK is imported and the resources are looked up again
+    (and downloaded only if allow_download is set).
+
+    Args:
+        names (iterable): Keys of NLTK_RESOURCES.
+        manifest_path (str): JSON file caching where each resource was found.
+        allow_download (bool): Download missing resources instead of failing.
+
+    Raises:
+        LookupError: If a resource is missing and allow_download is False (or the download failed).
+    """
+    manifest = _load_manifest(manifest_path)
+    unchecked = [name for name in names if not _is_resource_path(name, manifest.get(name))]
+    if not unchecked:
+        return
+
+    import nltk
+    found = {}
+    missing = []
+    for name in unchecked:
+        try:
+            pointer = nltk.data.find(NLTK_RESOURCES[name])
+        except LookupError:
+            if not (allow_download and nltk.download(name, quiet=True)):
+                missing.append(name)
+                continue
+            pointer = nltk.data.find(NLTK_RESOURCES[name])
+        found[name] = _pointer_path(pointer)
+
+    # A location that does not pass the check is looked up again next time rather than recorded.
+    changed = {name: path for name, path in found.items() if manifest.get(name) != path and _is_resource_path(name, path)}
+    if changed:
+        with _manifest_lock:
+            # Merged into the manifest as it is now, so entries another stage recorded meanwhile are kept.
+            _write_manifest(manifest_path, {**_load_manifest(manifest_path), **changed})
+
+    if missing:
+        raise LookupError(f"NLTK resources not installed: {', '.join(missing)}. "
+                          f"Install them with: python -m nltk.downloader {' '.join(missing)}")
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from monthly_aggregation import add_aggregates, monthly_aggregates
+from pain_points import first_mention_dates
+from sentiment import add_histograms, sentiment_histogram
+from spike_detection import add_daily_counts, daily_counts
+
+# --- Configuration ---
+SPILL_BATCH_SIZE = 50_000  # N-gram rows upserted into the spill table per executemany call
+
+
+def _open_spill(spill_dir):
+    if spill_dir:
+        os.makedirs(spill_dir, exist_ok=True)
+    descriptor, path = tempfile.mkstemp(prefix='chunk_ngrams_', suffix='.sqlite', dir=spill_dir)
+    os.close(descriptor)
+    # Stages run on a thread pool; the load stage fills the table before the n-gram stage reads it.
+    connection = sqlite3.connect(path, check_same_thread=False)
+    # Scratch data for one run: nothing to recover after a crash, so skip the journal.
+    connection.execute('PRAGMA journal_mode=OFF')
+    connection.execute('PRAGMA synchronous=OFF')
+    connection.execute('CREATE TABLE ngrams (n INTEGER NOT NULL, ngram TEXT NOT NULL, count INTEGER NOT NULL, '
+                       'first_date INTEGER NOT NULL, chunk INTEGER NOT NULL, rank INTEGER NOT NULL, PRIMARY KEY (n, ngram)) WITHOUT ROWID')
+    return connection, path
+
+
+def _close_spill(connection, path):
+    connection.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ChunkTotals:
+    """
+    Mergeable results of a review export streamed chunk by chunk (out-of-core mode).
+
+    Only what every analysis needs is kept, and all of it merges exactly: additive monthly
+    and daily aggregates, n-gram counts of the negative reviews, the (rating, compound score)
+    sentiment histogram and the first date each pain point was mentioned.
+
+    The n-gram counts, whose vocabulary keeps growing with the export, are not held in
+    memory: each chunk's counts are upserted into a scratch SQLite table in spill_dir, which
+    is deleted with the totals. Memory is therefore bounded by the chunk size, however many
+    reviews are streamed. The table also records where each n-gram was first seen, in the
+    order the in-memory run sorts reviews (by 'Review_Date', stable in file order), so
+    top_ngrams breaks ties exactly as most_common() does on the full, sorted corpus.
+    """
+
+    def __init__(self, ngram_orders=(1, 2, 3), stop_words=None, spill_dir=None):
+        self.ngram_orders = ngram_orders
+        self.stop_words = stop_words
+        self.row_count = 0
+        self.chunk_count = 0
+        self.monthly = None
+        self.daily = None
+        self.sentiment_histogram = None
+        self.first_mentions = None
+        self._spill, spill_path = _open_spill(spill_dir)
+        self._remove_spill = weakref.finalize(self, _close_spill, self._spill, spill_path)
+
+    def fold_in(self, chunk, mention_columns, token_corpus):
+        """
+        Adds one enriched chunk to the totals.
+
+        Args:
+            chunk (pd.DataFrame): Typed reviews of one chunk, sorted by 'Review_Date', with
+                'Processed_Message', 'VADER_Sentiment_Compound' and the mention columns added.
+            mention_columns (list): Boolean mentions_* columns to aggregate.
+            token_corpus (TokenCorpus): Corpus of the chunk's 'Processed_Message', rows aligned with chunk.
+        """
+        chunk_index = self.chunk_count
+        self.chunk_count += 1
+        if chunk.empty:
+            return
+        self.row_count += len(chunk)
+        self.monthly = add_aggregates(self.monthly, monthly_aggregates(chunk, mention_columns))
+        self.daily = add_daily_counts(self.daily, daily_counts(chunk['Review_Date'], chunk['Rating'], chunk[mention_columns]))
+        self.sentiment_histogram = add_histograms(self.sentiment_histogram, sentiment_histogram(chunk['Rating'], chunk['VADER_Sentiment_Compound']))
+
+        chunk_first_mentions = first_mention_dates(chunk['Review_Date'], chunk[mention_columns])
+        self.first_mentions = chunk_first_mentions if self.first_mentions is None else pd.concat([self.first_mentions, chunk_first_mentions], axis=1).min(axis=1)
+
+        negative = np.flatnonzero(chunk['Rating'].to_numpy() <= 2)
+        # Plain int nanoseconds: tuples of numpy datetimes compare far slower when sorting.
+        negative_dates = chunk['Review_Date'].to_numpy()[negative].astype('datetime64[ns]').view('int64').tolist()
+        first_seen = {}
+        chunk_counts = token_corpus.select(negative).ngram_counts(orders=self.ngram_orders, stop_words=self.stop_words, first_seen=first_seen)
+        # Within a chunk the first-seen order is already the sorted order (rank); across chunks
+        # the earlier date wins, then the earlier chunk (stable sort in file order). Chunks
+        # arrive in order, so a stored entry only gives way to a strictly earlier date.
+        upsert = ('INSERT INTO ngrams VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (n, ngram) DO UPDATE SET count = count + excluded.count, '
+                  'first_date = MIN(first_date, excluded.first_date), '
+                  'chunk = CASE WHEN excluded.first_date < first_date THEN excluded.chunk ELSE chunk END, '
+                  'rank = CASE WHEN excluded.first_date < first_date THEN excluded.rank ELSE rank END')
+        with self._spill:
+            for n in self.ngram_orders:
+                rows = [(n, ngram, count, negative_dates[first_seen[n][ngram]], chunk_index, rank)
+                        for rank, (ngram, count) in enumerate(chunk_counts[n].items())]
+                for start in range(0, len(rows), SPILL_BATCH_SIZE):
+                    self._spill.executemany(upsert, rows[start:start + SPILL_BATCH_SIZE])
+
+    def top_ngrams(self, n, top_n):
+        """
+        The top_n most frequent order-n n-grams of the negative reviews, ties broken by first
+        appearance in the sorted corpus.
+
+        Returns:
+            list: (ngram, frequency) pairs, most frequent first, as Counter.most_common.
+        """
+        return self._spill.execute('SELECT ngram, count FROM ngrams WHERE n = ? ORDER BY count DESC, first_date, chunk, rank LIMIT ?',
+                                   (n, top_n)).fetchall()
+
+    def close(self):
+        """Deletes the n-gram spill table; top_ngrams cannot be called afterwards."""
+        self._remove_spill()
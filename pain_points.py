@@ -0,0 +1,168 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from monthly_aggregation import month_end_index
+from token_corpus import TokenCorpus, tokenize
+
+# --- Pain point taxonomy ---
+# The categories and their keywords live in taxonomy.json, grouped by the report that plots
+# them. Keywords are matched as whole tokens of the processed message; a keyword containing
+# spaces is matched as a phrase of consecutive tokens.
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'taxonomy.json')
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    """
+    Reads the taxonomy file.
+
+    Args:
+        path (str): JSON file mapping group name -> {'output_dir', 'categories'}, where
+            categories maps category name -> {'keywords': [...], optional 'label'}.
+
+    Returns:
+        dict: The parsed taxonomy.
+
+    Raises:
+        ValueError: If a group has no categories or a category has no keywords.
+    """
+    with open(path, mode='r', encoding='utf-8') as infile:
+        taxonomy = json.load(infile)
+    for group, group_spec in taxonomy.items():
+        if not group_spec.get('categories'):
+            raise ValueError(f"Taxonomy group '{group}' in '{path}' has no categories.")
+        for category, spec in group_spec['categories'].items():
+            if not spec.get('keywords'):
+                raise ValueError(f"Taxonomy category '{group}.{category}' in '{path}' has no keywords.")
+    return taxonomy
+
+
+def taxonomy_keywords(taxonomy, group):
+    """Category name -> keyword list for one taxonomy group (the keyword_map tag_pain_points takes)."""
+    return {category: spec['keywords'] for category, spec in taxonomy[group]['categories'].items()}
+
+
+def category_label(taxonomy, group, category):
+    """Display name of a category: its 'label', or the title-cased category name."""
+    return taxonomy[group]['categories'][category].get('label') or category.replace('_', ' ').title()
+
+
+TAXONOMY = load_taxonomy()
+PAIN_POINT_KEYWORDS = taxonomy_keywords(TAXONOMY, 'pain_points')
+
+
+def mention_column(category):
+    """Name of the boolean column flagging reviews that mention category."""
+    return f'mentions_{category}'
+
+
+def build_keyword_index(keyword_map, corpus):
+    """
+    Resolves the keywords of every category to token ids of corpus.
+
+    Args:
+        keyword_map (dict): Category name -> list of keywords.
+        corpus (TokenCorpus): Corpus the keywords are matched against.
+
+    Returns:
+        tuple: (token_flags, phrases) where token_flags is a bool array of shape
+        (vocabulary size, categories) flagging single-word keywords, and phrases is a list
+        of (token id array, category number) for multi-word keywords. Keywords with a token
+        that never occurs in corpus cannot match and are left out.
+    """
+    token_flags = np.zeros((len(corpus.vocabulary), len(keyword_map)), dtype=bool)
+    phrases = []
+    for category, keywords in enumerate(keyword_map.values()):
+        for keyword in keywords:
+            ids = [corpus.token_id(token) for token in tokenize(keyword)]
+            if not ids or None in ids:
+                continue
+            if len(ids) == 1:
+                token_flags[ids[0], category] = True
+            else:
+                phrases.append((np.array(ids), category))
+    return token_flags, phrases
+
+
+def tag_pain_points(processed_messages, keyword_map=PAIN_POINT_KEYWORDS):
+    """
+    Flags, for every category at once, which messages mention one of its keywords.
+
+    Keywords are resolved to token ids once and matched against the token id arrays of the
+    corpus: single words with one lookup per token, phrases by comparing shifted id arrays,
+    so the cost is a few vectorized passes however many categories there are. Matching is
+    equivalent to a case-insensitive r'\\b(kw1|kw2|...)\\b' search on the space-joined
+    processed tokens.
+
+    Args:
+        processed_messages (pd.Series or TokenCorpus): Output of preprocess_series, or its
+            already tokenized corpus.
+        keyword_map (dict): Category name -> list of keywords.
+
+    Returns:
+        pd.DataFrame: One bool column per category (see mention_column), aligned with
+        processed_messages.
+    """
+    corpus = processed_messages if isinstance(processed_messages, TokenCorpus) else TokenCorpus.from_texts(processed_messages)
+    token_flags, phrases = build_keyword_index(keyword_map, corpus)
+    token_docs = corpus.token_docs()
+
+    # One extra all-False row for missing messages, whose document is -1.
+    flags = np.zeros((corpus.doc_count + 1, len(keyword_map)), dtype=bool)
+    hits = np.flatnonzero(token_flags.any(axis=1)[corpus.token_ids])
+    hit_tokens, hit_categories = np.nonzero(token_flags[corpus.token_ids[hits]])
+    flags[token_docs[hits[hit_tokens]], hit_categories] = True
+    for ids, category in phrases:
+        # Start positions matching the whole phrase without running into the next document.
+        starts = np.flatnonzero(corpus.token_ids[:max(len(corpus.token_ids) - len(ids) + 1, 0)] == ids[0])
+        for k in range(1, len(ids)):
+            starts = starts[corpus.token_ids[starts + k] == ids[k]]
+        starts = starts[token_docs[starts + len(ids) - 1] == token_docs[starts]]
+        flags[token_docs[starts], category] = True
+
+    columns = [mention_column(category) for category in keyword_map]
+    return pd.DataFrame(flags[corpus.row_docs], index=corpus.index, columns=columns)
+
+
+def first_mention_dates(review_dates, mention_flags):
+    """
+    Earliest review date flagged by each column of mention_flags.
+
+    Returns:
+        pd.Series: Column name -> date (NaT for columns without a flagged review).
+    """
+    return pd.Series({column: review_dates[mention_flags[column]].min() for column in mention_flags.columns}, dtype=review_dates.dtype)
+
+
+def monthly_category_counts(review_dates, processed_messages, taxonomy, groups=None):
+    """
+    Per-month mention counts for every category of the given taxonomy groups.
+
+    All categories of all groups are tagged together in one tokenization pass (see
+    tag_pain_points) and counted per month in one grouped pass.
+
+    Args:
+        review_dates (pd.Series): 'Review_Date' of each review.
+        processed_messages (pd.Series): Processed messages aligned with review_dates.
+        taxonomy (dict): Output of load_taxonomy.
+        groups (iterable): Taxonomy groups to count; defaults to all of them.
+
+    Returns:
+        dict: Group -> pd.DataFrame with one column of monthly counts per category, indexed
+        by month-end timestamps covering every month from the first review to the last.
+    """
+    groups = list(taxonomy) if groups is None else list(groups)
+    combined = {f'{group}.{category}': keywords for group in groups for category, keywords in taxonomy_keywords(taxonomy, group).items()}
+    flags = tag_pain_points(processed_messages, combined)
+    flags.columns = list(combined)
+
+    months = review_dates.dt.to_period('M').to_numpy()
+    counts = flags.groupby(months).sum()
+    if not counts.empty:
+        counts = counts.reindex(pd.period_range(counts.index.min(), counts.index.max(), freq='M'), fill_value=0)
+    counts.index = month_end_index(pd.PeriodIndex(counts.index, freq='M'))
+
+    return {group: counts[[f'{group}.{category}' for category in taxonomy[group]['categories']]].rename(columns=lambda key: key.split('.', 1)[1])
+            for group in groups}
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+PLOT_MANIFEST_PATH = os.path.join('.review_cache', 'plot_hashes.json')
+# Bump whenever a renderer's appearance changes so existing PNGs are redrawn.
+RENDER_VERSION = 1
+# Renderer processes are not forked from the (threaded, possibly tracemalloc-traced) analysis process.
+POOL_CONTEXT = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+def _pyplot():
+    # matplotlib and seaborn are imported on first render, so queuing jobs (and runs whose
+    # plots are all unchanged) never pay for them.
+    import matplotlib
+    matplotlib.use('Agg')  # Headless: figures are only ever written to PNG files
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _seaborn():
+    _pyplot()
+    import seaborn as sns
+    return sns
+
+
+def _stable(value):
+    # Sets pickle in hash-randomized order; sort them so equal options always hash the same.
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, (list, tuple)):
+        return [_stable(item) for item in value]
+    if isinstance(value, dict):
+        return sorted((key, _stable(item)) for key, item in value.items())
+    return value
+
+
+def _hash_input(digest, value):
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode('utf-8'))
+    elif isinstance(value, np.ndarray):
+        digest.update(value.tobytes())
+    else:
+        digest.update(pickle.dumps(_stable(value)))
+
+
+class PlotJob:
+    """
+    One PNG to produce: the renderer that draws it, the data it needs and its options.
+
+    The renderer must be a module-level function renderer(data, **options) returning the
+    figure, so jobs can be sent to worker processes. Data should be the already-aggregated
+    series or table the plot shows, which keeps jobs cheap to pickle and to hash.
+    """
+
+    def __init__(self, filename, renderer, data, dpi=None, **options):
+        self.filename = filename
+        self.renderer = renderer
+        self.data = data
+        self.dpi = dpi
+        self.options = options
+
+    def input_hash(self):
+        """Hash of everything that determines the PNG: renderer, data, options and dpi."""
+        digest = hashlib.sha1()
+        digest.update(f"{RENDER_VERSION}:{self.renderer.__module__}.{self.renderer.__qualname__}:{self.dpi}".encode('utf-8'))
+        _hash_input(digest, self.data)
+        digest.update(pickle.dumps(_stable(self.options)))
+        return digest.hexdigest()
+
+
+def _render_job(job):
+    output_dir = os.path.dirname(job.filename)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    fig = job.renderer(job.data, **job.options)
+    try:
+        if job.dpi:
+            fig.savefig(job.filename, dpi=job.dpi)
+        else:
+            fig.savefig(job.filename)
+    finally:
+        _pyplot().close(fig)  # Free the figure as soon as it is written
+    return job.filename
+
+
+def _load_manifest(manifest_path):
+    try:
+        with open(manifest_path, mode='r', encoding='utf-8') as infile:
+            return json.load(infile)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def render_plots(jobs, workers=None, manifest_path=PLOT_MANIFEST_PATH, force=False):
+    """
+    Renders jobs to PNG, in parallel, skipping any whose inputs are unchanged since the last run.
+
+    A job is skipped when its PNG exists and the manifest records the same input hash for it.
+
+    Args:
+        jobs (list): PlotJob instances.
+        workers (int): Worker processes to use; defaults to os.cpu_count(). 1 renders in-process.
+        manifest_path (str): JSON file mapping each PNG path to the input hash it was drawn from.
+        force (bool): Render every job even if its inputs are unchanged.
+
+    Returns:
+        list: Filenames that were (re)rendered.
+    """
+    manifest = _load_manifest(manifest_path)
+    pending = []
+    for job in jobs:
+        job_hash = job.input_hash()
+        if not force and manifest.get(job.filename) == job_hash and os.path.exists(job.filename):
+            print(f"Unchanged, skipped: {job.filename}")
+            continue
+        pending.append((job, job_hash))
+
+    workers = workers or os.cpu_count() or 1
+    rendered = []
+    if workers <= 1 or len(pending) <= 1:
+        for job, _ in pending:
+            rendered.append(_render_job(job))
+            print(f"Saved graph: {job.filename}")
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=POOL_CONTEXT) as executor:
+            for filename in executor.map(_render_job, [job for job, _ in pending]):
+                rendered.append(filename)
+                print(f"Saved graph: {filename}")
+
+    for job, job_hash in pending:
+        manifest[job.filename] = job_hash
+    if pending:
+        manifest_dir = os.path.dirname(manifest_path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+        # Written next to the manifest and swapped in, so an interrupted run never leaves it truncated.
+        descriptor, tmp_path = tempfile.mkstemp(prefix=os.path.basename(manifest_path) + '.', suffix='.tmp', dir=manifest_dir or '.')
+        with open(descriptor, mode='w', encoding='utf-8') as outfile:
+            json.dump(manifest, outfile, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+    return rendered
+
+
+# --- Renderers ---
+
+def render_count_bars(counts, title, xlabel=None, ylabel=None, palette=None, figsize=(8, 6), grid_axis=None):
+    """Bar chart of precomputed category counts (the equivalent of sns.countplot on the raw column)."""
+    plt, sns = _pyplot(), _seaborn()
+    fig = plt.figure(figsize=figsize)
+    # For Seaborn v0.14.0+ warnings:
+    # sns.barplot(x=counts.index, y=counts.values, hue=counts.index, palette=palette, order=list(counts.index), legend=False)
+    sns.barplot(x=counts.index, y=counts.values, palette=palette, order=list(counts.index))
+    plt.title(title)
+    if xlabel is not None:
+        plt.xlabel(xlabel)
+    if ylabel is not None:
+        plt.ylabel(ylabel)
+    if grid_axis:
+        plt.grid(axis=grid_axis, linestyle='--')
+    return fig
+
+
+def render_monthly_line(series, title, xlabel='Month', ylabel=None, color=None, ylim=None, ylim_bottom=None, reference_line=None):
+    """
+    Monthly line plot with markers (one line per column if series is a DataFrame).
+
+    Args:
+        reference_line (tuple): Optional (value, label) drawn as a dashed red horizontal line.
+    """
+    plt = _pyplot()
+    fig = plt.figure(figsize=(12, 6))
+    series.plot(kind='line', marker='o', color=color, ax=fig.gca())
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    if ylim is not None:
+        plt.ylim(*ylim)
+    plt.grid(True)
+    if ylim_bottom is not None:
+        plt.ylim(bottom=ylim_bottom)
+    if reference_line is not None:
+        value, label = reference_line
+        plt.axhline(value, color='red', linestyle='--', label=label)
+        plt.legend()
+    return fig
+
+
+def render_top_ngrams(words_freq, title):
+    """Horizontal bars of (ngram, frequency) pairs, most frequent first."""
+    plt, sns = _pyplot(), _seaborn()
+    top_df = pd.DataFrame(words_freq, columns=['Ngram', 'Frequency'])
+    fig = plt.figure(figsize=(12, 8))
+    # For Seaborn v0.14.0+ warnings:
+    # sns.barplot(x='Frequency', y='Ngram', data=top_df, hue='Ngram', palette='mako', legend=False)
+    sns.barplot(x='Frequency', y='Ngram', data=top_df, palette='mako')
+    plt.title(title)
+    plt.tight_layout()
+    return fig
+
+
+def render_wordcloud(frequencies, title, max_words=200):
+    """
+    Word cloud of precomputed word frequencies.
+
+    Args:
+        frequencies (dict): Word -> count or weight; only the max_words largest are drawn.
+    """
+    plt = _pyplot()
+    from wordcloud import WordCloud
+    wordcloud = WordCloud(background_color="white", width=800, height=400, max_words=max_words).generate_from_frequencies(frequencies)
+    fig = plt.figure(figsize=(10, 5))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis("off")
+    plt.title(title)
+    return fig
+
+
+def render_boxplot(frame, x, y, title, palette=None, weight=None):
+    """Box plot of column y grouped by column x; rows are repeated weight times when weight names a count column."""
+    plt, sns = _pyplot(), _seaborn()
+    if weight is not None:
+        frame = frame.loc[frame.index.repeat(frame[weight])]
+    fig = plt.figure(figsize=(10, 7))
+    # For Seaborn v0.14.0+ warnings:
+    # sns.boxplot(x=x, y=y, data=frame, hue=x, palette=palette, legend=False)
+    sns.boxplot(x=x, y=y, data=frame, palette=palette)
+    plt.title(title)
+    return fig
+
+
+def render_reply_rate(reply_counts):
+    """Percentage of reviews with and without a developer reply."""
+    plt, sns = _pyplot(), _seaborn()
+    fig = plt.figure(figsize=(7, 5))
+    # For Seaborn v0.14.0+ warnings:
+    # sns.barplot(x=reply_counts.index.astype(str), y=reply_counts.values, hue=reply_counts.index.astype(str), palette=['lightcoral', 'lightgreen'], legend=False)
+    sns.barplot(x=reply_counts.index, y=reply_counts.values, palette=['lightcoral', 'lightgreen'])
+    plt.title('Developer Reply Rate')
+    plt.xlabel('Has Developer Reply?')
+    plt.ylabel('Percentage of Reviews')
+    reply_index_labels = ['No Reply' if idx == False else 'Has Reply' for idx in reply_counts.index]
+    plt.xticks(ticks=range(len(reply_counts.index)), labels=reply_index_labels)
+    return fig
+
+
+def render_bars(series, title, xlabel, ylabel, color='skyblue'):
+    """Vertical bar chart of a series (grouped bars per column for a DataFrame), with a dashed horizontal grid."""
+    plt = _pyplot()
+    fig = plt.figure(figsize=(10, 6))
+    series.plot(kind='bar', color=color, ax=fig.gca())
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.xticks(rotation=0)
+    plt.grid(axis='y', linestyle='--')
+    return fig
+
+
+def render_problem_trend(series, column):
+    """Monthly mention counts for one problem category, with year-month ticks."""
+    plt = _pyplot()
+    import matplotlib.dates as mdates
+    fig, ax = plt.subplots(figsize=(14, 7))
+    ax.plot(series.index, series.values, marker='o', linestyle='-', label=column)
+
+    # Formatting the x-axis to show year and month
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+
+    num_data_points = len(series.index)
+    if num_data_points <= 12:
+        tick_interval = 1
+    elif num_data_points <= 36:
+        tick_interval = 3
+    elif num_data_points <= 60:
+        tick_interval = 6
+    else:
+        tick_interval = 12
+
+    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=max(1, tick_interval)))
+    ax.xaxis.set_minor_locator(mdates.MonthLocator())
+
+    ax.set_title(f'Frequency of "{column}" Over Time', fontsize=16)
+    ax.set_xlabel('Year-Month', fontsize=12)
+    ax.set_ylabel('Number of Mentions', fontsize=12)
+    plt.xticks(rotation=45, ha='right')
+    ax.legend(loc='upper left')
+    ax.grid(True, which='major', linestyle='--', linewidth=0.7)
+    ax.grid(True, which='minor', linestyle=':', linewidth=0.4)
+
+    plt.tight_layout()
+    return fig
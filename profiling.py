@@ -0,0 +1,113 @@
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, peak traced memory and row counts for each pipeline stage.
+
+    Peak memory comes from tracemalloc, so it covers Python and NumPy allocations made in
+    this process only; work done inside worker pools shows up as wall time, not memory.
+    Optionally every stage is also run under cProfile and its stats dumped to
+    profile_dir/<index>_<stage>.pstats (inspect with python -m pstats).
+
+    Stages may run concurrently in threads. CPU time is then per thread, but traced memory
+    is process-wide, so a stage's peak includes whatever overlapping stages held.
+
+    Usage:
+        profiler = StageProfiler()
+        with profiler.stage('load', rows_in=0) as record:
+            df = ...
+            record['rows_out'] = len(df)
+        profiler.print_summary()
+    """
+
+    def __init__(self, trace_memory=True, profile_dir=None):
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.records = []
+        self._lock = threading.Lock()
+        self._active_peaks = {}  # id(record) -> highest traced bytes seen while that stage ran
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Context manager timing one stage.
+
+        Yields the stage's record dict; set record['rows_out'] (and any other counters)
+        inside the block.
+        """
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+        if self.trace_memory:
+            with self._lock:
+                if not self._active_peaks and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._started_tracing = True
+                self._collect_peaks()  # Stages already running keep their peak across the reset below
+                tracemalloc.reset_peak()
+                baseline_bytes = tracemalloc.get_traced_memory()[0]
+                self._active_peaks[id(record)] = baseline_bytes
+        profile = cProfile.Profile() if self.profile_dir else None
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+            record['cpu_seconds'] = round(time.thread_time() - cpu_start, 4)
+            if self.trace_memory:
+                with self._lock:
+                    current_bytes = tracemalloc.get_traced_memory()[0]
+                    self._collect_peaks()
+                    peak_bytes = self._active_peaks.pop(id(record))
+                    record['peak_memory_mb'] = round((peak_bytes - baseline_bytes) / 2 ** 20, 2)
+                    record['memory_delta_mb'] = round((current_bytes - baseline_bytes) / 2 ** 20, 2)
+                    if not self._active_peaks and self._started_tracing:
+                        tracemalloc.stop()
+                        self._started_tracing = False
+            with self._lock:
+                if profile:
+                    os.makedirs(self.profile_dir, exist_ok=True)
+                    safe_name = re.sub(r'\W+', '_', name)
+                    record['pstats_path'] = os.path.join(self.profile_dir, f"{len(self.records):02d}_{safe_name}.pstats")
+                    profile.dump_stats(record['pstats_path'])
+                self.records.append(record)
+
+    def _collect_peaks(self):
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        for key, seen_bytes in self._active_peaks.items():
+            self._active_peaks[key] = max(seen_bytes, peak_bytes)
+
+    def print_summary(self):
+        """Prints one line per recorded stage."""
+        print("\n--- Stage Timings ---")
+        print(f"{'Stage':<16}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak MB':>10}{'Rows in':>10}{'Rows out':>10}")
+        for record in self.records:
+            peak = record.get('peak_memory_mb')
+            print(f"{record['stage']:<16}{record['wall_seconds']:>10.3f}{record['cpu_seconds']:>10.3f}"
+                  f"{peak if peak is not None else '-':>10}{_count(record['rows_in']):>10}{_count(record['rows_out']):>10}")
+
+    def dump_json(self, path):
+        """Writes the stage records to path as JSON."""
+        report_dir = os.path.dirname(path)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(path, mode='w', encoding='utf-8') as outfile:
+            json.dump({'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'stages': self.records}, outfile, indent=2)
+        print(f"Stage profile written to '{path}'")
+
+
+def _count(value):
+    return '-' if value is None else value
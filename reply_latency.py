@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from dedup import normalize_text
+from monthly_aggregation import month_end_index
+
+# --- Configuration ---
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+TEMPLATE_MIN_USES = 5  # A reply text (after normalization) sent at least this often is a template
+
+
+def quantile_column(quantile):
+    """Name of the latency column for quantile, e.g. 'p90' for 0.9."""
+    return f'p{quantile * 100:g}'
+
+
+def reply_latency_hours(reviews):
+    """
+    Hours from each review to its developer reply, in one datetime64 subtraction.
+
+    Replies dated before their review (the review was edited after the reply, which moves
+    'Review_Date') have no meaningful latency and, like reviews without a reply, get NaN.
+
+    Args:
+        reviews (pd.DataFrame): Typed reviews with datetime 'Review_Date' and 'Developer_Reply_Date'.
+
+    Returns:
+        pd.Series: Float hours aligned with reviews.
+    """
+    latency = (reviews['Developer_Reply_Date'] - reviews['Review_Date']).to_numpy()
+    hours = latency / np.timedelta64(1, 'h')  # NaT becomes NaN
+    hours[hours < 0] = np.nan
+    return pd.Series(hours, index=reviews.index, name='Reply_Latency_Hours')
+
+
+def template_replies(reply_messages, min_uses=TEMPLATE_MIN_USES):
+    """
+    Finds the canned replies among the developer replies.
+
+    Each distinct reply is normalized once (case, punctuation and spacing ignored) and
+    hashed with pd.util.hash_array; a hash shared by at least min_uses replies is a template.
+
+    Args:
+        reply_messages (pd.Series): Developer reply texts, NaN where there is no reply.
+        min_uses (int): Replies a text needs to count as a template.
+
+    Returns:
+        tuple: (is_template, templates). is_template is a bool Series aligned with
+        reply_messages; templates is a DataFrame with the 'Template_Text' (first reply seen
+        with it) and 'Uses' of every template, most used first.
+    """
+    codes, uniques = pd.factorize(reply_messages)
+    normalized = np.array([normalize_text(text) for text in uniques], dtype=object)
+    hashes = pd.util.hash_array(normalized) if len(normalized) else np.empty(0, dtype=np.uint64)
+    template_codes, template_hashes = pd.factorize(hashes)
+    # Reply row -> template candidate, -1 without a reply.
+    row_codes = np.where(codes >= 0, template_codes[codes] if len(uniques) else codes, -1)
+
+    replied = row_codes >= 0
+    uses = np.bincount(row_codes[replied], minlength=len(template_hashes))
+    is_template = np.zeros(len(row_codes), dtype=bool)
+    is_template[replied] = uses[row_codes[replied]] >= min_uses
+
+    template_ids = np.flatnonzero(uses >= min_uses)
+    first_text = {code: uniques[i] for i, code in reversed(list(enumerate(template_codes)))}
+    templates = pd.DataFrame({'Template_Text': [first_text[code] for code in template_ids], 'Uses': uses[template_ids]})
+    return (pd.Series(is_template, index=reply_messages.index, name='Is_Template_Reply'),
+            templates.sort_values('Uses', ascending=False, kind='stable', ignore_index=True))
+
+
+def latency_percentiles(latency, groups, quantiles=LATENCY_QUANTILES):
+    """
+    Number of replies and latency quantiles per group.
+
+    Args:
+        latency (pd.Series): Output of reply_latency_hours.
+        groups (pd.Series or np.ndarray): Group of every latency value (aligned with it).
+        quantiles (tuple): Quantiles to report, as quantile_column() columns.
+
+    Returns:
+        pd.DataFrame: One row per group with at least one reply, columns 'replies' and the quantiles.
+    """
+    answered = latency.notna().to_numpy()
+    values = pd.Series(latency.to_numpy()[answered])
+    grouped = values.groupby(np.asarray(groups)[answered], sort=True)
+    table = grouped.quantile(list(quantiles)).unstack()
+    table.columns = [quantile_column(quantile) for quantile in quantiles]
+    table.insert(0, 'replies', grouped.size())
+    return table
+
+
+def category_latency_percentiles(latency, mention_flags, quantiles=LATENCY_QUANTILES):
+    """
+    latency_percentiles per mentioned category; a review mentioning several categories
+    counts towards each of them.
+
+    Args:
+        latency (pd.Series): Output of reply_latency_hours.
+        mention_flags (pd.DataFrame): Boolean column per category, aligned with latency.
+    """
+    rows, columns = np.nonzero(mention_flags.to_numpy())
+    return latency_percentiles(latency.iloc[rows], mention_flags.columns[columns], quantiles).reindex(mention_flags.columns).dropna(how='all')
+
+
+def monthly_reply_table(reviews, latency, is_template=None, quantiles=LATENCY_QUANTILES):
+    """
+    latency_percentiles per month of the review, indexed by month-end timestamps, plus the
+    'template_rate' (% of the month's replies that are templates) when is_template is given.
+    """
+    # datetime64[M] truncation stays vectorized, unlike an object array of Periods.
+    months = reviews['Review_Date'].to_numpy().astype('datetime64[M]')
+    table = latency_percentiles(latency, months, quantiles)
+    if is_template is not None:
+        replied = reviews['Developer_Reply_Message'].notna()
+        template_rate = is_template[replied].groupby(months[replied.to_numpy()]).mean() * 100
+        table = table.join(template_rate.rename('template_rate'), how='outer')
+    table.index = month_end_index(pd.DatetimeIndex(table.index).to_period('M'))
+    return table
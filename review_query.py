@@ -0,0 +1,173 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from ngrams import top_ngrams
+from pain_points import PAIN_POINT_KEYWORDS, mention_column, tag_pain_points
+from token_corpus import TokenCorpus
+
+
+def _as_timestamp(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+class ReviewIndex:
+    """
+    Answers filtered questions about the reviews ("1-star payout complaints in March 2024")
+    without rescanning the frame.
+
+    The reviews must be sorted by 'Review_Date' (as load_reviews returns them), so a date
+    window is a contiguous range of row positions found by binary search. Ratings and pain
+    point categories each map to a sorted array of the row positions carrying them; a query
+    narrows every array to the window with searchsorted and intersects what is left.
+
+    Usage:
+        index = ReviewIndex(df, processed_messages)
+        index.count(start='2024-03-01', end='2024-04-01', rating=1, category='payment_issues')
+    """
+
+    def __init__(self, reviews, processed_messages=None, mention_flags=None):
+        """
+        Args:
+            reviews (pd.DataFrame): Typed reviews sorted by 'Review_Date'.
+            processed_messages (pd.Series): Processed messages aligned with reviews; needed for
+                top_ngrams. Defaults to the 'Processed_Message' column if reviews has one.
+            mention_flags (pd.DataFrame): Boolean mentions_* columns aligned with reviews.
+                Defaults to the reviews' own mentions_* columns, or to tagging processed_messages.
+        """
+        if processed_messages is None and 'Processed_Message' in reviews.columns:
+            processed_messages = reviews['Processed_Message']
+        mention_columns = [mention_column(category) for category in PAIN_POINT_KEYWORDS]
+        if mention_flags is None and all(column in reviews.columns for column in mention_columns):
+            mention_flags = reviews[mention_columns]
+        # Tokenized once; tagging and every top_ngrams query read the token ids.
+        self.token_corpus = None if processed_messages is None else TokenCorpus.from_texts(processed_messages)
+        if mention_flags is None and self.token_corpus is not None:
+            mention_flags = tag_pain_points(self.token_corpus, PAIN_POINT_KEYWORDS)
+
+        self.reviews = reviews
+        self.processed_messages = processed_messages
+        self.dates = reviews['Review_Date'].to_numpy()
+        if len(self.dates) and (self.dates[1:] < self.dates[:-1]).any():
+            raise ValueError("reviews must be sorted by 'Review_Date'")
+
+        ratings = reviews['Rating'].to_numpy()
+        self.rating_positions = {int(rating): np.flatnonzero(ratings == rating) for rating in np.unique(ratings)}
+        self.category_positions = {}
+        if mention_flags is not None:
+            for category in PAIN_POINT_KEYWORDS:
+                self.category_positions[category] = np.flatnonzero(mention_flags[mention_column(category)].to_numpy())
+
+    def _window(self, start, end):
+        start, end = _as_timestamp(start), _as_timestamp(end)
+        low = 0 if start is None else int(np.searchsorted(self.dates, start.to_datetime64(), side='left'))
+        high = len(self.dates) if end is None else int(np.searchsorted(self.dates, end.to_datetime64(), side='left'))
+        return low, max(low, high)
+
+    @staticmethod
+    def _clip(positions, low, high):
+        return positions[np.searchsorted(positions, low):np.searchsorted(positions, high)]
+
+    def positions(self, start=None, end=None, rating=None, category=None):
+        """
+        Row positions (ascending, i.e. oldest first) of the reviews matching every given filter.
+
+        Args:
+            start: First date included (anything pd.Timestamp accepts), or None.
+            end: First date excluded, or None.
+            rating (int or iterable): Star rating(s) to keep.
+            category (str or iterable): Pain point categories (PAIN_POINT_KEYWORDS keys); a
+                review matches if it mentions any of them.
+
+        Returns:
+            np.ndarray: The matching row positions.
+
+        Raises:
+            KeyError: If category is not a known category or mentions were not indexed.
+        """
+        low, high = self._window(start, end)
+        selected = None
+        # An empty list of ratings or categories matches nothing.
+        empty = np.empty(0, dtype=np.int64)
+
+        if rating is not None:
+            ratings = [rating] if np.isscalar(rating) else rating
+            parts = [self._clip(self.rating_positions.get(int(value), empty), low, high) for value in ratings]
+            selected = parts[0] if len(parts) == 1 else np.sort(np.concatenate([empty] + parts))
+
+        if category is not None:
+            categories = [category] if isinstance(category, str) else category
+            parts = [self._clip(self.category_positions[name], low, high) for name in categories]
+            matched = parts[0] if len(parts) == 1 else np.unique(np.concatenate([empty] + parts))
+            selected = matched if selected is None else np.intersect1d(selected, matched, assume_unique=True)
+
+        if selected is None:
+            return np.arange(low, high)
+        return selected
+
+    def count(self, **filters):
+        """Number of reviews matching filters (see positions)."""
+        return len(self.positions(**filters))
+
+    def select(self, **filters):
+        """The matching reviews as a DataFrame, oldest first."""
+        return self.reviews.iloc[self.positions(**filters)]
+
+    def sample(self, n=5, seed=None, **filters):
+        """Up to n matching reviews picked at random, oldest first."""
+        positions = self.positions(**filters)
+        if len(positions) > n:
+            positions = np.sort(np.random.default_rng(seed).choice(positions, size=n, replace=False))
+        return self.reviews.iloc[positions]
+
+    def top_ngrams(self, orders=(1, 2), top_n=10, stop_words=None, **filters):
+        """
+        Most frequent n-grams of the matching reviews' processed messages.
+
+        Returns:
+            dict: Order -> [(ngram, frequency), ...], as ngrams.top_ngrams.
+        """
+        if self.processed_messages is None:
+            raise ValueError("top_ngrams needs processed messages")
+        return top_ngrams(self.token_corpus.select(self.positions(**filters)), orders=orders, top_n=top_n, stop_words=stop_words)
+
+
+def main(argv=None):
+    from nltk_resources import PREPROCESSING_RESOURCES, ensure_nltk_resources
+    from review_store import load_reviews
+    from text_preprocessing import preprocess_series
+
+    parser = argparse.ArgumentParser(description="Count, sample and summarize reviews in a date window.")
+    parser.add_argument('csv_path', help="Review CSV to query.")
+    parser.add_argument('--start', help="First date included, e.g. 2024-03-01.")
+    parser.add_argument('--end', help="First date excluded, e.g. 2024-04-01.")
+    parser.add_argument('--rating', type=int, nargs='+', help="Star rating(s) to keep.")
+    parser.add_argument('--category', nargs='+', choices=list(PAIN_POINT_KEYWORDS), metavar='CATEGORY',
+                        help=f"Pain point categories to keep: {', '.join(PAIN_POINT_KEYWORDS)}.")
+    parser.add_argument('--sample', type=int, default=5, help="Matching reviews to print.")
+    parser.add_argument('--ngrams', type=int, nargs='*', default=[1, 2], help="N-gram orders to summarize (none to skip).")
+    args = parser.parse_args(argv)
+
+    processed_messages = None
+    reviews = load_reviews(args.csv_path)
+    if args.ngrams or args.category:
+        try:
+            ensure_nltk_resources(PREPROCESSING_RESOURCES)
+        except LookupError as e:
+            print(f"Error: {e}")
+            return
+        processed_messages = preprocess_series(reviews['Review_Message'])
+    index = ReviewIndex(reviews, processed_messages)
+    filters = {'start': args.start, 'end': args.end, 'rating': args.rating, 'category': args.category}
+
+    print(f"Matching reviews: {index.count(**filters)}")
+    for _, review in index.sample(args.sample, **filters).iterrows():
+        print(f"- [{review['Review_Date']:%Y-%m-%d}, {review['Rating']} stars] {review['Review_Message']}")
+    if args.ngrams:
+        for n, words_freq in index.top_ngrams(orders=tuple(args.ngrams), **filters).items():
+            print(f"\nTop {n}-grams: " + ", ".join(f"{ngram} ({count})" for ngram, count in words_freq))
+
+
+if __name__ == '__main__':
+    main()
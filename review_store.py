@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# --- Configuration ---
+CACHE_DIR = '.review_cache'
+# Bump whenever the typing/cleaning below changes so stale caches are rebuilt.
+CACHE_VERSION = 2
+HASH_BLOCK_SIZE = 1 << 20
+CHUNK_ROWS = 200_000
+
+
+def file_sha1(filepath):
+    """
+    Computes the SHA-1 of a file, streaming it in fixed-size blocks.
+
+    Args:
+        filepath (str): Path to the file to hash.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha1()
+    with open(filepath, mode='rb') as infile:
+        for block in iter(lambda: infile.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_paths(csv_path, cache_dir):
+    # One cache entry per source path; the manifest records which version of the file it holds.
+    key = hashlib.sha1(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:16]
+    base = os.path.join(cache_dir, f"reviews_{key}")
+    return base + '.parquet', base + '.json'
+
+
+def type_reviews(df):
+    """
+    Applies the typing and cleaning every analysis run relies on.
+
+    Rows with an unparseable 'Review_Date' or a non-numeric 'Rating' are dropped.
+    'User_Name' becomes categorical, 'Rating' int8, 'Has_Developer_Reply' bool and
+    both date columns datetime64. The rows are sorted oldest first (stable for equal
+    timestamps), so date windows are contiguous slices found by binary search.
+
+    Args:
+        df (pd.DataFrame): Raw reviews as read from the CSV.
+
+    Returns:
+        pd.DataFrame: The typed reviews, sorted by 'Review_Date' with a fresh RangeIndex.
+    """
+    df['Review_Date'] = pd.to_datetime(df['Review_Date'], errors='coerce')
+    df = df.dropna(subset=['Review_Date'])
+
+    df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
+    df = df.dropna(subset=['Rating'])
+    df['Rating'] = df['Rating'].astype('int8')
+
+    if 'User_Name' in df.columns:
+        df['User_Name'] = df['User_Name'].astype('category')
+    if 'Has_Developer_Reply' in df.columns and df['Has_Developer_Reply'].dtype != bool:
+        df['Has_Developer_Reply'] = df['Has_Developer_Reply'].map({'Yes': True, 'No': False, True: True, False: False}).fillna(False).astype(bool)
+    if 'Developer_Reply_Date' in df.columns:
+        df['Developer_Reply_Date'] = pd.to_datetime(df['Developer_Reply_Date'], errors='coerce')
+
+    return df.sort_values('Review_Date', kind='stable', ignore_index=True)
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path, mode='r', encoding='utf-8') as infile:
+            return json.load(infile)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_manifest(manifest_path, manifest):
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, mode='w', encoding='utf-8') as outfile:
+        json.dump(manifest, outfile, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _cache_is_fresh(manifest, data_path, manifest_path, stat):
+    if not manifest or manifest.get('version') != CACHE_VERSION or not os.path.exists(data_path):
+        return False
+    if manifest.get('size') != stat.st_size:
+        return False
+    if manifest.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    # The file was touched but may be unchanged (e.g. re-copied); fall back to the content hash.
+    if manifest.get('sha1') == file_sha1(manifest['source']):
+        manifest['mtime_ns'] = stat.st_mtime_ns
+        _write_manifest(manifest_path, manifest)
+        return True
+    return False
+
+
+def iter_reviews(csv_path, chunk_rows=CHUNK_ROWS):
+    """
+    Streams csv_path in chunks of chunk_rows CSV rows, each typed like load_reviews.
+
+    Only one chunk is in memory at a time and nothing is cached. Every chunk is sorted by
+    'Review_Date' on its own; chunks come in file order.
+
+    Args:
+        csv_path (str): Path to the reviews CSV.
+        chunk_rows (int): CSV rows per chunk.
+
+    Yields:
+        pd.DataFrame: The typed reviews of one chunk (see type_reviews).
+
+    Raises:
+        FileNotFoundError: If csv_path does not exist.
+    """
+    with pd.read_csv(csv_path, chunksize=chunk_rows) as reader:
+        for raw_chunk in reader:
+            yield type_reviews(raw_chunk)
+
+
+def load_reviews(csv_path, cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Loads the typed reviews for csv_path, reusing a Parquet cache when the source is unchanged.
+
+    The cache is keyed by the source path and validated against the file size, mtime and
+    SHA-1 recorded in a small JSON manifest next to it. If Parquet support (pyarrow) is not
+    installed the CSV is simply parsed every time.
+
+    Args:
+        csv_path (str): Path to the reviews CSV.
+        cache_dir (str): Directory holding the cached columnar copies.
+        use_cache (bool): Set to False to always parse the CSV.
+
+    Returns:
+        pd.DataFrame: The typed reviews (see type_reviews).
+
+    Raises:
+        FileNotFoundError: If csv_path does not exist.
+    """
+    stat = os.stat(csv_path)
+    data_path, manifest_path = _cache_paths(csv_path, cache_dir)
+
+    if use_cache:
+        manifest = _read_manifest(manifest_path)
+        if _cache_is_fresh(manifest, data_path, manifest_path, stat):
+            try:
+                df = pd.read_parquet(data_path)
+                print(f"Loaded {len(df)} typed reviews from cache '{data_path}'.")
+                return df
+            except ImportError:
+                use_cache = False
+            except Exception as e:
+                print(f"Warning: Could not read review cache '{data_path}' ({e}). Re-parsing CSV.")
+
+    raw_df = pd.read_csv(csv_path)
+    raw_row_count = len(raw_df)
+    df = type_reviews(raw_df)
+    print(f"Parsed {raw_row_count} rows from '{csv_path}'; {raw_row_count - len(df)} dropped for invalid dates or ratings.")
+
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = data_path + '.tmp'
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, data_path)
+            _write_manifest(manifest_path, {
+                'version': CACHE_VERSION,
+                'source': os.path.abspath(csv_path),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha1': file_sha1(csv_path),
+            })
+        except ImportError:
+            print("Parquet support (pyarrow) not installed; review cache disabled.")
+        except OSError as e:
+            print(f"Warning: Could not write review cache to '{cache_dir}': {e}")
+
+    return df
@@ -0,0 +1,162 @@
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from nltk_resources import NLTK_MANIFEST_PATH, SENTIMENT_RESOURCES, nltk_data_fingerprint
+
+# --- Configuration ---
+SENTIMENT_CACHE_PATH = os.path.join('.review_cache', 'vader_scores.sqlite')
+# Bump whenever _score_chunk changes how a compound score is computed, so cached scores are redone.
+SENTIMENT_CACHE_VERSION = 1
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+CHUNK_SIZE = 5_000  # Unscored texts handed to a worker at a time
+SQLITE_BATCH_SIZE = 900  # Stays under SQLite's bound-parameter limit
+SQLITE_TIMEOUT = 60  # Seconds a writer waits for another process holding the cache lock
+# Scoring runs from a stage thread; forked workers could inherit locks held by the other threads.
+POOL_CONTEXT = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+_analyzer = None
+
+
+def text_key(text, scorer=''):
+    """Cache key for a review text: the SHA-1 digest of the scorer fingerprint and the text."""
+    return hashlib.sha1(f"{SENTIMENT_CACHE_VERSION}:{scorer}\0{text}".encode('utf-8')).digest()
+
+
+def vader_fingerprint(manifest_path=NLTK_MANIFEST_PATH):
+    """
+    Identifies the scorer behind the cached scores: the installed NLTK version and the SHA-1
+    of the VADER lexicon it reads. Upgrading either starts a fresh set of cache entries.
+
+    The lexicon is located through the NLTK resource manifest, so NLTK is only imported when
+    the manifest is stale.
+    """
+    return nltk_data_fingerprint(SENTIMENT_RESOURCES, manifest_path=manifest_path)
+
+
+def _score_chunk(texts):
+    global _analyzer
+    if _analyzer is None:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return [_analyzer.polarity_scores(text)['compound'] for text in texts]
+
+
+def _open_cache(cache_path):
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    # WAL lets concurrent runs (see batch_analysis.py) read the cache while one of them writes.
+    connection = sqlite3.connect(cache_path, timeout=SQLITE_TIMEOUT)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('CREATE TABLE IF NOT EXISTS vader_scores (text_hash BLOB PRIMARY KEY, compound REAL NOT NULL) WITHOUT ROWID')
+    return connection
+
+
+def _lookup_cached(connection, keys):
+    cached = {}
+    for start in range(0, len(keys), SQLITE_BATCH_SIZE):
+        batch = keys[start:start + SQLITE_BATCH_SIZE]
+        placeholders = ','.join('?' * len(batch))
+        cached.update(connection.execute(f'SELECT text_hash, compound FROM vader_scores WHERE text_hash IN ({placeholders})', batch))
+    return cached
+
+
+def _score_texts(texts, workers):
+    if workers <= 1 or len(texts) <= CHUNK_SIZE:
+        return _score_chunk(texts)
+    chunks = [texts[i:i + CHUNK_SIZE] for i in range(0, len(texts), CHUNK_SIZE)]
+    scores = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=POOL_CONTEXT) as executor:
+        for chunk_scores in executor.map(_score_chunk, chunks):
+            scores.extend(chunk_scores)
+    return scores
+
+
+def score_sentiment(texts, cache_path=SENTIMENT_CACHE_PATH, workers=None, use_cache=True, scorer=None):
+    """
+    VADER compound score for every text, scoring each distinct text at most once.
+
+    Scores are persisted in a SQLite table keyed by the SHA-1 of the scorer fingerprint and
+    the text, so re-runs and appended data only score texts that have never been seen by the
+    same scorer. Texts missing from the cache are scored across a process pool when there
+    are enough of them.
+
+    Args:
+        texts (pd.Series): Review messages; missing values score as empty text.
+        cache_path (str): SQLite file holding previously computed scores.
+        workers (int): Worker processes to use; defaults to os.cpu_count(). 1 disables the pool.
+        use_cache (bool): Set to False to score everything without touching the cache.
+        scorer (str): Fingerprint of the scorer; defaults to vader_fingerprint().
+
+    Returns:
+        pd.Series: Compound scores aligned with texts.
+    """
+    codes, uniques = pd.factorize(texts.fillna('').astype(str))
+    uniques = list(uniques)
+    workers = workers or os.cpu_count() or 1
+
+    if not use_cache:
+        scores = _score_texts(uniques, workers)
+    else:
+        scorer = scorer or vader_fingerprint()
+        keys = [text_key(text, scorer) for text in uniques]
+        connection = _open_cache(cache_path)
+        try:
+            cached = _lookup_cached(connection, keys)
+            missing = [i for i, key in enumerate(keys) if key not in cached]
+            print(f"Sentiment: {len(uniques)} distinct texts, {len(uniques) - len(missing)} served from cache, {len(missing)} to score.")
+            new_scores = _score_texts([uniques[i] for i in missing], workers)
+            with connection:
+                connection.executemany('INSERT OR REPLACE INTO vader_scores VALUES (?, ?)', zip((keys[i] for i in missing), new_scores))
+            cached.update(zip((keys[i] for i in missing), new_scores))
+            scores = [cached[key] for key in keys]
+        finally:
+            connection.close()
+
+    return pd.Series(np.asarray(scores, dtype=float)[codes], index=texts.index, name=texts.name)
+
+
+def sentiment_histogram(ratings, compound_scores):
+    """
+    Number of reviews per (star rating, compound score).
+
+    VADER rounds compound scores to four decimals, so this is an exact summary of the score
+    distribution with at most a few thousand entries per rating, and histograms of disjoint
+    sets of reviews can simply be added (see add_histograms).
+
+    Args:
+        ratings (pd.Series): 'Rating' of each review.
+        compound_scores (pd.Series): Compound scores aligned with ratings.
+
+    Returns:
+        pd.Series: Counts indexed by (rating, compound score).
+    """
+    return compound_scores.groupby([ratings, compound_scores]).size().rename('count')
+
+
+def add_histograms(histogram, other):
+    """Sums two sentiment_histogram results."""
+    if histogram is None:
+        return other
+    return histogram.add(other, fill_value=0).astype('int64')
+
+
+def label_sentiment(compound_scores):
+    """
+    Maps compound scores to 'Positive' (>= 0.05), 'Negative' (<= -0.05) or 'Neutral'.
+
+    Args:
+        compound_scores (pd.Series): VADER compound scores.
+
+    Returns:
+        pd.Series: The labels, aligned with compound_scores.
+    """
+    labels = np.select([compound_scores >= POSITIVE_THRESHOLD, compound_scores <= NEGATIVE_THRESHOLD], ['Positive', 'Negative'], default='Neutral')
+    return pd.Series(labels, index=compound_scores.index)
@@ -0,0 +1,199 @@
+import json
+import math
+import os
+import pickle
+
+import pandas as pd
+
+# --- Configuration ---
+SPIKE_STATE_PATH = os.path.join('.review_cache', 'spikes', 'state.pkl')
+# Bump whenever the layout of the persisted state changes.
+SPIKE_STATE_VERSION = 1
+EWMA_ALPHA = 0.1  # Weight of each new day in the running mean and variance (about a two-week memory)
+Z_THRESHOLD = 3.0  # A single day this many standard deviations above the running share alerts
+CUSUM_SLACK = 0.5  # Standard deviations per day a CUSUM ignores (the drift it tolerates)
+CUSUM_THRESHOLD = 5.0  # Accumulated excess that alerts on a sustained rise
+WARMUP_DAYS = 14  # Days with reviews a series needs before it can alert
+MIN_ALERT_COUNT = 3  # Fewer mentions than this on a day never alert, however small the baseline
+NEGATIVE_SERIES = 'negative_count'  # Reviews rated 1-2 stars, monitored alongside the mention columns
+
+
+def daily_counts(review_dates, ratings, mention_flags=None):
+    """
+    Reviews, 1-2 star reviews and mentions per category per calendar day.
+
+    Days without reviews are left out; tables of disjoint sets of reviews can be added
+    (see add_daily_counts).
+
+    Args:
+        review_dates (pd.Series): 'Review_Date' of each review.
+        ratings (pd.Series): 'Rating' aligned with review_dates.
+        mention_flags (pd.DataFrame): Boolean mentions_* columns aligned with review_dates.
+
+    Returns:
+        pd.DataFrame: Indexed by day, with 'review_count', NEGATIVE_SERIES and one count
+        column per mention column.
+    """
+    days = review_dates.dt.normalize().to_numpy()
+    counts = pd.DataFrame({'review_count': 1, NEGATIVE_SERIES: (ratings <= 2).to_numpy()}, index=review_dates.index)
+    if mention_flags is not None:
+        counts = counts.join(mention_flags)
+    return counts.groupby(days).sum().astype('int64').rename_axis('Day')
+
+
+def add_daily_counts(counts, other):
+    """Sums two daily_counts tables."""
+    if counts is None:
+        return other
+    return counts.add(other, fill_value=0).astype('int64')
+
+
+class SeriesState:
+    """
+    Running statistics of one daily share: EWMA mean, EW variance and a one-sided CUSUM.
+
+    Each day is folded in with a constant number of operations, so the state never grows.
+    """
+
+    def __init__(self):
+        self.mean = None
+        self.variance = 0.0
+        self.cusum = 0.0
+        self.days = 0
+
+    def score(self, count, reviews):
+        """
+        (share, z, cusum) of a day with count mentions among reviews, against the state so far.
+
+        The deviation is measured in the larger of the running standard deviation and the
+        binomial standard error of the day's share, so a quiet day with few reviews cannot
+        alert on a single mention.
+        """
+        share = count / reviews
+        if self.mean is None:
+            return share, 0.0, 0.0
+        binomial_variance = self.mean * (1 - self.mean) / reviews
+        z = (share - self.mean) / math.sqrt(max(self.variance, binomial_variance, 1e-6))
+        return share, z, max(0.0, self.cusum + z - CUSUM_SLACK)
+
+    def update(self, count, reviews, alpha=EWMA_ALPHA):
+        """Folds in one day and returns its (share, z, cusum) as score() does."""
+        share, z, cusum = self.score(count, reviews)
+        if self.mean is None:
+            self.mean = share
+        else:
+            difference = share - self.mean
+            self.mean += alpha * difference
+            self.variance = (1 - alpha) * (self.variance + alpha * difference ** 2)
+        self.cusum = cusum
+        self.days += 1
+        return share, z, cusum
+
+
+class SpikeDetector:
+    """
+    Streaming spike and change-point detector on daily category shares, persisted between runs.
+
+    Every monitored series (each mentions_* column and NEGATIVE_SERIES) is the share of a
+    day's reviews it counts. A day alerts when its share lies Z_THRESHOLD standard deviations
+    above the EWMA of the previous days (a spike) or when the CUSUM of those deviations passes
+    CUSUM_THRESHOLD (a sustained shift); the CUSUM restarts after alerting.
+
+    Days are folded in once, in order, up to the last complete day; last_day is the
+    watermark. The newest day of a run may still be filling up, so it is only scored against
+    the state (a provisional alert) and folded in by a later run once it is complete.
+    """
+
+    def __init__(self, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.last_day = None
+        self.series = {}
+
+    @classmethod
+    def load(cls, path=SPIKE_STATE_PATH, fingerprint=None):
+        """Loads the detector at path, or returns a fresh one if there is none or its settings differ."""
+        try:
+            with open(path, mode='rb') as infile:
+                saved = pickle.load(infile)
+        except FileNotFoundError:
+            return cls(fingerprint)
+        if saved.get('version') != SPIKE_STATE_VERSION or saved.get('fingerprint') != fingerprint:
+            print(f"Spike detector state in '{path}' was built with different settings; starting over.")
+            return cls(fingerprint)
+        detector = cls(fingerprint)
+        detector.last_day, detector.series = saved['last_day'], saved['series']
+        return detector
+
+    def save(self, path=SPIKE_STATE_PATH):
+        """Writes the state atomically, so an interrupted save leaves the previous one readable."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, mode='wb') as outfile:
+            pickle.dump({'version': SPIKE_STATE_VERSION, 'fingerprint': self.fingerprint,
+                         'last_day': self.last_day, 'series': self.series}, outfile)
+        os.replace(tmp_path, path)
+
+    def _check(self, name, state, day, count, reviews, provisional):
+        prior_days, baseline = state.days, state.mean
+        share, z, cusum = state.score(count, reviews) if provisional else state.update(count, reviews)
+        if prior_days < WARMUP_DAYS or count < MIN_ALERT_COUNT or (z < Z_THRESHOLD and cusum < CUSUM_THRESHOLD):
+            return None
+        if cusum >= CUSUM_THRESHOLD and not provisional:
+            state.cusum = 0.0
+        return {'day': day.strftime('%Y-%m-%d'), 'series': name, 'count': int(count), 'reviews': int(reviews),
+                'share': round(share * 100, 2), 'baseline_share': round(baseline * 100, 2), 'z': round(z, 2),
+                'cusum': round(cusum, 2), 'kind': 'spike' if z >= Z_THRESHOLD else 'shift', 'provisional': provisional}
+
+    def process(self, counts):
+        """
+        Folds in the complete days of counts newer than last_day and scores the newest day.
+
+        Args:
+            counts (pd.DataFrame): Output of daily_counts over all reviews so far.
+
+        Returns:
+            list: Alert dicts (day, series, count, reviews, share %, z, cusum, kind, provisional),
+            oldest first.
+        """
+        alerts = []
+        if counts.empty:
+            return alerts
+        series_names = [column for column in counts.columns if column != 'review_count']
+        newest_day = counts.index.max()
+        pending = counts[counts.index < newest_day]
+        if self.last_day is not None:
+            pending = pending[pending.index > self.last_day]
+        reviews = pending['review_count'].to_numpy()
+        for name in series_names:
+            state = self.series.setdefault(name, SeriesState())
+            for day, count, day_reviews in zip(pending.index, pending[name].tolist(), reviews.tolist()):
+                alert = self._check(name, state, day, count, day_reviews, provisional=False)
+                if alert is not None:
+                    alerts.append(alert)
+        if not pending.empty:
+            self.last_day = pending.index.max()
+
+        newest = counts.loc[newest_day]
+        if self.last_day is None or newest_day > self.last_day:
+            for name in series_names:
+                alert = self._check(name, self.series.setdefault(name, SeriesState()), newest_day, int(newest[name]), int(newest['review_count']), provisional=True)
+                if alert is not None:
+                    alerts.append(alert)
+        return sorted(alerts, key=lambda alert: alert['day'])
+
+
+def append_alerts(alerts, path):
+    """
+    Appends the final alerts to a JSON lines log.
+
+    Provisional alerts are left out: the newest day is re-scored on every run until a later
+    run folds it in, and only then is its alert final. Each complete day is folded in once,
+    so every (day, series) alert is logged at most once.
+    """
+    alerts = [alert for alert in alerts if not alert['provisional']]
+    if not alerts:
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, mode='a', encoding='utf-8') as outfile:
+        for alert in alerts:
+            outfile.write(json.dumps(alert) + '\n')
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# The analysis modules live at the repository root, one level up from this file.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from monthly_aggregation import add_aggregates, monthly_aggregates
+
+
+def _reviews(rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Review_Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, rows), unit='D'),
+        'Rating': pd.Series(rng.integers(1, 6, rows), dtype='int8'),
+        'Has_Developer_Reply': rng.random(rows) < 0.5,
+        'VADER_Sentiment_Compound': rng.uniform(-1, 1, rows),
+        'mentions_payment_issues': rng.random(rows) < 0.3,
+    }).sort_values('Review_Date', kind='stable', ignore_index=True)
+
+
+def test_tiny_delta_folded_into_large_state_matches_single_pass():
+    # A few int8 ratings per month sum to an int8 column; folding that delta into a large
+    # state must not cast the running totals down to int8.
+    state_rows, delta_rows = _reviews(400, seed=1), _reviews(5, seed=2)
+    mention_columns = ['mentions_payment_issues']
+    folded = add_aggregates(monthly_aggregates(state_rows, mention_columns), monthly_aggregates(delta_rows, mention_columns))
+    single_pass = monthly_aggregates(pd.concat([state_rows, delta_rows], ignore_index=True), mention_columns)
+
+    pd.testing.assert_frame_equal(folded, single_pass, check_exact=False)
+    assert (folded['rating_sum'] > 255).all()
+    assert folded['rating_sum'].dtype == 'int64'
+
+
+def test_chunks_add_up_to_single_pass():
+    rows = _reviews(1000, seed=3)
+    folded = None
+    for start in range(0, len(rows), 7):
+        folded = add_aggregates(folded, monthly_aggregates(rows.iloc[start:start + 7]))
+    pd.testing.assert_frame_equal(folded, monthly_aggregates(rows), check_exact=False)
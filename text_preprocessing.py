@@ -0,0 +1,267 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+CUSTOM_STOPWORDS = ['gromo', 'app', 'application', 'please', 'also', 'get', 'even', 'would', 'could', 'make']
+LEMMA_CACHE_SIZE = 100_000  # Distinct tokens memoized per process
+CHUNK_SIZE = 2_000  # Unique texts handed to a worker at a time
+PREPROCESS_CACHE_PATH = os.path.join('.review_cache', 'processed_messages.sqlite')
+# Bump whenever preprocess_text or fast_preprocess_series change their output, so cached texts are redone.
+PREPROCESS_CACHE_VERSION = 1
+SQLITE_TIMEOUT = 60  # Seconds a writer waits for another process holding the cache lock
+SQLITE_BATCH_SIZE = 900  # Stays under SQLite's bound-parameter limit
+# Workers start from a clean interpreter: forking the multithreaded stage runner can copy held
+# locks (and the profiler's tracemalloc hooks) into the child. forkserver is POSIX-only.
+POOL_CONTEXT = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# Hinglish stopwords, spelling variants and words WordNet must not touch, for the fast tokenizer.
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hinglish_lexicon.json')
+
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+DIGITS_PATTERN = re.compile(r'\d+')
+# Both deletions in one pass; deleting single characters commutes, so the result is the same.
+NORMALIZE_PATTERN = re.compile(r'[^\w\s]|\d')
+
+# NLTK is imported on first use: importing it costs seconds, and only this stage needs it.
+_stop_words_set = None
+_lemmatizer = None
+_word_tokenize = None
+
+
+def get_stop_words():
+    """Returns the English NLTK stopwords plus CUSTOM_STOPWORDS as a set (built once per process)."""
+    global _stop_words_set
+    if _stop_words_set is None:
+        from nltk.corpus import stopwords
+        _stop_words_set = set(stopwords.words('english') + CUSTOM_STOPWORDS)
+    return _stop_words_set
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize(word):
+    """WordNet lemma of word, memoized since review vocabularies are small and highly repetitive."""
+    global _lemmatizer
+    if _lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        _lemmatizer = WordNetLemmatizer()
+    return _lemmatizer.lemmatize(word)
+
+
+def preprocess_text(text):
+    """
+    Lowercases text, strips punctuation and digits, tokenizes it and lemmatizes every
+    token that is not a stopword and is longer than two characters.
+
+    Args:
+        text: A review message (NaN is treated as empty).
+
+    Returns:
+        str: The processed tokens joined by single spaces.
+    """
+    global _word_tokenize
+    if pd.isna(text): return ""
+    if _word_tokenize is None:
+        from nltk.tokenize import word_tokenize as _word_tokenize
+    stop_words_set = get_stop_words()
+    text = str(text).lower()
+    text = PUNCTUATION_PATTERN.sub('', text)
+    text = DIGITS_PATTERN.sub('', text)
+    tokens = _word_tokenize(text)
+    tokens = [lemmatize(word) for word in tokens if word not in stop_words_set and len(word) > 2]
+    return " ".join(tokens)
+
+
+def load_lexicon(path=LEXICON_PATH):
+    """
+    Reads the Hinglish lexicon used by the fast tokenizer.
+
+    Args:
+        path (str): JSON file with 'stopwords' (list), 'spellings' (variant -> canonical
+            spelling) and 'keep' (list of words passed through without lemmatization).
+
+    Returns:
+        dict: 'stopwords' and 'keep' as sets, 'spellings' as a dict, all lowercased.
+
+    Raises:
+        ValueError: If one of the three entries is missing.
+    """
+    with open(path, mode='r', encoding='utf-8') as infile:
+        lexicon = json.load(infile)
+    missing = [key for key in ('stopwords', 'spellings', 'keep') if key not in lexicon]
+    if missing:
+        raise ValueError(f"Lexicon '{path}' has no {', '.join(missing)}.")
+    return {
+        'stopwords': {word.lower() for word in lexicon['stopwords']},
+        'spellings': {variant.lower(): word.lower() for variant, word in lexicon['spellings'].items()},
+        'keep': {word.lower() for word in lexicon['keep']},
+    }
+
+
+def normalize_series(texts):
+    """
+    Column-wide version of the normalization in preprocess_text: lowercases texts and
+    strips punctuation and digits with pandas string kernels and one compiled pattern.
+
+    Returns:
+        pd.Series: Normalized texts aligned with texts ("" for missing values).
+    """
+    return texts.fillna("").astype(str).str.lower().str.replace(NORMALIZE_PATTERN, '', regex=True)
+
+
+def _fast_token(token, stop_words_set, lexicon):
+    token = lexicon['spellings'].get(token, token)
+    if token in stop_words_set or token in lexicon['stopwords'] or len(token) <= 2:
+        return None
+    return token if token in lexicon['keep'] else lemmatize(token)
+
+
+def fast_preprocess_series(texts, lexicon=None):
+    """
+    Lightweight alternative to preprocess_series for English and romanized Hindi reviews.
+
+    After normalization the text is already whitespace-separated, so instead of running
+    NLTK's word_tokenize per message the distinct texts are normalized column-wide, split
+    and exploded into one token column. Every distinct token is then resolved once: its
+    spelling is canonicalized ("nhi" -> "nahi", "bohot" -> "bahut"), English and Hinglish
+    stopwords and tokens of two characters or fewer are dropped, and what is left is
+    lemmatized unless the lexicon marks it as a Hinglish word to keep as is.
+
+    Args:
+        texts (pd.Series): Raw review messages.
+        lexicon (dict): Output of load_lexicon; defaults to the lexicon at LEXICON_PATH.
+
+    Returns:
+        pd.Series: Processed messages aligned with texts.
+    """
+    lexicon = lexicon or load_lexicon()
+    stop_words_set = get_stop_words()
+    codes, uniques = pd.factorize(texts)
+    tokens = normalize_series(pd.Series(uniques, dtype=object)).str.split().explode().dropna()
+
+    token_codes, vocabulary = pd.factorize(tokens)
+    resolved = np.array([_fast_token(token, stop_words_set, lexicon) for token in vocabulary], dtype=object)[token_codes]
+    kept = pd.notna(resolved)
+    values, owners = resolved[kept], tokens.index.to_numpy()[kept]
+
+    # Exploded tokens stay grouped by text, so each text's tokens are one contiguous slice.
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]]) if len(owners) else np.empty(0, dtype=np.int64)
+    ends = np.r_[starts[1:], len(values)]
+    # factorize gives missing values the code -1, which picks up the trailing "" here.
+    lookup = np.full(len(uniques) + 1, "", dtype=object)
+    lookup[owners[starts]] = [" ".join(values[start:end]) for start, end in zip(starts, ends)]
+    return pd.Series(lookup[codes], index=texts.index, name=texts.name)
+
+
+def fast_preprocess_keyword(keyword, lexicon=None):
+    """
+    A taxonomy keyword in the form fast_preprocess_series gives its tokens ("paisa" -> "paise"),
+    so keywords written for preprocess_text also match its output. Tokens it would drop are
+    kept as written.
+    """
+    lexicon = lexicon or load_lexicon()
+    stop_words_set = get_stop_words()
+    tokens = normalize_series(pd.Series([keyword])).iloc[0].split()
+    return " ".join(_fast_token(token, stop_words_set, lexicon) or token for token in tokens)
+
+
+def _preprocess_chunk(texts):
+    return [preprocess_text(text) for text in texts]
+
+
+def preprocess_series(texts, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Applies preprocess_text to a Series, processing every distinct text only once.
+
+    Identical messages are collapsed with pd.factorize before processing, and the distinct
+    texts are fanned out across a process pool in chunks when there are enough of them to
+    amortize the worker start-up. The result is identical to texts.apply(preprocess_text).
+
+    Args:
+        texts (pd.Series): Raw review messages.
+        workers (int): Worker processes to use; defaults to os.cpu_count(). 1 disables the pool.
+        chunk_size (int): Distinct texts per task submitted to the pool.
+
+    Returns:
+        pd.Series: Processed messages aligned with texts.
+    """
+    codes, uniques = pd.factorize(texts)
+    uniques = list(uniques)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(uniques) <= chunk_size:
+        processed = _preprocess_chunk(uniques)
+    else:
+        chunks = [uniques[i:i + chunk_size] for i in range(0, len(uniques), chunk_size)]
+        processed = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=POOL_CONTEXT) as executor:
+            for chunk_result in executor.map(_preprocess_chunk, chunks):
+                processed.extend(chunk_result)
+
+    # factorize gives missing values the code -1, which picks up the trailing "" here.
+    lookup = np.array(processed + [""], dtype=object)
+    return pd.Series(lookup[codes], index=texts.index, name=texts.name)
+
+
+def _open_cache(cache_path):
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    # WAL lets concurrent runs (see batch_analysis.py) read the cache while one of them writes.
+    connection = sqlite3.connect(cache_path, timeout=SQLITE_TIMEOUT)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('CREATE TABLE IF NOT EXISTS processed_messages (text_hash BLOB PRIMARY KEY, processed TEXT NOT NULL) WITHOUT ROWID')
+    return connection
+
+
+def cached_preprocess(texts, preprocess, variant='', cache_path=PREPROCESS_CACHE_PATH):
+    """
+    preprocess(texts), computed only for the distinct texts missing from an on-disk cache.
+
+    Processed messages are persisted in a SQLite table keyed by the SHA-1 of the variant and
+    the text, so re-runs, appended exports and other datasets sharing the cache only process
+    texts that have never been seen with the same settings.
+
+    Args:
+        texts (pd.Series): Raw review messages.
+        preprocess (callable): preprocess_series, fast_preprocess_series or a wrapper of
+            either; it must process every text independently of the others.
+        variant (str): Identifies the settings preprocess runs with (tokenizer, stopwords,
+            lexicon); results of different variants never mix.
+        cache_path (str): SQLite file holding previously processed messages.
+
+    Returns:
+        pd.Series: Processed messages aligned with texts.
+    """
+    codes, uniques = pd.factorize(texts)
+    uniques = list(uniques)
+    prefix = f"{PREPROCESS_CACHE_VERSION}:{variant}\0"
+    keys = [hashlib.sha1((prefix + str(text)).encode('utf-8')).digest() for text in uniques]
+    connection = _open_cache(cache_path)
+    try:
+        cached = {}
+        for start in range(0, len(keys), SQLITE_BATCH_SIZE):
+            batch = keys[start:start + SQLITE_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            cached.update(connection.execute(f'SELECT text_hash, processed FROM processed_messages WHERE text_hash IN ({placeholders})', batch))
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        print(f"Preprocessing: {len(uniques)} distinct texts, {len(uniques) - len(missing)} served from cache, {len(missing)} to process.")
+        if missing:
+            processed = preprocess(pd.Series([uniques[i] for i in missing], dtype=object)).tolist()
+            with connection:
+                connection.executemany('INSERT OR REPLACE INTO processed_messages VALUES (?, ?)', zip((keys[i] for i in missing), processed))
+            cached.update(zip((keys[i] for i in missing), processed))
+    finally:
+        connection.close()
+
+    # factorize gives missing values the code -1, which picks up the trailing "" here.
+    lookup = np.array([cached[key] for key in keys] + [""], dtype=object)
+    return pd.Series(lookup[codes], index=texts.index, name=texts.name)
@@ -0,0 +1,160 @@
+import re
+from collections import Counter
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+# Same token definition as sklearn's CountVectorizer default.
+TOKEN_PATTERN = re.compile(r'(?u)\b\w\w+\b')
+
+
+def tokenize(doc, stop_words=None):
+    """Lowercases doc and splits it into CountVectorizer-style tokens, dropping stop_words."""
+    tokens = TOKEN_PATTERN.findall(doc.lower())
+    if stop_words:
+        tokens = [token for token in tokens if token not in stop_words]
+    return tokens
+
+
+class TokenCorpus:
+    """
+    Processed messages tokenized once and stored as integer token ids.
+
+    Every distinct message is a document: its token ids are token_ids[offsets[doc]:offsets[doc + 1]]
+    (CSR layout), and row_docs maps each row of the original Series to its document (-1
+    for missing messages). Token ids index into vocabulary. N-gram counting and keyword
+    tagging work on these arrays directly, so no consumer re-tokenizes the text, and repeated
+    messages cost one int per row instead of one string each.
+
+    Usage:
+        corpus = TokenCorpus.from_texts(processed_messages)
+        corpus.select(np.flatnonzero(ratings <= 2)).ngram_counts(orders=(1, 2))
+    """
+
+    def __init__(self, vocabulary, token_ids, offsets, row_docs, index):
+        """
+        Args:
+            vocabulary (np.ndarray): Object array of the distinct tokens, by id.
+            token_ids (np.ndarray): int32 token ids of all documents, concatenated.
+            offsets (np.ndarray): int64 start of every document in token_ids, plus the end.
+            row_docs (np.ndarray): int64 document of every row, -1 for missing messages.
+            index (pd.Index): Index of the rows.
+        """
+        self.vocabulary = vocabulary
+        self.token_ids = token_ids
+        self.offsets = offsets
+        self.row_docs = row_docs
+        self.index = index
+        self._ids = None
+
+    @classmethod
+    def from_texts(cls, texts):
+        """
+        Builds the corpus of a Series of processed messages, tokenizing each distinct message once.
+
+        Returns:
+            TokenCorpus: Rows aligned with texts; ids are assigned in order of first appearance.
+        """
+        row_docs, uniques = pd.factorize(texts)
+        token_lists = [tokenize(str(text)) for text in uniques]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        token_ids, vocabulary = pd.factorize(np.fromiter(chain.from_iterable(token_lists), dtype=object, count=int(offsets[-1])))
+        return cls(np.asarray(vocabulary, dtype=object), token_ids.astype(np.int32), offsets, row_docs.astype(np.int64), texts.index)
+
+    def __len__(self):
+        return len(self.row_docs)
+
+    @property
+    def doc_count(self):
+        return len(self.offsets) - 1
+
+    def select(self, rows):
+        """Corpus of the rows at positions rows, sharing the vocabulary and token arrays of this one."""
+        corpus = TokenCorpus(self.vocabulary, self.token_ids, self.offsets, self.row_docs[rows], self.index[rows])
+        corpus._ids = self._ids
+        return corpus
+
+    def token_id(self, token):
+        """Id of token, or None if it does not occur in the corpus."""
+        if self._ids is None:
+            self._ids = {token: i for i, token in enumerate(self.vocabulary)}
+        return self._ids.get(token)
+
+    def token_docs(self):
+        """Document of every entry of token_ids."""
+        return np.repeat(np.arange(self.doc_count), np.diff(self.offsets))
+
+    def weighted_docs(self):
+        """
+        Documents of the rows, in order of first appearance (so ties rank as in a plain scan).
+
+        Returns:
+            tuple: (docs, weights, first_positions): the documents, how many rows share each
+            one, and the position of its first row. Missing messages are left out.
+        """
+        positions = np.flatnonzero(self.row_docs >= 0)
+        docs, first, weights = np.unique(self.row_docs[positions], return_index=True, return_counts=True)
+        order = np.argsort(first, kind='stable')
+        return docs[order], weights[order], positions[first[order]]
+
+    def gather(self, docs, stop_words=None):
+        """
+        Token ids of docs concatenated in the given order, stop words removed.
+
+        Returns:
+            tuple: (ids, owners) where owners gives, for every id, the number (position in
+            docs) of the document it belongs to.
+        """
+        starts = self.offsets[docs]
+        lengths = self.offsets[docs + 1] - starts
+        segment_starts = np.cumsum(lengths) - lengths
+        positions = np.arange(lengths.sum()) + np.repeat(starts - segment_starts, lengths)
+        ids, owners = self.token_ids[positions], np.repeat(np.arange(len(docs)), lengths)
+        if stop_words:
+            keep = np.fromiter((token not in stop_words for token in self.vocabulary), dtype=bool, count=len(self.vocabulary))
+            ids, owners = ids[keep[ids]], owners[keep[ids]]
+        return ids, owners
+
+    def ngram_counts(self, orders=(1, 2, 3), stop_words=None, first_seen=None):
+        """
+        Counts n-grams of several orders over the rows.
+
+        Every n-gram occurrence is one row of a window matrix over the token ids; windows are
+        collapsed with np.unique (on a packed int64 key while vocabulary_size ** n fits) and
+        weighted by how many rows share the document. Only the distinct n-grams are
+        turned back into strings.
+
+        Args:
+            orders (tuple): N-gram orders to count.
+            stop_words (set): Tokens skipped before n-grams are formed.
+            first_seen (dict): If given, filled with order -> {ngram: position of the first
+                row containing it}, in the same order as the counters.
+
+        Returns:
+            dict: Order -> Counter of n-gram string -> frequency, as ngrams.count_ngrams.
+        """
+        docs, weights, first_positions = self.weighted_docs()
+        ids, owners = self.gather(docs, stop_words)
+        vocabulary_size = max(len(self.vocabulary), 1)
+        counts = {}
+        for n in orders:
+            starts = np.flatnonzero(owners[n - 1:] == owners[:len(owners) - n + 1]) if len(owners) >= n else np.empty(0, dtype=np.int64)
+            windows = np.stack([ids[starts + k] for k in range(n)], axis=1).astype(np.int64)
+            if vocabulary_size ** n < 2 ** 63:
+                keys = windows @ (vocabulary_size ** np.arange(n - 1, -1, -1, dtype=np.int64))
+                _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            else:
+                _, first, inverse = np.unique(windows, axis=0, return_index=True, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            totals = np.bincount(inverse, weights=weights[owners[starts]], minlength=len(first)).astype(np.int64)
+            # Counters are filled in order of first occurrence, so most_common() breaks ties
+            # exactly like a scan over the documents.
+            order = np.argsort(first, kind='stable')
+            ngrams = [" ".join(tokens) for tokens in self.vocabulary[windows[first[order]]]]
+            counts[n] = Counter(dict(zip(ngrams, totals[order].tolist())))
+            if first_seen is not None:
+                first_seen[n] = dict(zip(ngrams, first_positions[owners[starts[first[order]]]].tolist()))
+        return counts
@@ -0,0 +1,260 @@
+import os
+import pickle
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from monthly_aggregation import month_end_index
+from token_corpus import tokenize
+
+# --- Configuration ---
+TOPIC_STATE_PATH = os.path.join('.review_cache', 'topics', 'model.pkl')
+# Bump whenever the layout of the persisted model changes.
+TOPIC_STATE_VERSION = 2
+TOPIC_COUNT = 12
+TOPIC_FEATURES = 2 ** 17  # Hash buckets shared by the unigrams and bigrams
+TOPIC_NGRAM_ORDERS = (1, 2)
+TOPIC_BATCH_SIZE = 2048  # Documents per MiniBatchNMF.partial_fit call
+TOPIC_TOP_TERMS = 8
+TOPIC_LABEL_CANDIDATES = 4  # N-grams tracked per hash bucket to label it (space-saving counts)
+TOPIC_RECENT_MONTHS = 3  # Emerging = share of the last months against the BASELINE_MONTHS before them
+TOPIC_BASELINE_MONTHS = 12
+TOPIC_SEED = 0
+
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def topic_modeling_available():
+    """True if scikit-learn (MiniBatchNMF) can be imported."""
+    try:
+        from sklearn.decomposition import MiniBatchNMF  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def term_bucket(term, n_features=TOPIC_FEATURES):
+    """Hash bucket of a space-separated n-gram; the same as hashed_features gives its occurrences."""
+    value = 0
+    for token in term.split():
+        value = (value * int(HASH_MULTIPLIER) + zlib.crc32(token.encode('utf-8'))) % 2 ** 64
+    return value % n_features
+
+
+def hashed_features(corpus, docs, n_features=TOPIC_FEATURES, orders=TOPIC_NGRAM_ORDERS):
+    """
+    Sparse hashed n-gram features of some documents of a TokenCorpus.
+
+    Each token is hashed once (crc32 of its text, so buckets are stable across corpora and
+    runs), and an n-gram's hash is a multiply-add over its token hashes, computed for all
+    windows of the token id array at once. Counts are log-scaled and rows L2-normalized.
+
+    Args:
+        corpus (TokenCorpus): Corpus holding the documents.
+        docs (np.ndarray): Documents to featurize (e.g. from corpus.weighted_docs()).
+
+    Returns:
+        scipy.sparse.csr_matrix: Shape (len(docs), n_features), rows in the order of docs.
+    """
+    from scipy.sparse import csr_matrix
+    from sklearn.preprocessing import normalize
+
+    token_hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in corpus.vocabulary), dtype=np.uint64, count=len(corpus.vocabulary))
+    ids, owners = corpus.gather(docs)
+    rows, columns = [], []
+    for n in orders:
+        starts = np.flatnonzero(owners[n - 1:] == owners[:len(owners) - n + 1]) if len(owners) >= n else np.empty(0, dtype=np.int64)
+        hashes = np.zeros(len(starts), dtype=np.uint64)
+        for k in range(n):
+            hashes = hashes * HASH_MULTIPLIER + token_hashes[ids[starts + k]]  # uint64 arithmetic wraps
+        rows.append(owners[starts])
+        columns.append((hashes % np.uint64(n_features)).astype(np.int64))
+    rows, columns = np.concatenate(rows), np.concatenate(columns)
+    features = csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(len(docs), n_features))
+    features.sum_duplicates()
+    np.log1p(features.data, out=features.data)
+    return normalize(features)
+
+
+class TopicModel:
+    """
+    Online NMF topic model of the negative reviews, fitted on reviews newer than its watermark.
+
+    Documents are hashed n-gram vectors (hashed_features), so the feature space never changes
+    as new words appear, and sklearn's MiniBatchNMF learns the topics with partial_fit, one
+    mini-batch at a time in review date order. Each run therefore only fits the months
+    scraped since the last one; the history is never refitted. Hash buckets are labelled
+    with the most frequent n-gram that fell into them, tracked with a space-saving summary of
+    at most TOPIC_LABEL_CANDIDATES n-grams per bucket, so the persisted model stays bounded
+    by n_features however many months it has seen.
+
+    The model is persisted with its settings fingerprint; one built with different settings
+    is discarded. Delete TOPIC_STATE_PATH to relearn the topics from scratch.
+    """
+
+    def __init__(self, fingerprint=None, n_topics=TOPIC_COUNT, n_features=TOPIC_FEATURES, orders=TOPIC_NGRAM_ORDERS,
+                 batch_size=TOPIC_BATCH_SIZE, seed=TOPIC_SEED):
+        self.fingerprint = fingerprint
+        self.n_topics = n_topics
+        self.n_features = n_features
+        self.orders = orders
+        self.batch_size = batch_size
+        self.seed = seed
+        self.nmf = None
+        self.watermark = None
+        self.documents_fitted = 0
+        self.bucket_labels = {}  # Hash bucket -> {n-gram: (over-)estimated count}
+
+    @classmethod
+    def load(cls, path=TOPIC_STATE_PATH, fingerprint=None, **settings):
+        """Loads the model at path, or returns an unfitted one if there is none or its settings differ."""
+        try:
+            with open(path, mode='rb') as infile:
+                saved = pickle.load(infile)
+        except FileNotFoundError:
+            return cls(fingerprint, **settings)
+        if saved.get('version') != TOPIC_STATE_VERSION or saved.get('fingerprint') != fingerprint:
+            print(f"Topic model in '{path}' was built with different settings; relearning the topics from scratch.")
+            return cls(fingerprint, **settings)
+        return saved['model']
+
+    def save(self, path=TOPIC_STATE_PATH):
+        """Writes the model atomically, so an interrupted save leaves the previous one readable."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, mode='wb') as outfile:
+            pickle.dump({'version': TOPIC_STATE_VERSION, 'fingerprint': self.fingerprint, 'model': self}, outfile)
+        os.replace(tmp_path, path)
+
+    @property
+    def fitted(self):
+        return self.nmf is not None
+
+    def partial_fit(self, corpus, watermark):
+        """
+        Updates the topics with the reviews of corpus.
+
+        Args:
+            corpus (TokenCorpus): Negative reviews dated after the watermark, in date order.
+            watermark (pd.Timestamp): Latest review date in corpus; becomes the model's watermark.
+
+        Returns:
+            int: Distinct documents fitted. Nothing is fitted (and the watermark stays) while
+            fewer than n_topics distinct non-empty documents are available to start the model.
+        """
+        from sklearn.decomposition import MiniBatchNMF
+
+        # Distinct documents in order of first appearance, i.e. chronologically.
+        docs, _, _ = corpus.weighted_docs()
+        docs = docs[np.diff(corpus.offsets)[docs] > 0]
+        if not self.fitted and len(docs) < self.n_topics:
+            return 0
+        if self.nmf is None:
+            self.nmf = MiniBatchNMF(n_components=self.n_topics, batch_size=self.batch_size, init='nndsvda', random_state=self.seed)
+        features = hashed_features(corpus, docs, self.n_features, self.orders)
+        for start in range(0, len(docs), self.batch_size):
+            self.nmf.partial_fit(features[start:start + self.batch_size])
+
+        for order_counts in corpus.ngram_counts(orders=self.orders).values():
+            self._update_labels(order_counts)
+        self.documents_fitted += len(docs)
+        self.watermark = watermark if self.watermark is None else max(self.watermark, watermark)
+        return len(docs)
+
+    def _update_labels(self, term_counts):
+        # Space-saving: a bucket tracking too many n-grams hands its least counted slot (and
+        # that count) to the newcomer, so a frequent n-gram is never lost.
+        for term, count in term_counts.items():
+            candidates = self.bucket_labels.setdefault(term_bucket(term, self.n_features), {})
+            if term in candidates:
+                candidates[term] += count
+            elif len(candidates) < TOPIC_LABEL_CANDIDATES:
+                candidates[term] = count
+            else:
+                evicted = min(candidates, key=candidates.get)
+                candidates[term] = candidates.pop(evicted) + count
+
+    def dominant_topics(self, corpus):
+        """
+        Topic with the largest weight for every row of corpus (-1 for missing or empty messages).
+
+        Returns:
+            np.ndarray: int64 topic per row.
+        """
+        docs, _, _ = corpus.weighted_docs()
+        weights = self.nmf.transform(hashed_features(corpus, docs, self.n_features, self.orders))
+        # One extra -1 entry for missing messages, whose document is -1.
+        doc_topics = np.full(corpus.doc_count + 1, -1, dtype=np.int64)
+        doc_topics[docs] = np.where(weights.max(axis=1) > 0, weights.argmax(axis=1), -1)
+        return doc_topics[corpus.row_docs]
+
+    def top_terms(self, n=TOPIC_TOP_TERMS):
+        """The n heaviest labelled features of every topic, as lists of n-gram strings."""
+        labels = {bucket: max(candidates, key=candidates.get) for bucket, candidates in self.bucket_labels.items()}
+        terms = []
+        for component in self.nmf.components_:
+            ranked = [bucket for bucket in np.argsort(-component, kind='stable') if bucket in labels][:n]
+            terms.append([labels[bucket] for bucket in ranked])
+        return terms
+
+
+def monthly_topic_volume(review_dates, topics, n_topics):
+    """
+    Reviews per month and topic.
+
+    Args:
+        review_dates (pd.Series): 'Review_Date' of the negative reviews.
+        topics (np.ndarray): Output of TopicModel.dominant_topics, aligned with review_dates.
+        n_topics (int): Number of topics (one column each, also for topics without reviews).
+
+    Returns:
+        pd.DataFrame: Counts indexed by month-end timestamps covering every month from the
+        first review to the last, one column per topic.
+    """
+    assigned = topics >= 0
+    months = review_dates.dt.to_period('M').to_numpy()
+    volume = pd.crosstab(months[assigned], topics[assigned]).reindex(columns=range(n_topics), fill_value=0)
+    if not volume.empty:
+        volume = volume.reindex(pd.period_range(volume.index.min(), volume.index.max(), freq='M'), fill_value=0)
+    volume.index = month_end_index(pd.PeriodIndex(volume.index, freq='M'))
+    volume.columns.name = 'Topic'
+    return volume
+
+
+def topic_summary(top_terms, volume, keyword_map, recent_months=TOPIC_RECENT_MONTHS, baseline_months=TOPIC_BASELINE_MONTHS):
+    """
+    One row per topic: its top terms, review count, the known category it overlaps and how
+    fast it is growing.
+
+    'Known_Category' is the keyword_map category sharing the most keywords with the topic's
+    top terms, or None for a topic none of the keyword lists cover. 'Recent_Share' and
+    'Baseline_Share' are the topic's average share (%) of the monthly negative reviews over
+    the last recent_months and the baseline_months before them; 'Growth' is their difference
+    in percentage points.
+
+    Returns:
+        pd.DataFrame: Indexed by 'Topic', uncovered and fastest growing topics first.
+    """
+    keyword_tokens = {category: {token for keyword in keywords for token in tokenize(keyword)} for category, keywords in keyword_map.items()}
+    shares = volume.div(volume.sum(axis=1).replace(0, np.nan), axis=0) * 100
+    recent = shares.iloc[-recent_months:].mean()
+    baseline = shares.iloc[-(recent_months + baseline_months):-recent_months].mean() if len(shares) > recent_months else pd.Series(np.nan, index=shares.columns)
+
+    rows = []
+    for topic, terms in enumerate(top_terms):
+        term_tokens = {token for term in terms for token in term.split()}
+        overlaps = {category: len(term_tokens & tokens) for category, tokens in keyword_tokens.items()}
+        best = max(overlaps, key=overlaps.get) if overlaps else None
+        rows.append({
+            'Topic': topic,
+            'Top_Terms': ', '.join(terms),
+            'Reviews': int(volume[topic].sum()),
+            'Known_Category': best if best is not None and overlaps[best] > 0 else None,
+            'Recent_Share': recent[topic],
+            'Baseline_Share': baseline[topic],
+        })
+    summary = pd.DataFrame(rows).set_index('Topic')
+    summary['Growth'] = summary['Recent_Share'] - summary['Baseline_Share']
+    summary['Is_New'] = summary['Known_Category'].isna()
+    return summary.sort_values(['Is_New', 'Growth'], ascending=[False, False], kind='stable')